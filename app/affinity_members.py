@@ -0,0 +1,66 @@
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.affinity_triple import AffinityTriple
+from app.models.affinity_triple_endpoint import AffinityTripleEndpoint
+from app.models.affinity_triple_service import AffinityTripleService
+
+
+def delete_affinity_members(db: Session, triple_uids: list[UUID]) -> None:
+    """Remove the normalized membership rows of the given triples."""
+    if not triple_uids:
+        return
+    db.query(AffinityTripleEndpoint).filter(
+        AffinityTripleEndpoint.triple_uid.in_(triple_uids)
+    ).delete(synchronize_session=False)
+    db.query(AffinityTripleService).filter(
+        AffinityTripleService.triple_uid.in_(triple_uids)
+    ).delete(synchronize_session=False)
+
+
+def sync_affinity_members(
+    db: Session, triple: AffinityTriple, fields: tuple[str, ...] = ("endpoint_uids", "service_uids")
+) -> None:
+    """Rewrite the membership rows of ``triple`` from its ``endpoint_uids``/``service_uids`` arrays.
+
+    Only the tables of the arrays named in ``fields`` are rewritten: an update that
+    leaves one array alone must not re-insert uids of since-deleted members from it.
+    The triple must already have been flushed so that ``triple_uid`` is assigned.
+    """
+    if "endpoint_uids" in fields:
+        db.query(AffinityTripleEndpoint).filter(
+            AffinityTripleEndpoint.triple_uid == triple.triple_uid
+        ).delete(synchronize_session=False)
+        db.add_all(
+            AffinityTripleEndpoint(triple_uid=triple.triple_uid, endpoint_uid=endpoint_uid)
+            for endpoint_uid in dict.fromkeys(triple.endpoint_uids or [])
+        )
+    if "service_uids" in fields:
+        db.query(AffinityTripleService).filter(
+            AffinityTripleService.triple_uid == triple.triple_uid
+        ).delete(synchronize_session=False)
+        db.add_all(
+            AffinityTripleService(triple_uid=triple.triple_uid, service_uid=service_uid)
+            for service_uid in dict.fromkeys(triple.service_uids or [])
+        )
+
+
+def sync_affinity_member_rows(db: Session, rows: list[dict]) -> None:
+    """Bulk variant of ``sync_affinity_members`` for ``ndp_affinity_triple`` column dicts."""
+    delete_affinity_members(db, [row["triple_uid"] for row in rows])
+    endpoint_rows = [
+        {"triple_uid": row["triple_uid"], "endpoint_uid": endpoint_uid}
+        for row in rows
+        for endpoint_uid in dict.fromkeys(row["endpoint_uids"] or [])
+    ]
+    service_rows = [
+        {"triple_uid": row["triple_uid"], "service_uid": service_uid}
+        for row in rows
+        for service_uid in dict.fromkeys(row["service_uids"] or [])
+    ]
+    if endpoint_rows:
+        db.execute(insert(AffinityTripleEndpoint), endpoint_rows)
+    if service_rows:
+        db.execute(insert(AffinityTripleService), service_rows)
@@ -0,0 +1,116 @@
+"""Shared implementation of the ``/bulk`` create-or-update endpoints."""
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.schemas.bulk import BulkItemResult, BulkResponse
+
+MAX_BULK_ITEMS = 10000
+BULK_CHUNK_ROWS = 1000
+IN_CHUNK_SIZE = 5000
+
+
+def chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def existing_uids(db: Session, column, uids) -> set[UUID]:
+    """Return which of ``uids`` exist in ``column`` using one ``IN (...)`` query per chunk."""
+    found: set[UUID] = set()
+    for chunk in chunks(list(set(uids)), IN_CHUNK_SIZE):
+        found.update(db.execute(select(column).where(column.in_(chunk))).scalars())
+    return found
+
+
+def _existing_keys(db: Session, table, key_columns: list[str], keys: list[tuple]) -> set[tuple]:
+    columns = [table.c[name] for name in key_columns]
+    found: set[tuple] = set()
+    for chunk in chunks(keys, IN_CHUNK_SIZE):
+        rows = db.execute(select(*columns).where(columns[0].in_({key[0] for key in chunk})))
+        found.update(tuple(row) for row in rows)
+    return found & set(keys)
+
+
+def upsert_statement(db: Session, table, rows: list[dict], key_columns: list[str], update_columns: list[str]):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table).values(rows)
+    if not update_columns:
+        return statement.on_conflict_do_nothing(index_elements=key_columns)
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: statement.excluded[name] for name in update_columns},
+    )
+
+
+def bulk_upsert(
+    db: Session,
+    model,
+    rows: list[dict | None],
+    errors: dict[int, str],
+    key_columns: list[str],
+    update_columns: list[str],
+    after_write: Callable[[list[dict]], None] | None = None,
+) -> BulkResponse:
+    """Insert or update ``rows`` (column name -> value) and report a result per item.
+
+    ``rows[i]`` is ``None`` when item ``i`` already failed validation, with the reason
+    in ``errors[i]``. When a key appears more than once the last item wins. Rows are
+    written with multi-row ``INSERT ... ON CONFLICT`` statements, each chunk in its own
+    savepoint; a chunk that hits an integrity error is retried row by row, so a bad
+    item is reported without rolling back the rest of the batch. ``after_write`` runs
+    inside the same savepoint with the rows just written. The caller commits.
+    """
+    table = model.__table__
+    positions: dict[tuple, int] = {}
+    superseded: dict[int, int] = {}
+    for index, row in enumerate(rows):
+        if row is None:
+            continue
+        key = tuple(row[name] for name in key_columns)
+        if key in positions:
+            superseded[positions[key]] = index
+        positions[key] = index
+
+    existing = _existing_keys(db, table, key_columns, list(positions))
+
+    def write(chunk: list[dict]) -> None:
+        with db.begin_nested():
+            db.execute(upsert_statement(db, table, chunk, key_columns, update_columns))
+            if after_write is not None:
+                after_write(chunk)
+
+    pending = [(index, rows[index]) for index in sorted(positions.values())]
+    for chunk in chunks(pending, BULK_CHUNK_ROWS):
+        try:
+            write([row for _index, row in chunk])
+        except IntegrityError:
+            for index, row in chunk:
+                try:
+                    write([row])
+                except IntegrityError as exc:
+                    errors[index] = str(exc.orig) if exc.orig else "Database integrity error"
+
+    results = []
+    for index, row in enumerate(rows):
+        uid = row.get(key_columns[0]) if row is not None and len(key_columns) == 1 else None
+        if index in errors:
+            results.append(BulkItemResult(index=index, status="error", uid=uid, detail=errors[index]))
+        elif index in superseded:
+            results.append(BulkItemResult(
+                index=index, status="skipped", uid=uid, detail=f"Superseded by item {superseded[index]}"
+            ))
+        else:
+            key = tuple(row[name] for name in key_columns)
+            results.append(BulkItemResult(index=index, status="updated" if key in existing else "created", uid=uid))
+
+    return BulkResponse(
+        created=sum(result.status == "created" for result in results),
+        updated=sum(result.status == "updated" for result in results),
+        errors=sum(result.status == "error" for result in results),
+        results=results,
+    )
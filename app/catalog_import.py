@@ -0,0 +1,387 @@
+"""Streaming NDJSON catalog import.
+
+Every input line is one JSON object whose ``record`` field names its type
+(``dataset``, ``endpoint``, ``service``, ``dataset_endpoint``, ``dataset_service``,
+``service_endpoint`` or ``affinity``); the remaining fields are those of the
+matching ``/bulk`` item. For example::
+
+    {"record": "dataset", "uid": "...", "title": "Volcano InSAR"}
+    {"record": "dataset_endpoint", "dataset_uid": "...", "endpoint_uid": "...", "role": "primary"}
+
+Records are parsed one line at a time and applied in chunks of
+``IMPORT_CHUNK_RECORDS``, each chunk in its own transaction, so memory use does not
+depend on the size of the input. Within a chunk entities are written before the
+links and affinities that reference them; a record may reference anything from
+its own or an earlier chunk. On PostgreSQL each chunk is loaded with ``COPY`` into
+temporary staging tables and merged with set-based ``INSERT ... SELECT ... ON
+CONFLICT`` statements, falling back to one record at a time when a merge
+violates a constraint; other databases go through ``bulk_upsert``. The
+``ndp_neighbor`` rows of every uid a chunk links are refreshed in the same transaction.
+
+Usage::
+
+    python -m app.catalog_import catalog.ndjson
+    zcat catalog.ndjson.gz | python -m app.catalog_import -
+"""
+import argparse
+import io
+import sys
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+import orjson
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.affinity_members import sync_affinity_member_rows
+from app.bulk import bulk_upsert, existing_uids
+from app.database import SessionLocal
+from app.graph_cache import graph_cache
+from app.models.affinity_triple import AffinityTriple
+from app.models.dataset import Dataset
+from app.models.dataset_endpoint import DatasetEndpoint
+from app.models.dataset_service import DatasetService
+from app.models.endpoint import Endpoint
+from app.models.service import Service
+from app.models.service_endpoint import ServiceEndpoint
+from app.neighbors import affinity_member_uids, refresh_neighbors
+from app.schemas.affinity_triple import AffinityTripleBulkItem
+from app.schemas.catalog_import import ImportLineError, ImportReport
+from app.schemas.dataset import DatasetBulkItem
+from app.schemas.dataset_endpoint import DatasetEndpointCreate
+from app.schemas.dataset_service import DatasetServiceCreate
+from app.schemas.endpoint import EndpointBulkItem
+from app.schemas.service import ServiceBulkItem
+from app.schemas.service_endpoint import ServiceEndpointCreate
+
+IMPORT_CHUNK_RECORDS = 5000
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass(frozen=True)
+class Reference:
+    column: str
+    model: type
+    label: str
+    many: bool = False
+
+    def values(self, row: dict) -> list:
+        if self.many:
+            return list(row[self.column] or [])
+        return [row[self.column]] if row[self.column] is not None else []
+
+
+@dataclass(frozen=True)
+class RecordType:
+    model: type
+    schema: type[BaseModel]
+    key_columns: tuple[str, ...]
+    references: tuple[Reference, ...] = ()
+    after_write: Callable[[Session, list[dict]], None] | None = None
+
+    def row(self, item: BaseModel, now: datetime) -> dict:
+        row = item.model_dump()
+        if len(self.key_columns) == 1 and row[self.key_columns[0]] is None:
+            row[self.key_columns[0]] = uuid.uuid4()
+        for column in ("created_at", "updated_at"):
+            if column in self.model.__table__.c:
+                row[column] = now
+        return row
+
+    def update_columns(self, columns: Iterable[str]) -> list[str]:
+        return [column for column in columns if column not in self.key_columns and column != "created_at"]
+
+    def on_conflict(self, columns: Iterable[str]) -> str:
+        """``ON CONFLICT`` clause of the set-based merges: update every column but the key and ``created_at``."""
+        keys = ", ".join(f'"{column}"' for column in self.key_columns)
+        updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in self.update_columns(columns))
+        return f"ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+
+
+RECORD_TYPES: dict[str, RecordType] = {
+    "dataset": RecordType(Dataset, DatasetBulkItem, ("uid",)),
+    "endpoint": RecordType(Endpoint, EndpointBulkItem, ("uid",)),
+    "service": RecordType(Service, ServiceBulkItem, ("uid",)),
+    "dataset_endpoint": RecordType(
+        DatasetEndpoint,
+        DatasetEndpointCreate,
+        ("dataset_uid", "endpoint_uid"),
+        (Reference("dataset_uid", Dataset, "Dataset"), Reference("endpoint_uid", Endpoint, "Endpoint")),
+    ),
+    "dataset_service": RecordType(
+        DatasetService,
+        DatasetServiceCreate,
+        ("dataset_uid", "service_uid"),
+        (Reference("dataset_uid", Dataset, "Dataset"), Reference("service_uid", Service, "Service")),
+    ),
+    "service_endpoint": RecordType(
+        ServiceEndpoint,
+        ServiceEndpointCreate,
+        ("service_uid", "endpoint_uid"),
+        (Reference("service_uid", Service, "Service"), Reference("endpoint_uid", Endpoint, "Endpoint")),
+    ),
+    "affinity": RecordType(
+        AffinityTriple,
+        AffinityTripleBulkItem,
+        ("triple_uid",),
+        (
+            Reference("dataset_uid", Dataset, "Dataset"),
+            Reference("endpoint_uids", Endpoint, "Endpoint", many=True),
+            Reference("service_uids", Service, "Service", many=True),
+        ),
+        after_write=sync_affinity_member_rows,
+    ),
+}
+
+
+def _merge_rows(db: Session, record_type: RecordType, batch: list[tuple[int, dict]]) -> dict[int, str]:
+    """Apply ``batch`` through ``bulk_upsert``; return ``{line: detail}`` for failed records."""
+    errors: dict[int, str] = {}
+    for reference in record_type.references:
+        found = existing_uids(db, reference.model.uid, [v for _line, row in batch for v in reference.values(row)])
+        for index, (_line, row) in enumerate(batch):
+            missing = next((value for value in reference.values(row) if value not in found), None)
+            if index not in errors and missing is not None:
+                errors[index] = f"{reference.label} '{missing}' not found"
+
+    rows = [None if index in errors else row for index, (_line, row) in enumerate(batch)]
+    result = bulk_upsert(
+        db,
+        record_type.model,
+        rows,
+        errors,
+        list(record_type.key_columns),
+        record_type.update_columns(batch[0][1]),
+        after_write=(lambda chunk: record_type.after_write(db, chunk)) if record_type.after_write else None,
+    )
+    return {batch[item.index][0]: item.detail for item in result.results if item.status == "error"}
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, dict):
+        value = orjson.dumps(value).decode()
+    elif isinstance(value, list):
+        value = "{" + ",".join(str(item) for item in value) + "}"
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    else:
+        value = str(value)
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(db: Session, staging: str, columns: list[str], batch: list[tuple[int, dict]]) -> None:
+    buffer = io.StringIO()
+    for line, row in batch:
+        buffer.write("\t".join([str(line), *(_copy_value(row[column]) for column in columns)]) + "\n")
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    statement = f"COPY {staging} (import_line, {column_list}) FROM STDIN"
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(statement, buffer)
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _merge_affinity_members_postgres(db: Session, staging: str) -> None:
+    for table, column, array in (
+        ("ndp_affinity_triple_endpoint", "endpoint_uid", "endpoint_uids"),
+        ("ndp_affinity_triple_service", "service_uid", "service_uids"),
+    ):
+        db.execute(text(f"DELETE FROM {table} WHERE triple_uid IN (SELECT triple_uid FROM {staging})"))
+        db.execute(text(
+            f"INSERT INTO {table} (triple_uid, {column}) "
+            f"SELECT DISTINCT t.triple_uid, m.uid FROM ndp_affinity_triple t "
+            f"CROSS JOIN LATERAL unnest(t.{array}) AS m(uid) "
+            f"WHERE t.triple_uid IN (SELECT triple_uid FROM {staging})"
+        ))
+
+
+def _merge_staged_rows(db: Session, record_type: RecordType, staging: str, columns: list[str]) -> dict[int, str]:
+    """Merge ``staging`` one import line at a time; return ``{line: detail}`` for the lines that fail.
+
+    The fallback of ``_merge_postgres`` when the set-based merge violates a
+    constraint: like ``bulk_upsert`` retrying a chunk, every line that wins its key
+    (the last one) is written in its own savepoint, so a bad record is reported
+    without rolling back the rest of the chunk.
+    """
+    table = record_type.model.__table__.name
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    same_key = " AND ".join(f'd."{column}" = s."{column}"' for column in record_type.key_columns)
+    lines = db.execute(text(
+        f"SELECT s.import_line FROM {staging} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {staging} d WHERE {same_key} AND d.import_line > s.import_line) "
+        f"ORDER BY s.import_line"
+    )).scalars().all()
+
+    errors: dict[int, str] = {}
+    for line in lines:
+        try:
+            with db.begin_nested():
+                db.execute(text(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging} WHERE import_line = :line "
+                    f"{record_type.on_conflict(columns)}"
+                ), {"line": line})
+        except (IntegrityError, DataError) as exc:
+            errors[line] = str(exc.orig) if exc.orig else "Database integrity error"
+    return errors
+
+
+def _merge_postgres(db: Session, record_type: RecordType, batch: list[tuple[int, dict]]) -> dict[int, str]:
+    """COPY ``batch`` into a staging table and merge it into the target with set-based statements."""
+    table = record_type.model.__table__.name
+    staging = f"import_{table}"
+    columns = list(batch[0][1])
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    keys = ", ".join(f'"{column}"' for column in record_type.key_columns)
+
+    db.execute(text(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT 0 AS import_line, {column_list} FROM {table} WITH NO DATA"
+    ))
+    _copy_rows(db, staging, columns, batch)
+
+    errors: dict[int, str] = {}
+    for reference in record_type.references:
+        target = reference.model.__table__.name
+        if reference.many:
+            missing = db.execute(text(
+                f"SELECT s.import_line, m.uid FROM {staging} s "
+                f"CROSS JOIN LATERAL unnest(s.{reference.column}) AS m(uid) "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {target} r WHERE r.uid = m.uid)"
+            ))
+        else:
+            missing = db.execute(text(
+                f"SELECT s.import_line, s.{reference.column} FROM {staging} s "
+                f"WHERE s.{reference.column} IS NOT NULL "
+                f"AND NOT EXISTS (SELECT 1 FROM {target} r WHERE r.uid = s.{reference.column})"
+            ))
+        for line, value in missing:
+            errors.setdefault(line, f"{reference.label} '{value}' not found")
+    if errors:
+        db.execute(text(f"DELETE FROM {staging} WHERE import_line = ANY(:lines)"), {"lines": list(errors)})
+
+    try:
+        with db.begin_nested():
+            db.execute(text(
+                f"INSERT INTO {table} ({column_list}) "
+                f"SELECT DISTINCT ON ({keys}) {column_list} FROM {staging} ORDER BY {keys}, import_line DESC "
+                f"{record_type.on_conflict(columns)}"
+            ))
+    except (IntegrityError, DataError):
+        failed = _merge_staged_rows(db, record_type, staging, columns)
+        if failed:
+            errors.update(failed)
+            db.execute(text(
+                f"DELETE FROM {staging} WHERE ({keys}) IN "
+                f"(SELECT {keys} FROM {staging} WHERE import_line = ANY(:lines))"
+            ), {"lines": list(failed)})
+    if record_type.after_write is sync_affinity_member_rows:
+        _merge_affinity_members_postgres(db, staging)
+    return errors
+
+
+class CatalogImporter:
+    """Accumulates parsed records and applies them one chunk (one transaction) at a time."""
+
+    def __init__(self, db: Session, chunk_size: int = IMPORT_CHUNK_RECORDS):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.report = ImportReport(applied={name: 0 for name in RECORD_TYPES})
+        self._line = 0
+        self._pending: list[tuple[int, str, BaseModel]] = []
+
+    def _error(self, line: int, detail: str) -> None:
+        self.report.error_count += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(ImportLineError(line=line, detail=detail))
+
+    def add(self, raw: str | bytes) -> bool:
+        """Parse one input line; return True once a full chunk is waiting for ``flush()``."""
+        self._line += 1
+        if not raw.strip():
+            return False
+        self.report.records += 1
+        try:
+            record = orjson.loads(raw)
+            name = record.pop("record", None) if isinstance(record, dict) else None
+            if name not in RECORD_TYPES:
+                raise ValueError(f"Unknown record type {name!r}")
+            self._pending.append((self._line, name, RECORD_TYPES[name].schema.model_validate(record)))
+        except ValidationError as exc:
+            self._error(self._line, "; ".join(error["msg"] for error in exc.errors()))
+        except ValueError as exc:
+            self._error(self._line, str(exc))
+        return len(self._pending) >= self.chunk_size
+
+    def flush(self) -> None:
+        """Apply the pending records in a single transaction."""
+        if not self._pending:
+            return
+        now = datetime.utcnow()
+        merge = _merge_postgres if self.db.get_bind().dialect.name == "postgresql" else _merge_rows
+        linked: set[uuid.UUID] = set()
+        for name, record_type in RECORD_TYPES.items():
+            batch = [(line, record_type.row(item, now)) for line, kind, item in self._pending if kind == name]
+            if not batch:
+                continue
+            # Links and affinities change the neighbours of every uid they reference (and,
+            # for a replaced triple, of its previous members).
+            linked.update(value for _line, row in batch for ref in record_type.references for value in ref.values(row))
+            if record_type.model is AffinityTriple:
+                linked |= affinity_member_uids(self.db, [row["triple_uid"] for _line, row in batch])
+            errors = merge(self.db, record_type, batch)
+            for line, detail in sorted(errors.items()):
+                self._error(line, detail)
+            self.report.applied[name] += len(batch) - len(errors)
+        self._pending = []
+        refresh_neighbors(self.db, linked)
+        self.db.commit()
+        graph_cache.invalidate()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import an NDJSON catalog of datasets, endpoints, services and links.")
+    parser.add_argument("path", help="NDJSON file to import, or '-' for standard input.")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_RECORDS, help="Records per transaction.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    db = SessionLocal()
+    try:
+        importer = CatalogImporter(db, chunk_size=args.chunk_size)
+        for line in stream:
+            if importer.add(line):
+                importer.flush()
+        importer.flush()
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    report = importer.report
+    print(f"Records read: {report.records}")
+    for name, applied in report.applied.items():
+        print(f"  {name}: {applied}")
+    print(f"Errors: {report.error_count}")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Response compression: Brotli when the client accepts it, gzip otherwise."""
+import brotli
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+ENCODINGS = ("br", "gzip")
+
+
+def _accepted(header: str) -> set[str]:
+    """Content codings in an ``Accept-Encoding`` header, minus those refused with ``q=0``."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        name, _, value = params.partition("=")
+        try:
+            quality = float(value) if name.strip().lower() == "q" else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor: brotli.Compressor | None = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality, mode=brotli.MODE_TEXT)
+        # Flush each streamed chunk so NDJSON exports reach the client as they are produced.
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """``GZipMiddleware`` that prefers Brotli and only offers the configured encodings.
+
+    Bodies shorter than ``minimum_size`` bytes are sent uncompressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: list[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.encodings = [encoding for encoding in ENCODINGS if encoding in encodings]
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted(Headers(scope=scope).get("Accept-Encoding", ""))
+        encoding = next((encoding for encoding in self.encodings if encoding in accepted), None)
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
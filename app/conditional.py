@@ -0,0 +1,74 @@
+"""Conditional GET: weak ETags, ``Last-Modified`` and ``304 Not Modified`` answers."""
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Distinguishes this process's graph cache versions from another worker's (or a
+# previous run's), which count from zero independently.
+PROCESS_EPOCH = uuid.uuid4().hex
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from ``parts``.
+
+    Weak because the compression middleware sends the same representation as
+    Brotli, gzip or identity bytes under one validator.
+    """
+    return 'W/"' + hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32] + '"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: W/ prefixes on either side are ignored.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have one-second resolution.
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, last_modified: datetime | None = None
+) -> Response | None:
+    """Set the validators on ``response`` and return a 304 when the client's copy is current.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only consulted
+    without it (RFC 9110, section 13.2.2). Returns None when the full body must be sent.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def entity_etag(model, uid, updated_at: datetime) -> str:
+    """ETag of an entity row; ``updated_at`` changes on every update (trigger on PostgreSQL)."""
+    return make_etag(model.__tablename__, uid, _as_utc(updated_at).isoformat())
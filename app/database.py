@@ -1,9 +1,92 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import itertools
+import threading
+import time
+import uuid
+from functools import lru_cache
 
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app import query_stats
 from app.config import settings
 
-engine = create_engine(settings.database_url)
+# Async drivers used for the async session, by backend.
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg"}
+
+# Set after a successful write; reads carrying it go to the primary until it expires.
+PRIMARY_PIN_COOKIE = "ndp_read_primary_until"
+# The same pin for clients that do not keep cookies: write responses carry the expiry
+# in ``X-Read-Primary-Until``, and reads sent with ``X-Read-Primary: 1`` use the primary.
+PRIMARY_PIN_UNTIL_HEADER = "X-Read-Primary-Until"
+PRIMARY_PIN_HEADER = "X-Read-Primary"
+
+# Query counts, timings and the slow-query log for every engine: primary, async and replicas.
+event.listen(Engine, "before_cursor_execute", query_stats.before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", query_stats.after_cursor_execute)
+
+
+def set_statement_timeout(conn) -> None:
+    """``begin`` listener: ``DB_STATEMENT_TIMEOUT_MS`` for the transaction, under ``DB_PGBOUNCER``.
+
+    PgBouncer rejects the ``options`` startup parameter (unless listed in its
+    ``ignore_startup_parameters``, which would drop the timeout silently) and hands
+    each transaction to any server connection, so the timeout is set per transaction.
+    """
+    if settings.db_pgbouncer and settings.db_statement_timeout_ms and conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.db_statement_timeout_ms)}")
+
+
+event.listen(Engine, "begin", set_statement_timeout)
+
+
+def engine_options(url: URL) -> tuple[URL, dict]:
+    """Return ``url`` and ``create_engine`` keyword arguments for the pool settings.
+
+    SQLite keeps SQLAlchemy's defaults. With ``DB_PGBOUNCER`` connections are not
+    pooled in process (``NullPool``) and the driver's prepared statements are turned
+    off, as PgBouncer in transaction mode requires; ``DB_STATEMENT_TIMEOUT_MS`` is
+    then applied per transaction by ``set_statement_timeout`` rather than at connect.
+    """
+    if url.get_backend_name() != "postgresql":
+        return url, {}
+
+    options: dict = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_pgbouncer:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    connect_args: dict = {}
+    driver = url.get_driver_name()
+    if driver == "asyncpg":
+        if settings.db_statement_timeout_ms and not settings.db_pgbouncer:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        if settings.db_pgbouncer:
+            url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        if settings.db_statement_timeout_ms and not settings.db_pgbouncer:
+            connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+        if settings.db_pgbouncer and driver == "psycopg":
+            connect_args["prepare_threshold"] = None
+    if connect_args:
+        options["connect_args"] = connect_args
+    return url, options
+
+
+_url, _options = engine_options(make_url(settings.database_url))
+engine = create_engine(_url, **_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -15,3 +98,188 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@lru_cache
+def async_engine() -> AsyncEngine | None:
+    """Async engine for ``DATABASE_URL``, or None when its backend has no async driver."""
+    url = make_url(settings.database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return None
+    url, options = engine_options(url.set(drivername=driver))
+    return create_async_engine(url, **options)
+
+
+@lru_cache
+def async_session_factory() -> async_sessionmaker[AsyncSession] | None:
+    bind = async_engine()
+    if bind is None:
+        return None
+    return async_sessionmaker(bind, autoflush=False, expire_on_commit=False)
+
+
+def pool_status() -> dict[str, dict]:
+    """Usage of the sync and (when created) async connection pools."""
+    engines = {"sync": engine.pool}
+    if async_engine.cache_info().currsize and async_engine() is not None:
+        engines["async"] = async_engine().sync_engine.pool
+    status = {}
+    for name, pool in engines.items():
+        gauges = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            gauges.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        status[name] = gauges
+    return status
+
+
+class SessionRunner:
+    """Runs synchronous ORM code against the request's session from an ``async def`` route.
+
+    With an ``AsyncSession`` the function runs through ``run_sync``: queries are awaited
+    on the event loop, so concurrent requests are bounded by the connection pool rather
+    than by the thread pool. With a plain ``Session`` (SQLite, tests) the function runs
+    in the thread pool, like a sync route would.
+    """
+
+    def __init__(self, session: AsyncSession | Session, primary: "SessionRunner | None" = None):
+        self.session = session
+        self._primary = primary
+
+    @property
+    def primary(self) -> "SessionRunner":
+        """Runner on the primary database (``self`` unless this one reads from a replica)."""
+        return self._primary or self
+
+    async def run(self, fn, *args, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_session_runner():
+    factory = async_session_factory()
+    if factory is None:
+        db = SessionLocal()
+        try:
+            yield SessionRunner(db)
+        finally:
+            db.close()
+        return
+
+    async with factory() as session:
+        yield SessionRunner(session)
+
+
+def _checked_out(pool) -> int:
+    return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+class ReadReplicas:
+    """Read-only replicas, picked least-loaded (fewest checked-out connections) with round-robin ties."""
+
+    def __init__(self, engines: list[Engine], async_engines: list[AsyncEngine | None] | None = None):
+        self.engines = engines
+        self.sessions = [sessionmaker(autocommit=False, autoflush=False, bind=bind) for bind in engines]
+        self.async_engines = async_engines or [None] * len(engines)
+        self.async_sessions = [
+            async_sessionmaker(bind, autoflush=False, expire_on_commit=False) if bind is not None else None
+            for bind in self.async_engines
+        ]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_urls(cls, urls: list[str]) -> "ReadReplicas":
+        engines, async_engines = [], []
+        for raw in urls:
+            url = make_url(raw)
+            sync_url, options = engine_options(url)
+            engines.append(create_engine(sync_url, **options))
+            driver = ASYNC_DRIVERS.get(url.get_backend_name())
+            if driver is None:
+                async_engines.append(None)
+            else:
+                async_url, options = engine_options(url.set(drivername=driver))
+                async_engines.append(create_async_engine(async_url, **options))
+        return cls(engines, async_engines)
+
+    def choose(self, use_async: bool = False) -> int:
+        with self._lock:
+            start = next(self._counter)
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+
+        def load(index: int) -> int:
+            bind = self.async_engines[index] if use_async else self.engines[index]
+            return _checked_out(bind.sync_engine.pool if use_async else bind.pool)
+
+        return min(order, key=load)
+
+
+@lru_cache
+def read_replicas() -> ReadReplicas | None:
+    urls = settings.get_read_database_urls()
+    return ReadReplicas.from_urls(urls) if urls else None
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """True when the client wrote recently enough that a replica might not have its change yet.
+
+    Either the pin cookie has not expired or the client asks for the primary with
+    ``X-Read-Primary: 1``.
+    """
+    if request.headers.get(PRIMARY_PIN_HEADER, "").strip().lower() in ("1", "true"):
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Session for GET handlers: a replica when configured, otherwise (or when pinned) the primary.
+
+    A replica session keeps the primary one in ``info["primary"]`` (see ``primary_session``).
+    """
+    replicas = read_replicas()
+    if replicas is None or pinned_to_primary(request):
+        yield db
+        return
+
+    read_db = replicas.sessions[replicas.choose()]()
+    read_db.info["primary"] = db
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+def primary_session(db: Session) -> Session:
+    """The primary-database session behind ``db`` (``db`` itself unless it reads from a replica)."""
+    return db.info.get("primary", db)
+
+
+async def get_read_session_runner(request: Request, runner: SessionRunner = Depends(get_session_runner)):
+    """``get_read_db`` for async routes; the returned runner's ``primary`` is the primary-database runner."""
+    replicas = read_replicas()
+    if replicas is None or pinned_to_primary(request):
+        yield runner
+        return
+
+    use_async = isinstance(runner.session, AsyncSession)
+    index = replicas.choose(use_async)
+    if use_async and replicas.async_sessions[index] is not None:
+        async with replicas.async_sessions[index]() as session:
+            yield SessionRunner(session, primary=runner)
+        return
+
+    read_db = replicas.sessions[index]()
+    try:
+        yield SessionRunner(read_db, primary=runner)
+    finally:
+        read_db.close()
@@ -0,0 +1,81 @@
+"""Filters for the entity list endpoints.
+
+``metadata={"theme": "volcano"}`` keeps rows whose metadata contains the given
+JSON (``metadata @> :json`` on PostgreSQL), ``metadata_has=a,b`` rows whose
+metadata has all the given top-level keys, and column parameters such as
+``kind=`` compare the column for equality.
+"""
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import and_, cast, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Query
+from sqlalchemy.types import Text
+
+
+def _sqlite_scalar(value_type, value, scalar):
+    """``scalar`` equals the JSON value whose SQL value and ``json_type`` are given."""
+    if scalar is None:
+        return value_type == "null"
+    if isinstance(scalar, bool):
+        return value_type == ("true" if scalar else "false")
+    return value == scalar
+
+
+def _sqlite_contains(document, path: str, value):
+    """``document`` contains ``value`` at ``path``, with PostgreSQL's ``@>`` semantics, using SQLite's JSON1."""
+    if isinstance(value, dict):
+        return and_(func.json_type(document, path) == "object", *[
+            _sqlite_contains(document, f"{path}.{json.dumps(key)}", item) for key, item in value.items()
+        ])
+    if isinstance(value, list):
+        criteria = []
+        for item in value:
+            element = func.json_each(document, path).table_valued("value", "type").alias()
+            if isinstance(item, (dict, list)):
+                matches = _sqlite_contains(element.c.value, "$", item)
+            else:
+                matches = _sqlite_scalar(element.c.type, element.c.value, item)
+            criteria.append(exists(select(literal(1)).select_from(element).where(matches)))
+        return and_(func.json_type(document, path) == "array", *criteria)
+    return _sqlite_scalar(func.json_type(document, path), func.json_extract(document, path), value)
+
+
+class ListFilters:
+    """The filters of one list request, validated up front and applied to a query."""
+
+    def __init__(self, model, metadata: dict | None, metadata_has: list[str], columns: dict):
+        self.model = model
+        self.metadata = metadata
+        self.metadata_has = metadata_has
+        self.columns = columns
+
+    @classmethod
+    def parse(cls, model, metadata: str | None, metadata_has: str | None, **columns) -> "ListFilters":
+        """Parse the query parameters; ``columns`` maps column names to the requested value or None."""
+        document = None
+        if metadata is not None:
+            try:
+                document = json.loads(metadata)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="metadata must be a JSON object")
+            if not isinstance(document, dict):
+                raise HTTPException(status_code=400, detail="metadata must be a JSON object")
+        keys = [key.strip() for key in (metadata_has or "").split(",") if key.strip()]
+        return cls(model, document, keys, {name: value for name, value in columns.items() if value is not None})
+
+    def apply(self, query: Query) -> Query:
+        criteria = [getattr(self.model, name) == value for name, value in self.columns.items()]
+        column = self.model.metadata_
+        if query.session.get_bind().dialect.name == "postgresql":
+            if self.metadata:
+                criteria.append(column.op("@>")(cast(literal(json.dumps(self.metadata)), JSONB)))
+            if self.metadata_has:
+                criteria.append(column.op("?&")(literal(self.metadata_has, ARRAY(Text))))
+        else:
+            if self.metadata:
+                criteria.append(_sqlite_contains(column, "$", self.metadata))
+            for key in self.metadata_has:
+                criteria.append(func.json_type(column, f"$.{json.dumps(key)}").is_not(None))
+        return query.filter(*criteria) if criteria else query
@@ -0,0 +1,170 @@
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import literal, or_, select, true, union_all
+from sqlalchemy.orm import Session
+
+from app.models.affinity_triple import AffinityTriple
+from app.models.affinity_triple_endpoint import AffinityTripleEndpoint
+from app.models.affinity_triple_service import AffinityTripleService
+from app.models.dataset import Dataset
+from app.models.dataset_endpoint import DatasetEndpoint
+from app.models.dataset_service import DatasetService
+from app.models.endpoint import Endpoint
+from app.models.service import Service
+from app.models.service_endpoint import ServiceEndpoint
+from app.schemas.linked import LinkedEntitiesResponse, LinkedNode
+
+NODE_TYPES = ("dataset", "endpoint", "service")
+
+NODE_MODELS = {"dataset": Dataset, "endpoint": Endpoint, "service": Service}
+
+Edge = tuple[UUID, str, UUID, str]
+
+
+def linked_node(row) -> LinkedNode:
+    """Build a ``LinkedNode`` from a row carrying ``uid``, ``display_name`` and ``ckan_name``."""
+    return LinkedNode(uid=row.uid, name=row.display_name, ckan_name=row.ckan_name)
+
+
+def linked_response(uid: UUID, input_type: str, nodes: dict[str, list[LinkedNode]]) -> LinkedEntitiesResponse:
+    return LinkedEntitiesResponse(
+        input_uid=uid,
+        input_type=input_type,
+        datasets=sorted(nodes["dataset"], key=lambda x: str(x.uid)),
+        endpoints=sorted(nodes["endpoint"], key=lambda x: str(x.uid)),
+        services=sorted(nodes["service"], key=lambda x: str(x.uid)),
+    )
+
+
+def classify_uids(db: Session, uids: set[UUID]) -> dict[UUID, str]:
+    """Map each known uid to its node type with one query over the three entity tables."""
+    rows = db.execute(
+        union_all(
+            select(Dataset.uid, literal("dataset").label("node_type"), literal(0).label("rank")).where(Dataset.uid.in_(uids)),
+            select(Endpoint.uid, literal("endpoint"), literal(1)).where(Endpoint.uid.in_(uids)),
+            select(Service.uid, literal("service"), literal(2)).where(Service.uid.in_(uids)),
+        )
+    ).all()
+    types: dict[UUID, str] = {}
+    for row in sorted(rows, key=lambda r: r.rank):
+        types.setdefault(row.uid, row.node_type)
+    return types
+
+
+def collect_edges(db: Session, types: dict[UUID, str], whole_graph: bool = False) -> list[Edge]:
+    """Return ``(uid, neighbour_type, neighbour_uid, via)`` edges for every uid in ``types``.
+
+    Runs one query per junction table and one over affinity triple membership,
+    each filtered by ``IN`` on the input uids. With ``whole_graph`` the filters
+    are dropped and ``types`` is expected to hold every node.
+    """
+    by_type: dict[str, set[UUID]] = {node_type: set() for node_type in NODE_TYPES}
+    for uid, node_type in types.items():
+        by_type[node_type].add(uid)
+    datasets, endpoints, services = by_type["dataset"], by_type["endpoint"], by_type["service"]
+
+    def member_of(column, uids):
+        return true() if whole_graph else column.in_(uids)
+
+    edges: list[Edge] = []
+
+    junctions = (
+        (DatasetEndpoint, DatasetEndpoint.dataset_uid, "dataset", datasets, DatasetEndpoint.endpoint_uid, "endpoint", endpoints),
+        (DatasetService, DatasetService.dataset_uid, "dataset", datasets, DatasetService.service_uid, "service", services),
+        (ServiceEndpoint, ServiceEndpoint.service_uid, "service", services, ServiceEndpoint.endpoint_uid, "endpoint", endpoints),
+    )
+    for model, left, left_type, left_uids, right, right_type, right_uids in junctions:
+        if not left_uids and not right_uids:
+            continue
+        via = model.__tablename__.removeprefix("ndp_")
+        query = db.query(left, right).filter(or_(member_of(left, left_uids), member_of(right, right_uids)))
+        for a, b in query.all():
+            if a in left_uids:
+                edges.append((a, right_type, b, via))
+            if b in right_uids:
+                edges.append((b, left_type, a, via))
+
+    candidates = union_all(
+        select(AffinityTriple.triple_uid).where(member_of(AffinityTriple.dataset_uid, datasets)),
+        select(AffinityTripleEndpoint.triple_uid).where(member_of(AffinityTripleEndpoint.endpoint_uid, endpoints)),
+        select(AffinityTripleService.triple_uid).where(member_of(AffinityTripleService.service_uid, services)),
+    )
+    members: dict[UUID, list[tuple[str, UUID]]] = {}
+    for triple_uid, node_type, member_uid in db.execute(
+        union_all(
+            select(AffinityTriple.triple_uid, literal("dataset").label("node_type"), AffinityTriple.dataset_uid.label("uid"))
+            .where(AffinityTriple.triple_uid.in_(candidates), AffinityTriple.dataset_uid.is_not(None)),
+            select(AffinityTripleEndpoint.triple_uid, literal("endpoint"), AffinityTripleEndpoint.endpoint_uid)
+            .where(AffinityTripleEndpoint.triple_uid.in_(candidates)),
+            select(AffinityTripleService.triple_uid, literal("service"), AffinityTripleService.service_uid)
+            .where(AffinityTripleService.triple_uid.in_(candidates)),
+        )
+    ).all():
+        members.setdefault(triple_uid, []).append((node_type, member_uid))
+
+    for triple_members in members.values():
+        for node_type, uid in triple_members:
+            if types.get(uid) != node_type:
+                continue
+            for member_type, member_uid in triple_members:
+                # A dataset's affinity neighbours are the triple's endpoints and services only
+                if node_type == "dataset" and member_type == "dataset":
+                    continue
+                if member_uid != uid:
+                    edges.append((uid, member_type, member_uid, "affinity"))
+
+    return edges
+
+
+def load_nodes(db: Session, node_type: str, uids: set[UUID] | None = None) -> dict[UUID, LinkedNode]:
+    """Load the ``LinkedNode`` display fields of one entity type; ``None`` loads every row."""
+    model = NODE_MODELS[node_type]
+    query = select(model.uid, model.display_name, model.ckan_name)
+    if uids is not None:
+        query = query.where(model.uid.in_(uids))
+    return {row.uid: linked_node(row) for row in db.execute(query).all()}
+
+
+def traverse(
+    uid: UUID,
+    input_type: str,
+    expand: Callable[[dict[UUID, str]], list[Edge]],
+    depth: int,
+    max_nodes: int,
+) -> tuple[dict[UUID, tuple[str, int]], list[tuple[UUID, UUID, str, int]], bool]:
+    """Breadth-first expansion from ``uid`` one frontier at a time.
+
+    ``expand`` returns the edges of a whole frontier in one call (a set-based
+    query or a cache lookup). Returns ``{uid: (node_type, hop)}``, the
+    ``(source, target, via, hop)`` edges between visited nodes, each pointing
+    away from the node closer to ``uid``, and whether ``max_nodes`` cut the
+    expansion short.
+    """
+    visited: dict[UUID, tuple[str, int]] = {uid: (input_type, 0)}
+    edges: dict[tuple[UUID, UUID, str], tuple[UUID, UUID, str, int]] = {}
+    frontier = {uid: input_type}
+    truncated = False
+
+    for hop in range(1, depth + 1):
+        next_frontier: dict[UUID, str] = {}
+        for source, node_type, target, via in expand(frontier):
+            if target not in visited:
+                if len(visited) >= max_nodes:
+                    truncated = True
+                    continue
+                visited[target] = (node_type, hop)
+                next_frontier[target] = node_type
+            key = (min(source, target, key=str), max(source, target, key=str), via)
+            edges.setdefault(key, (source, target, via, hop))
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    def oriented(edge):
+        source, target, via, hop = edge
+        if (visited[source][1], str(source)) > (visited[target][1], str(target)):
+            source, target = target, source
+        return source, target, via, hop
+
+    return visited, [oriented(edge) for edge in edges.values()], truncated
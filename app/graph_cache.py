@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.graph import NODE_TYPES, Edge, collect_edges, linked_response, load_nodes
+from app.metrics import record_cache_lookup
+from app.schemas.linked import LinkedEntitiesResponse, LinkedNode
+
+
+class Graph:
+    """Immutable adjacency index of the whole dataset/endpoint/service graph."""
+
+    def __init__(self, types: dict[UUID, str], nodes: dict[UUID, LinkedNode], edges: list[Edge]):
+        self.types = types
+        self.nodes = nodes
+        self.adjacency: dict[UUID, set[tuple[str, UUID, str]]] = {uid: set() for uid in types}
+        for uid, node_type, neighbour_uid, via in edges:
+            if neighbour_uid != uid and neighbour_uid in nodes:
+                self.adjacency[uid].add((node_type, neighbour_uid, via))
+        self._linked: dict[UUID, LinkedEntitiesResponse] = {}
+
+    @classmethod
+    def load(cls, db: Session) -> "Graph":
+        types: dict[UUID, str] = {}
+        nodes: dict[UUID, LinkedNode] = {}
+        for node_type in NODE_TYPES:
+            for uid, node in load_nodes(db, node_type).items():
+                if uid not in types:
+                    types[uid] = node_type
+                    nodes[uid] = node
+        return cls(types, nodes, collect_edges(db, types, whole_graph=True))
+
+    def linked(self, uid: UUID) -> LinkedEntitiesResponse | None:
+        """Return the ``/linked`` response for ``uid``, or ``None`` when the uid is unknown."""
+        response = self._linked.get(uid)
+        if response is None and uid in self.types:
+            grouped: dict[str, list[LinkedNode]] = {node_type: [] for node_type in NODE_TYPES}
+            for node_type, neighbour_uid in {(t, n) for t, n, _via in self.adjacency[uid]}:
+                grouped[node_type].append(self.nodes[neighbour_uid])
+            response = self._linked[uid] = linked_response(uid, self.types[uid], grouped)
+        return response
+
+    def edges(self, frontier: dict[UUID, str]) -> list[Edge]:
+        """Return the edges of ``frontier`` in the ``collect_edges`` shape."""
+        return [
+            (uid, node_type, neighbour_uid, via)
+            for uid in frontier
+            for node_type, neighbour_uid, via in self.adjacency.get(uid, ())
+        ]
+
+
+class GraphCache:
+    """Process-wide, lazily rebuilt ``Graph`` shared by the linked lookups.
+
+    Write handlers call ``invalidate()`` after committing; the next read rebuilds
+    the graph from the database. ``version`` increases on every invalidation, and
+    a rebuild that raced with an invalidation is used once but not kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._async_build_lock = asyncio.Lock()
+        self._graph: Graph | None = None
+        self.version = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._graph = None
+            self.version += 1
+
+    async def graph_async(self, runner) -> Graph:
+        """The cached graph, rebuilt through ``runner`` (the request's ``SessionRunner``) when stale.
+
+        Concurrent misses wait on an ``asyncio.Lock`` for a single rebuild; a thread
+        lock would block the event loop while the rebuild awaits the database.
+        """
+        graph = self._graph
+        if graph is not None:
+            record_cache_lookup("graph", True)
+            return graph
+
+        async with self._async_build_lock:
+            graph = self._graph
+            if graph is not None:
+                record_cache_lookup("graph", True)
+                return graph
+            record_cache_lookup("graph", False)
+            version = self.version
+            graph = await runner.run(Graph.load)
+            self._install(graph, version)
+            return graph
+
+    def _install(self, graph: Graph, version: int) -> None:
+        with self._lock:
+            if self.version == version:
+                self._graph = graph
+
+
+graph_cache = GraphCache()
@@ -1,11 +1,19 @@
 import re
+import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
 
+from app import metrics
+from app.compression import CompressionMiddleware
 from app.config import settings
+from app.database import PRIMARY_PIN_COOKIE, PRIMARY_PIN_UNTIL_HEADER, engine, pool_status, read_replicas
+from app.notifications import start_change_listener
+from app.pagination import NEXT_CURSOR_HEADER
+from app.query_stats import QueryStats, current_stats
 from app.routers import (
     endpoints_router,
     datasets_router,
@@ -15,13 +23,29 @@ from app.routers import (
     service_endpoints_router,
     affinities_router,
     linked_router,
+    graph_router,
+    stats_router,
+    catalog_import_router,
+    export_router,
+    search_router,
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = start_change_listener(engine)
+    yield
+    if listener:
+        listener.stop()
+    metrics.mark_process_dead()
+
+
 app = FastAPI(
     title="NDP Affinities API",
     description="API for managing NDP affinities data",
     version="0.1.1",
     root_path="/affinity-api",
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -29,8 +53,71 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PRIMARY_PIN_UNTIL_HEADER],
+)
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=settings.get_compression_encodings(),
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
 )
 
+# POST routes that only read; they do not pin the client to the primary.
+READ_ONLY_POST_PATHS = ("/linked/batch",)
+
+
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    """After a successful write, send the client's reads to the primary for a while.
+
+    Replicas lag the primary slightly; without this a client could create a row
+    and then get a 404 reading it back from a replica. Browsers get a cookie;
+    other clients read the expiry from ``X-Read-Primary-Until`` and send
+    ``X-Read-Primary: 1`` with their reads until then.
+    """
+    response = await call_next(request)
+    if (
+        request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+        and not request.url.path.endswith(READ_ONLY_POST_PATHS)
+        and read_replicas() is not None
+    ):
+        until = time.time() + settings.read_primary_pin_seconds
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            f"{until:.3f}",
+            max_age=max(1, int(settings.read_primary_pin_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
+        response.headers[PRIMARY_PIN_UNTIL_HEADER] = f"{until:.3f}"
+    return response
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Report the request's query count and database time in a ``Server-Timing`` header.
+
+    Queries run while a streamed body is being sent (exports) come after the
+    headers and are not included.
+    """
+    if not settings.server_timing_enabled:
+        return await call_next(request)
+    stats = QueryStats()
+    token = current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_stats.reset(token)
+    response.headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+    return response
+
+
+# Outermost, so latency and response size cover the other middleware (compression included).
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 @app.exception_handler(IntegrityError)
 async def integrity_error_handler(request: Request, exc: IntegrityError):
@@ -58,8 +145,24 @@ app.include_router(dataset_services_router)
 app.include_router(service_endpoints_router)
 app.include_router(affinities_router)
 app.include_router(linked_router)
+app.include_router(graph_router)
+app.include_router(stats_router)
+app.include_router(catalog_import_router)
+app.include_router(export_router)
+app.include_router(search_router)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/pool")
+def pool_health():
+    return pool_status()
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    content, media_type = metrics.render()
+    return Response(content, media_type=media_type)
@@ -0,0 +1,126 @@
+"""Prometheus metrics, served in the text format by ``GET /metrics``.
+
+Requests are labelled by route template (``/linked/{uid}``), not by path, so
+the label sets stay bounded; unmatched paths share the ``unmatched`` label.
+
+With several uvicorn workers set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory, shared by the workers and cleared before they start: every worker
+then writes its samples there and ``/metrics`` aggregates all of them, whichever
+worker answers the scrape.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import pool_status
+
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route"],
+)
+REQUESTS = Counter("http_requests_total", "Requests answered, by status code.", ["method", "route", "status"])
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size as sent (after compression).",
+    ["method", "route"],
+    buckets=RESPONSE_SIZE_BUCKETS,
+)
+IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled.", multiprocess_mode="livesum")
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections in use, by engine.", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size, by engine.", ["engine"], multiprocess_mode="livesum"
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "In-process cache lookups by result (hit or miss); the hit ratio is hits over all lookups.",
+    ["cache", "result"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _update_pool_gauges() -> None:
+    for name, gauges in pool_status().items():
+        if "checked_out" in gauges:
+            DB_POOL_CHECKED_OUT.labels(name).set(gauges["checked_out"])
+            DB_POOL_OVERFLOW.labels(name).set(max(gauges["overflow"], 0))
+
+
+class MetricsMiddleware:
+    """Records latency, status, response size and in-flight count for every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_PROGRESS.dec()
+            method, route = scope["method"], _route_template(scope)
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status)).inc()
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            _update_pool_gauges()
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory when it exits."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render() -> tuple[bytes, str]:
+    """The metrics in the Prometheus text format, and their content type."""
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -5,6 +5,9 @@ from app.models.dataset_endpoint import DatasetEndpoint
 from app.models.dataset_service import DatasetService
 from app.models.service_endpoint import ServiceEndpoint
 from app.models.affinity_triple import AffinityTriple
+from app.models.affinity_triple_endpoint import AffinityTripleEndpoint
+from app.models.affinity_triple_service import AffinityTripleService
+from app.models.neighbor import Neighbor
 
 __all__ = [
     "Endpoint",
@@ -14,4 +17,7 @@ __all__ = [
     "DatasetService",
     "ServiceEndpoint",
     "AffinityTriple",
+    "AffinityTripleEndpoint",
+    "AffinityTripleService",
+    "Neighbor",
 ]
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, ForeignKey
+
+from app.database import Base
+from app.types import GUID
+
+
+class AffinityTripleEndpoint(Base):
+    __tablename__ = "ndp_affinity_triple_endpoint"
+
+    triple_uid = Column(GUID(), ForeignKey("ndp_affinity_triple.triple_uid", ondelete="CASCADE"), primary_key=True)
+    endpoint_uid = Column(GUID(), ForeignKey("ndp_endpoint.uid", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, ForeignKey
+
+from app.database import Base
+from app.types import GUID
+
+
+class AffinityTripleService(Base):
+    __tablename__ = "ndp_affinity_triple_service"
+
+    triple_uid = Column(GUID(), ForeignKey("ndp_affinity_triple.triple_uid", ondelete="CASCADE"), primary_key=True)
+    service_uid = Column(GUID(), ForeignKey("ndp_service.uid", ondelete="CASCADE"), primary_key=True)
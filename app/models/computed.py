@@ -0,0 +1,6 @@
+"""SQL expressions of generated columns shared by the entity tables (see migration 014).
+
+They are written to run unchanged on PostgreSQL and on SQLite (3.38+ for ``->>``).
+"""
+
+CKAN_NAME_SQL = "COALESCE(NULLIF(metadata ->> 'ckan_name', ''), 'none')"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Index, String
+
+from app.database import Base
+from app.types import GUID
+
+
+class Neighbor(Base):
+    """One directed edge of the link graph, maintained from the junction tables and affinity membership.
+
+    Every edge is stored in both directions, so the neighbours of a node are one
+    range scan of the primary key.
+    """
+
+    __tablename__ = "ndp_neighbor"
+
+    uid = Column(GUID(), primary_key=True)
+    neighbor_type = Column(String, primary_key=True)
+    neighbor_uid = Column(GUID(), primary_key=True)
+    via = Column(String, primary_key=True)
+
+    __table_args__ = (Index("idx_ndp_neighbor_neighbor_uid", "neighbor_uid"),)
@@ -1,11 +1,15 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, Computed, String, DateTime
 
 from app.database import Base
+from app.models.computed import CKAN_NAME_SQL
 from app.types import GUID, JSONType
 
+# Name of linked nodes and graph snapshot nodes; migration 014 uses the same expression.
+DISPLAY_NAME_SQL = "COALESCE(NULLIF(type, ''), NULLIF(openapi_url, ''), CAST(uid AS TEXT))"
+
 
 class Service(Base):
     __tablename__ = "ndp_service"
@@ -17,4 +21,6 @@ class Service(Base):
     source_ep = Column(String, nullable=True)
     metadata_ = Column("metadata", JSONType(), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
-    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    display_name = Column(String, Computed(DISPLAY_NAME_SQL, persisted=True))
+    ckan_name = Column(String, Computed(CKAN_NAME_SQL, persisted=True))
@@ -14,3 +14,4 @@ class ServiceEndpoint(Base):
     role = Column(String, nullable=True)
     attrs = Column(JSONType(), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,121 @@
+"""The ``ndp_neighbor`` table: every edge of the link graph, stored in both directions.
+
+Rows are derived from the three junction tables and from affinity triple
+membership (the edges of ``collect_edges``) and kept current by the write paths,
+which call ``refresh_neighbors`` with every uid whose links they changed before
+committing. ``/linked`` then reads a node's neighbours with one range scan of the
+primary key. Writes that bypass the API can leave the table stale; rebuild it
+from the source tables with::
+
+    python -m app.neighbors
+"""
+import argparse
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.bulk import BULK_CHUNK_ROWS, IN_CHUNK_SIZE, chunks, upsert_statement
+from app.database import SessionLocal
+from app.graph import NODE_MODELS, Edge, classify_uids, collect_edges
+from app.models.affinity_triple import AffinityTriple
+from app.models.affinity_triple_endpoint import AffinityTripleEndpoint
+from app.models.affinity_triple_service import AffinityTripleService
+from app.models.neighbor import Neighbor
+
+
+def affinity_member_uids(db: Session, triple_uids: Iterable[UUID]) -> set[UUID]:
+    """Dataset, endpoint and service uids currently in the given affinity triples."""
+    members: set[UUID] = set()
+    for chunk in chunks(list(set(triple_uids)), IN_CHUNK_SIZE):
+        members.update(db.execute(union_all(
+            select(AffinityTriple.dataset_uid)
+            .where(AffinityTriple.triple_uid.in_(chunk), AffinityTriple.dataset_uid.is_not(None)),
+            select(AffinityTripleEndpoint.endpoint_uid).where(AffinityTripleEndpoint.triple_uid.in_(chunk)),
+            select(AffinityTripleService.service_uid).where(AffinityTripleService.triple_uid.in_(chunk)),
+        )).scalars())
+    return members
+
+
+def _insert_edges(db: Session, edges: Iterable[tuple[UUID, str, UUID, str]]) -> None:
+    rows = [
+        {"uid": uid, "neighbor_type": neighbor_type, "neighbor_uid": neighbor_uid, "via": via}
+        for uid, neighbor_type, neighbor_uid, via in edges
+    ]
+    # A concurrent refresh of a shared node may have inserted the same edge after our delete.
+    keys = [column.name for column in Neighbor.__table__.primary_key]
+    for chunk in chunks(rows, BULK_CHUNK_ROWS):
+        db.execute(upsert_statement(db, Neighbor.__table__, chunk, keys, []))
+
+
+def refresh_neighbors(db: Session, uids: Iterable[UUID | None]) -> None:
+    """Recompute every ``ndp_neighbor`` row that has one of ``uids`` at either end.
+
+    Call it after the changed links have been written (it flushes the session) and
+    pass the uids at both ends of every added or removed edge: the endpoints of a
+    junction row, or the members of an affinity triple before and after the change.
+    """
+    uids = {uid for uid in uids if uid is not None}
+    if not uids:
+        return
+    db.flush()
+    for chunk in chunks(list(uids), IN_CHUNK_SIZE):
+        db.execute(delete(Neighbor).where(or_(Neighbor.uid.in_(chunk), Neighbor.neighbor_uid.in_(chunk))))
+
+    types = classify_uids(db, uids)
+    # Edges are symmetric, so the rows pointing at ``uids`` are the reverse of the rows leaving them.
+    edges = set()
+    for uid, neighbor_type, neighbor_uid, via in collect_edges(db, types):
+        edges.add((uid, neighbor_type, neighbor_uid, via))
+        edges.add((neighbor_uid, types[uid], uid, via))
+    _insert_edges(db, edges)
+
+
+def rebuild_neighbors(db: Session) -> int:
+    """Replace the whole ``ndp_neighbor`` table from the source tables; returns the row count."""
+    db.flush()
+    types: dict[UUID, str] = {}
+    for node_type, model in NODE_MODELS.items():
+        for uid in db.execute(select(model.uid)).scalars():
+            types.setdefault(uid, node_type)
+    edges = set(collect_edges(db, types, whole_graph=True))
+    db.execute(delete(Neighbor))
+    _insert_edges(db, edges)
+    return len(edges)
+
+
+def neighbor_edges(db: Session, types: dict[UUID, str]) -> list[Edge]:
+    """``collect_edges`` read from ``ndp_neighbor``: the stored edges of every uid in ``types``."""
+    edges: list[Edge] = []
+    for chunk in chunks(list(types), IN_CHUNK_SIZE):
+        edges.extend(db.execute(
+            select(Neighbor.uid, Neighbor.neighbor_type, Neighbor.neighbor_uid, Neighbor.via)
+            .where(Neighbor.uid.in_(chunk))
+        ).all())
+    return edges
+
+
+def neighbor_uids(uid: UUID, node_type: str):
+    """Subquery of the ``node_type`` neighbours of ``uid``."""
+    return select(Neighbor.neighbor_uid).where(Neighbor.uid == uid, Neighbor.neighbor_type == node_type)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild the ndp_neighbor table from the link and affinity tables.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    parse_args()
+    db = SessionLocal()
+    try:
+        count = rebuild_neighbors(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Neighbor rows: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import logging
+import select
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.graph_cache import graph_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "ndp_changes"
+
+Change = dict[str, Any]
+
+
+class ChangeListener:
+    """Background thread that LISTENs for row changes and hands them to subscribers.
+
+    Payloads come from the statement-level ``ndp_notify_change`` trigger (migration 010)
+    and look like ``{"table": "ndp_dataset", "op": "UPDATE"}``: they carry no row uids,
+    so subscribers invalidate whole caches. Notifications sent while the listener is
+    disconnected are lost, so after every reconnect subscribers get a ``{"op": "RESYNC"}``
+    change and should drop everything they hold.
+    """
+
+    def __init__(self, engine: Engine, channel: str = CHANNEL, poll_interval: float = 5.0, retry_interval: float = 5.0):
+        self.engine = engine
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._subscribers: list[Callable[[Change], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, callback: Callable[[Change], None]) -> None:
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="ndp-change-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def dispatch(self, change: Change) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Change subscriber failed for %s", change)
+
+    def _run(self) -> None:
+        first = True
+        while not self._stop.is_set():
+            try:
+                self._listen(resync=not first)
+            except Exception:
+                logger.exception("Change listener lost its connection; retrying in %ss", self.retry_interval)
+                self._stop.wait(self.retry_interval)
+            first = False
+
+    def _listen(self, resync: bool) -> None:
+        connection = self.engine.raw_connection()
+        # Keep the LISTEN session out of the pool; closing it closes the socket.
+        connection.detach()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            if resync:
+                self.dispatch({"table": None, "op": "RESYNC"})
+
+            while not self._stop.is_set():
+                if select.select([dbapi_connection], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    try:
+                        change = json.loads(notify.payload)
+                    except ValueError:
+                        logger.warning("Ignoring malformed change payload: %r", notify.payload)
+                        continue
+                    self.dispatch(change)
+        finally:
+            connection.close()
+
+
+def start_change_listener(engine: Engine) -> ChangeListener | None:
+    """Start a listener that keeps this worker's caches coherent, if any cache needs one.
+
+    ``LISTEN`` needs a session-long server connection, which PgBouncer's transaction
+    mode does not provide: with ``DB_PGBOUNCER`` the listener connects through
+    ``DB_LISTEN_URL`` (straight to PostgreSQL) and is not started without it.
+    """
+    if engine.dialect.name != "postgresql" or not settings.graph_cache_enabled:
+        return None
+
+    if settings.db_listen_url:
+        engine = create_engine(settings.db_listen_url, poolclass=NullPool)
+    elif settings.db_pgbouncer:
+        logger.warning(
+            "DB_PGBOUNCER is set without DB_LISTEN_URL: LISTEN does not work through PgBouncer in transaction "
+            "mode, so writes made by other workers will not invalidate this worker's graph cache"
+        )
+        return None
+    if engine.dialect.driver != "psycopg2":
+        logger.warning("The change listener needs the psycopg2 driver, not %s; it is not started", engine.dialect.driver)
+        return None
+
+    listener = ChangeListener(engine)
+    listener.subscribe(lambda change: graph_cache.invalidate())
+    listener.start()
+    return listener
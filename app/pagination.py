@@ -0,0 +1,57 @@
+"""Keyset pagination shared by the list endpoints."""
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, literal, tuple_
+from sqlalchemy.orm import Query
+
+from app.types import GUID
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: list) -> list:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError(cursor)
+        values = []
+        for column, value in zip(keys, raw):
+            if isinstance(column.type, DateTime):
+                values.append(datetime.fromisoformat(value))
+            elif isinstance(column.type, GUID):
+                values.append(uuid.UUID(value))
+            else:
+                values.append(value)
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query: Query, response: Response, keys: list, skip: int, limit: int, cursor: str | None) -> list:
+    """Return one page of ``query`` ordered by ``keys``.
+
+    ``keys`` must identify a row uniquely (``created_at`` plus the primary key, or
+    the composite primary key of a junction table). Rows after ``cursor`` are
+    found by a row-value comparison, so deep pages cost the same as the first.
+    When the page is full, the cursor of its last row is returned in the
+    ``X-Next-Cursor`` header. ``skip`` is still honoured for existing clients.
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor, keys)
+        query = query.filter(
+            tuple_(*keys) > tuple_(*[literal(value, column.type) for column, value in zip(keys, values)])
+        )
+    rows = query.order_by(*keys).offset(skip).limit(limit).all()
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, column.key) for column in keys])
+    return rows
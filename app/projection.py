@@ -0,0 +1,91 @@
+"""Sparse fieldsets (``fields=``) and metadata projection (``metadata_keys=``) for list endpoints."""
+import orjson
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.types import JSONType
+
+
+class json_member(FunctionElement):
+    """``column -> key`` of a JSON column, decoded like the column itself (NULL when absent)."""
+
+    type = JSONType()
+    name = "json_member"
+    inherit_cache = True
+
+
+@compiles(json_member)
+def _compile_json_member(element, compiler, **kw):
+    column, key = (compiler.process(clause, **kw) for clause in element.clauses)
+    # json_quote turns the extracted SQL value back into JSON text for JSONType to decode.
+    return f"json_quote(json_extract({column}, '$.' || json_quote({key})))"
+
+
+@compiles(json_member, "postgresql")
+def _compile_json_member_postgresql(element, compiler, **kw):
+    column, key = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"({column} -> {key})"
+
+
+def _split(value: str) -> list[str]:
+    return list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+
+
+class Projection:
+    """The columns and metadata keys a list request asked for.
+
+    Only those are selected: each metadata key is extracted in SQL, so the rest
+    of the blob never leaves the database. Rows are rendered straight to JSON
+    without the response model, whose other fields would be required.
+    """
+
+    def __init__(self, model, schema: type[BaseModel], fields: list[str], metadata_keys: list[str] | None):
+        self.model = model
+        self.fields = fields
+        self.metadata_keys = metadata_keys
+        self.attributes = {name: schema.model_fields[name].validation_alias or name for name in fields}
+
+    @classmethod
+    def parse(
+        cls, model, schema: type[BaseModel], fields: str | None, metadata_keys: str | None
+    ) -> "Projection | None":
+        """Validate the query parameters; None when the full rows were requested."""
+        if fields is None and metadata_keys is None:
+            return None
+        names = _split(fields) if fields is not None else list(schema.model_fields)
+        unknown = [name for name in names if name not in schema.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{unknown[0]}'")
+        keys = _split(metadata_keys) if metadata_keys is not None else None
+        if keys is not None and "metadata" not in names:
+            names.append("metadata")
+        return cls(model, schema, names, keys)
+
+    def columns(self, keys: list) -> list:
+        """Columns to select: the requested fields plus the pagination ``keys``."""
+        columns = {column.key: column for column in keys}
+        for name, attribute in self.attributes.items():
+            if name == "metadata" and self.metadata_keys is not None:
+                for index, key in enumerate(self.metadata_keys):
+                    label = f"metadata_{index}"
+                    columns[label] = json_member(getattr(self.model, attribute), key).label(label)
+            elif name not in columns:
+                columns[name] = getattr(self.model, attribute).label(name)
+        return list(columns.values())
+
+    def _row(self, row) -> dict:
+        item = {}
+        for name in self.fields:
+            if name == "metadata" and self.metadata_keys is not None:
+                values = [getattr(row, f"metadata_{index}") for index in range(len(self.metadata_keys))]
+                item[name] = {key: value for key, value in zip(self.metadata_keys, values) if value is not None}
+            else:
+                item[name] = getattr(row, name)
+        return item
+
+    def render(self, rows: list, response: Response) -> Response:
+        """JSON response for ``rows``, keeping the headers set on ``response`` (next cursor)."""
+        content = orjson.dumps([self._row(row) for row in rows], option=orjson.OPT_UTC_Z)
+        return Response(content, media_type="application/json", headers=dict(response.headers))
@@ -0,0 +1,90 @@
+"""Per-request database query accounting and the slow-query log.
+
+``before_cursor_execute``/``after_cursor_execute`` listeners (registered for every
+engine in ``app.database``) time each statement. Inside a request the count and
+total time accumulate on the ``QueryStats`` of the current context, which the
+``server_timing`` middleware reports as a ``Server-Timing`` header. Statements
+slower than ``DB_SLOW_QUERY_MS`` are logged to ``app.query_stats`` with their
+parameters; on PostgreSQL a ``DB_EXPLAIN_SAMPLE_RATE`` fraction of the slow reads
+is re-run under ``EXPLAIN ANALYZE`` and the plan logged as well.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_PARAMETERS = 1000
+
+# Statements that can be explained without side effects (the plan is also run inside a savepoint).
+EXPLAINABLE = ("SELECT", "WITH")
+
+
+@dataclass
+class QueryStats:
+    """Statements executed and seconds spent in the database by one request."""
+
+    count: int = 0
+    duration: float = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """``Server-Timing`` header value; ``total`` is the request's own duration in seconds."""
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries", total;dur={total * 1000:.1f}'
+
+
+# Set per request by the middleware. A mutable object rather than counters in the
+# variable itself: sync routes run in a copy of the context, in the thread pool,
+# and their updates must still reach the middleware.
+current_stats: ContextVar[QueryStats | None] = ContextVar("current_stats", default=None)
+
+
+def _parameters(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > MAX_LOGGED_PARAMETERS:
+        return text[:MAX_LOGGED_PARAMETERS] + "..."
+    return text
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """``EXPLAIN ANALYZE`` of ``statement`` on a raw cursor, rolled back to a savepoint."""
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT query_stats_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+    finally:
+        cursor.close()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_start")
+    stats = current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+    if not settings.db_slow_query_ms or elapsed * 1000 < settings.db_slow_query_ms:
+        return
+    logger.warning("Slow query (%.1f ms): %s; parameters: %s", elapsed * 1000, statement, _parameters(parameters))
+    if (
+        settings.db_explain_sample_rate
+        and not executemany
+        and conn.dialect.name == "postgresql"
+        and statement.lstrip().upper().startswith(EXPLAINABLE)
+        and random.random() < settings.db_explain_sample_rate
+    ):
+        try:
+            logger.warning("Plan of the slow query above:\n%s", _explain(conn, statement, parameters))
+        except Exception:
+            logger.exception("EXPLAIN ANALYZE of a slow query failed")
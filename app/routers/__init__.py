@@ -6,6 +6,11 @@ from app.routers.dataset_services import router as dataset_services_router
 from app.routers.service_endpoints import router as service_endpoints_router
 from app.routers.affinities import router as affinities_router
 from app.routers.linked import router as linked_router
+from app.routers.graph import router as graph_router
+from app.routers.stats import router as stats_router
+from app.routers.catalog_import import router as catalog_import_router
+from app.routers.export import router as export_router
+from app.routers.search import router as search_router
 
 __all__ = [
     "endpoints_router",
@@ -16,4 +21,9 @@ __all__ = [
     "service_endpoints_router",
     "affinities_router",
     "linked_router",
+    "graph_router",
+    "stats_router",
+    "catalog_import_router",
+    "export_router",
+    "search_router",
 ]
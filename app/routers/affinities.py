@@ -1,38 +1,85 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.affinity_members import (
+    delete_affinity_members,
+    sync_affinity_member_rows,
+    sync_affinity_members,
+)
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert, existing_uids
+from app.conditional import conditional_response, entity_etag
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.graph_cache import graph_cache
+from app.pagination import paginate
 from app.models.affinity_triple import AffinityTriple
 from app.models.dataset import Dataset
-from app.schemas.affinity_triple import AffinityTripleCreate, AffinityTripleUpdate, AffinityTripleResponse
+from app.models.endpoint import Endpoint
+from app.models.service import Service
+from app.neighbors import affinity_member_uids, refresh_neighbors
+from app.schemas.bulk import BulkResponse
+from app.schemas.affinity_triple import AffinityTripleBulkItem, AffinityTripleCreate, AffinityTripleUpdate, AffinityTripleResponse
 
 router = APIRouter(prefix="/affinities", tags=["affinities"])
 
 
+def member_uids(
+    dataset_uid: UUID | None, endpoint_uids: list[UUID] | None, service_uids: list[UUID] | None
+) -> set[UUID]:
+    return {dataset_uid, *(endpoint_uids or []), *(service_uids or [])} - {None}
+
+
 def validate_dataset_exists(db: Session, dataset_uid: UUID | None):
     if dataset_uid is not None:
         if not db.query(Dataset).filter(Dataset.uid == dataset_uid).first():
             raise HTTPException(status_code=404, detail=f"Dataset '{dataset_uid}' not found")
 
 
+def validate_members_exist(db: Session, endpoint_uids: list[UUID] | None, service_uids: list[UUID] | None):
+    for model, label, uids in ((Endpoint, "Endpoint", endpoint_uids), (Service, "Service", service_uids)):
+        if not uids:
+            continue
+        found = {uid for (uid,) in db.query(model.uid).filter(model.uid.in_(set(uids))).all()}
+        missing = [uid for uid in uids if uid not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"{label} '{missing[0]}' not found")
+
+
 @router.get("", response_model=list[AffinityTripleResponse])
-def list_affinities(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(AffinityTriple).offset(skip).limit(limit).all()
+async def list_affinities(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [AffinityTriple.created_at, AffinityTriple.triple_uid]
+    return await db.run(
+        lambda session: paginate(session.query(AffinityTriple), response, keys, skip, limit, cursor)
+    )
 
 
 @router.get("/{triple_uid}", response_model=AffinityTripleResponse)
-def get_affinity(triple_uid: UUID, db: Session = Depends(get_db)):
-    item = db.query(AffinityTriple).filter(AffinityTriple.triple_uid == triple_uid).first()
+async def get_affinity(
+    triple_uid: UUID,
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    item = await db.run(lambda session: session.query(AffinityTriple).filter(AffinityTriple.triple_uid == triple_uid).first())
     if not item:
         raise HTTPException(status_code=404, detail="AffinityTriple not found")
-    return item
+    etag = entity_etag(AffinityTriple, item.triple_uid, item.updated_at)
+    return conditional_response(request, response, etag, item.updated_at) or item
 
 
 @router.post("", response_model=AffinityTripleResponse, status_code=201)
 def create_affinity(data: AffinityTripleCreate, db: Session = Depends(get_db)):
     validate_dataset_exists(db, data.dataset_uid)
+    validate_members_exist(db, data.endpoint_uids, data.service_uids)
     item = AffinityTriple(
         dataset_uid=data.dataset_uid,
         endpoint_uids=data.endpoint_uids,
@@ -41,11 +88,66 @@ def create_affinity(data: AffinityTripleCreate, db: Session = Depends(get_db)):
         version=data.version,
     )
     db.add(item)
+    db.flush()
+    sync_affinity_members(db, item)
+    refresh_neighbors(db, member_uids(item.dataset_uid, item.endpoint_uids, item.service_uids))
     db.commit()
+    graph_cache.invalidate()
     db.refresh(item)
     return item
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_affinities(
+    items: list[AffinityTripleBulkItem] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create affinity triples, or replace them when ``triple_uid`` names an existing one."""
+    datasets = existing_uids(db, Dataset.uid, [item.dataset_uid for item in items if item.dataset_uid])
+    endpoints = existing_uids(db, Endpoint.uid, [uid for item in items for uid in item.endpoint_uids or []])
+    services = existing_uids(db, Service.uid, [uid for item in items for uid in item.service_uids or []])
+
+    now = datetime.utcnow()
+    rows: list[dict | None] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        missing_endpoint = next((uid for uid in item.endpoint_uids or [] if uid not in endpoints), None)
+        missing_service = next((uid for uid in item.service_uids or [] if uid not in services), None)
+        if item.dataset_uid is not None and item.dataset_uid not in datasets:
+            errors[index] = f"Dataset '{item.dataset_uid}' not found"
+        elif missing_endpoint is not None:
+            errors[index] = f"Endpoint '{missing_endpoint}' not found"
+        elif missing_service is not None:
+            errors[index] = f"Service '{missing_service}' not found"
+        rows.append(None if index in errors else {
+            "triple_uid": item.triple_uid or uuid.uuid4(),
+            "dataset_uid": item.dataset_uid,
+            "endpoint_uids": item.endpoint_uids,
+            "service_uids": item.service_uids,
+            "attrs": item.attrs,
+            "version": item.version,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    previous_members = affinity_member_uids(db, [item.triple_uid for item in items if item.triple_uid])
+    result = bulk_upsert(
+        db,
+        AffinityTriple,
+        rows,
+        errors,
+        ["triple_uid"],
+        ["dataset_uid", "endpoint_uids", "service_uids", "attrs", "version", "updated_at"],
+        after_write=lambda chunk: sync_affinity_member_rows(db, chunk),
+    )
+    refresh_neighbors(db, previous_members.union(*(
+        member_uids(row["dataset_uid"], row["endpoint_uids"], row["service_uids"]) for row in rows if row
+    )))
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.put("/{triple_uid}", response_model=AffinityTripleResponse)
 def update_affinity(triple_uid: UUID, data: AffinityTripleUpdate, db: Session = Depends(get_db)):
     item = db.query(AffinityTriple).filter(AffinityTriple.triple_uid == triple_uid).first()
@@ -55,10 +157,19 @@ def update_affinity(triple_uid: UUID, data: AffinityTripleUpdate, db: Session =
     update_data = data.model_dump(exclude_unset=True)
     if "dataset_uid" in update_data:
         validate_dataset_exists(db, update_data["dataset_uid"])
+    validate_members_exist(db, update_data.get("endpoint_uids"), update_data.get("service_uids"))
+    relinked = bool(update_data.keys() & {"dataset_uid", "endpoint_uids", "service_uids"})
+    previous_members = affinity_member_uids(db, [item.triple_uid]) if relinked else set()
     for field, value in update_data.items():
         setattr(item, field, value)
 
+    members = tuple(field for field in ("endpoint_uids", "service_uids") if field in update_data)
+    if members:
+        sync_affinity_members(db, item, members)
+    if relinked:
+        refresh_neighbors(db, previous_members | member_uids(item.dataset_uid, item.endpoint_uids, item.service_uids))
     db.commit()
+    graph_cache.invalidate()
     db.refresh(item)
     return item
 
@@ -68,5 +179,9 @@ def delete_affinity(triple_uid: UUID, db: Session = Depends(get_db)):
     item = db.query(AffinityTriple).filter(AffinityTriple.triple_uid == triple_uid).first()
     if not item:
         raise HTTPException(status_code=404, detail="AffinityTriple not found")
+    members = affinity_member_uids(db, [item.triple_uid])
+    delete_affinity_members(db, [item.triple_uid])
     db.delete(item)
+    refresh_neighbors(db, members)
     db.commit()
+    graph_cache.invalidate()
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.catalog_import import CatalogImporter
+from app.database import get_db
+from app.schemas.catalog_import import ImportReport
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+
+async def _lines(chunks):
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+@router.post("", response_model=ImportReport)
+async def import_catalog(request: Request, db: Session = Depends(get_db)):
+    """Import a newline-delimited JSON stream of catalog records (see ``app.catalog_import``).
+
+    The request body is read incrementally; every full chunk of records is applied
+    and committed before more of the body is read.
+    """
+    importer = CatalogImporter(db)
+    async for line in _lines(request.stream()):
+        if importer.add(line):
+            await run_in_threadpool(importer.flush)
+    await run_in_threadpool(importer.flush)
+    return importer.report
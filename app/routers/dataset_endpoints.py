@@ -1,12 +1,18 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert, existing_uids
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.graph_cache import graph_cache
+from app.pagination import paginate
 from app.models.dataset import Dataset
 from app.models.dataset_endpoint import DatasetEndpoint
 from app.models.endpoint import Endpoint
+from app.neighbors import refresh_neighbors
+from app.schemas.bulk import BulkResponse
 from app.schemas.dataset_endpoint import DatasetEndpointCreate, DatasetEndpointResponse
 
 router = APIRouter(prefix="/dataset-endpoints", tags=["dataset-endpoints"])
@@ -20,16 +26,25 @@ def validate_references(db: Session, dataset_uid: UUID, endpoint_uid: UUID):
 
 
 @router.get("", response_model=list[DatasetEndpointResponse])
-def list_dataset_endpoints(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(DatasetEndpoint).offset(skip).limit(limit).all()
+async def list_dataset_endpoints(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [DatasetEndpoint.dataset_uid, DatasetEndpoint.endpoint_uid]
+    return await db.run(lambda session: paginate(session.query(DatasetEndpoint), response, keys, skip, limit, cursor))
 
 
 @router.get("/{dataset_uid}/{endpoint_uid}", response_model=DatasetEndpointResponse)
-def get_dataset_endpoint(dataset_uid: UUID, endpoint_uid: UUID, db: Session = Depends(get_db)):
-    item = db.query(DatasetEndpoint).filter(
-        DatasetEndpoint.dataset_uid == dataset_uid,
-        DatasetEndpoint.endpoint_uid == endpoint_uid
-    ).first()
+async def get_dataset_endpoint(dataset_uid: UUID, endpoint_uid: UUID, db: SessionRunner = Depends(get_read_session_runner)):
+    item = await db.run(
+        lambda session: session.query(DatasetEndpoint).filter(
+            DatasetEndpoint.dataset_uid == dataset_uid,
+            DatasetEndpoint.endpoint_uid == endpoint_uid
+        ).first()
+    )
     if not item:
         raise HTTPException(status_code=404, detail="DatasetEndpoint not found")
     return item
@@ -45,11 +60,40 @@ def create_dataset_endpoint(data: DatasetEndpointCreate, db: Session = Depends(g
         attrs=data.attrs,
     )
     db.add(item)
+    refresh_neighbors(db, [data.dataset_uid, data.endpoint_uid])
     db.commit()
+    graph_cache.invalidate()
     db.refresh(item)
     return item
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_dataset_endpoints(
+    items: list[DatasetEndpointCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create links, or update ``role``/``attrs`` of links that already exist."""
+    datasets = existing_uids(db, Dataset.uid, [item.dataset_uid for item in items])
+    endpoints = existing_uids(db, Endpoint.uid, [item.endpoint_uid for item in items])
+    now = datetime.utcnow()
+    rows: list[dict | None] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        if item.dataset_uid not in datasets:
+            errors[index] = f"Dataset '{item.dataset_uid}' not found"
+        elif item.endpoint_uid not in endpoints:
+            errors[index] = f"Endpoint '{item.endpoint_uid}' not found"
+        rows.append(None if index in errors else {**item.model_dump(), "updated_at": now})
+
+    result = bulk_upsert(
+        db, DatasetEndpoint, rows, errors, ["dataset_uid", "endpoint_uid"], ["role", "attrs", "updated_at"]
+    )
+    refresh_neighbors(db, [uid for row in rows if row for uid in (row["dataset_uid"], row["endpoint_uid"])])
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.delete("/{dataset_uid}/{endpoint_uid}", status_code=204)
 def delete_dataset_endpoint(dataset_uid: UUID, endpoint_uid: UUID, db: Session = Depends(get_db)):
     item = db.query(DatasetEndpoint).filter(
@@ -59,4 +103,6 @@ def delete_dataset_endpoint(dataset_uid: UUID, endpoint_uid: UUID, db: Session =
     if not item:
         raise HTTPException(status_code=404, detail="DatasetEndpoint not found")
     db.delete(item)
+    refresh_neighbors(db, [dataset_uid, endpoint_uid])
     db.commit()
+    graph_cache.invalidate()
@@ -1,12 +1,18 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert, existing_uids
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.graph_cache import graph_cache
+from app.pagination import paginate
 from app.models.dataset import Dataset
 from app.models.dataset_service import DatasetService
 from app.models.service import Service
+from app.neighbors import refresh_neighbors
+from app.schemas.bulk import BulkResponse
 from app.schemas.dataset_service import DatasetServiceCreate, DatasetServiceResponse
 
 router = APIRouter(prefix="/dataset-services", tags=["dataset-services"])
@@ -20,16 +26,25 @@ def validate_references(db: Session, dataset_uid: UUID, service_uid: UUID):
 
 
 @router.get("", response_model=list[DatasetServiceResponse])
-def list_dataset_services(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(DatasetService).offset(skip).limit(limit).all()
+async def list_dataset_services(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [DatasetService.dataset_uid, DatasetService.service_uid]
+    return await db.run(lambda session: paginate(session.query(DatasetService), response, keys, skip, limit, cursor))
 
 
 @router.get("/{dataset_uid}/{service_uid}", response_model=DatasetServiceResponse)
-def get_dataset_service(dataset_uid: UUID, service_uid: UUID, db: Session = Depends(get_db)):
-    item = db.query(DatasetService).filter(
-        DatasetService.dataset_uid == dataset_uid,
-        DatasetService.service_uid == service_uid
-    ).first()
+async def get_dataset_service(dataset_uid: UUID, service_uid: UUID, db: SessionRunner = Depends(get_read_session_runner)):
+    item = await db.run(
+        lambda session: session.query(DatasetService).filter(
+            DatasetService.dataset_uid == dataset_uid,
+            DatasetService.service_uid == service_uid
+        ).first()
+    )
     if not item:
         raise HTTPException(status_code=404, detail="DatasetService not found")
     return item
@@ -45,11 +60,40 @@ def create_dataset_service(data: DatasetServiceCreate, db: Session = Depends(get
         attrs=data.attrs,
     )
     db.add(item)
+    refresh_neighbors(db, [data.dataset_uid, data.service_uid])
     db.commit()
+    graph_cache.invalidate()
     db.refresh(item)
     return item
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_dataset_services(
+    items: list[DatasetServiceCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create links, or update ``role``/``attrs`` of links that already exist."""
+    datasets = existing_uids(db, Dataset.uid, [item.dataset_uid for item in items])
+    services = existing_uids(db, Service.uid, [item.service_uid for item in items])
+    now = datetime.utcnow()
+    rows: list[dict | None] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        if item.dataset_uid not in datasets:
+            errors[index] = f"Dataset '{item.dataset_uid}' not found"
+        elif item.service_uid not in services:
+            errors[index] = f"Service '{item.service_uid}' not found"
+        rows.append(None if index in errors else {**item.model_dump(), "updated_at": now})
+
+    result = bulk_upsert(
+        db, DatasetService, rows, errors, ["dataset_uid", "service_uid"], ["role", "attrs", "updated_at"]
+    )
+    refresh_neighbors(db, [uid for row in rows if row for uid in (row["dataset_uid"], row["service_uid"])])
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.delete("/{dataset_uid}/{service_uid}", status_code=204)
 def delete_dataset_service(dataset_uid: UUID, service_uid: UUID, db: Session = Depends(get_db)):
     item = db.query(DatasetService).filter(
@@ -59,4 +103,6 @@ def delete_dataset_service(dataset_uid: UUID, service_uid: UUID, db: Session = D
     if not item:
         raise HTTPException(status_code=404, detail="DatasetService not found")
     db.delete(item)
+    refresh_neighbors(db, [dataset_uid, service_uid])
     db.commit()
+    graph_cache.invalidate()
@@ -1,26 +1,65 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert
+from app.conditional import conditional_response, entity_etag
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.filters import ListFilters
+from app.graph_cache import graph_cache
+from app.pagination import paginate
+from app.projection import Projection
+from app.models.affinity_triple import AffinityTriple
 from app.models.dataset import Dataset
-from app.schemas.dataset import DatasetCreate, DatasetUpdate, DatasetResponse
+from app.neighbors import affinity_member_uids, refresh_neighbors
+from app.schemas.bulk import BulkResponse
+from app.schemas.dataset import DatasetBulkItem, DatasetCreate, DatasetUpdate, DatasetResponse
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
 
 @router.get("", response_model=list[DatasetResponse])
-def list_datasets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Dataset).offset(skip).limit(limit).all()
+async def list_datasets(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    fields: str | None = None,
+    metadata_keys: str | None = None,
+    metadata: str | None = None,
+    metadata_has: str | None = None,
+    source_ep: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [Dataset.created_at, Dataset.uid]
+    filters = ListFilters.parse(Dataset, metadata, metadata_has, source_ep=source_ep)
+    projection = Projection.parse(Dataset, DatasetResponse, fields, metadata_keys)
+    if projection is None:
+        return await db.run(
+            lambda session: paginate(filters.apply(session.query(Dataset)), response, keys, skip, limit, cursor)
+        )
+    rows = await db.run(lambda session: paginate(
+        filters.apply(session.query(*projection.columns(keys))), response, keys, skip, limit, cursor
+    ))
+    return projection.render(rows, response)
 
 
 @router.get("/{uid}", response_model=DatasetResponse)
-def get_dataset(uid: UUID, db: Session = Depends(get_db)):
-    dataset = db.query(Dataset).filter(Dataset.uid == uid).first()
+async def get_dataset(
+    uid: UUID,
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    dataset = await db.run(lambda session: session.query(Dataset).filter(Dataset.uid == uid).first())
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
-    return dataset
+    etag = entity_etag(Dataset, dataset.uid, dataset.updated_at)
+    return conditional_response(request, response, etag, dataset.updated_at) or dataset
 
 
 @router.post("", response_model=DatasetResponse, status_code=201)
@@ -32,10 +71,35 @@ def create_dataset(data: DatasetCreate, db: Session = Depends(get_db)):
     )
     db.add(dataset)
     db.commit()
+    graph_cache.invalidate()
     db.refresh(dataset)
     return dataset
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_datasets(
+    items: list[DatasetBulkItem] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create datasets, or update them in place when ``uid`` names an existing one."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "uid": item.uid or uuid.uuid4(),
+            "title": item.title,
+            "source_ep": item.source_ep,
+            "metadata": item.metadata,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+    result = bulk_upsert(db, Dataset, rows, {}, ["uid"], ["title", "source_ep", "metadata", "updated_at"])
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.put("/{uid}", response_model=DatasetResponse)
 def update_dataset(uid: UUID, data: DatasetUpdate, db: Session = Depends(get_db)):
     dataset = db.query(Dataset).filter(Dataset.uid == uid).first()
@@ -50,6 +114,7 @@ def update_dataset(uid: UUID, data: DatasetUpdate, db: Session = Depends(get_db)
         setattr(dataset, field, value)
 
     db.commit()
+    graph_cache.invalidate()
     db.refresh(dataset)
     return dataset
 
@@ -59,5 +124,11 @@ def delete_dataset(uid: UUID, db: Session = Depends(get_db)):
     dataset = db.query(Dataset).filter(Dataset.uid == uid).first()
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    # The dataset's affinity triples go with it (ON DELETE CASCADE), and with them the
+    # edges between their remaining members.
+    triple_uids = db.execute(select(AffinityTriple.triple_uid).where(AffinityTriple.dataset_uid == uid)).scalars()
+    members = affinity_member_uids(db, triple_uids)
     db.delete(dataset)
+    refresh_neighbors(db, {uid, *members})
     db.commit()
+    graph_cache.invalidate()
@@ -1,27 +1,64 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert
+from app.conditional import conditional_response, entity_etag
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.filters import ListFilters
+from app.graph_cache import graph_cache
+from app.pagination import paginate
+from app.projection import Projection
 from app.models.endpoint import Endpoint
-from app.schemas.endpoint import EndpointCreate, EndpointUpdate, EndpointResponse
+from app.neighbors import refresh_neighbors
+from app.schemas.bulk import BulkResponse
+from app.schemas.endpoint import EndpointBulkItem, EndpointCreate, EndpointUpdate, EndpointResponse
 
 router = APIRouter(prefix="/ep", tags=["endpoints"])
 
 
 @router.get("", response_model=list[EndpointResponse])
-def list_endpoints(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    endpoints = db.query(Endpoint).offset(skip).limit(limit).all()
-    return endpoints
+async def list_endpoints(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    fields: str | None = None,
+    metadata_keys: str | None = None,
+    metadata: str | None = None,
+    metadata_has: str | None = None,
+    kind: str | None = None,
+    source_ep: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [Endpoint.created_at, Endpoint.uid]
+    filters = ListFilters.parse(Endpoint, metadata, metadata_has, kind=kind, source_ep=source_ep)
+    projection = Projection.parse(Endpoint, EndpointResponse, fields, metadata_keys)
+    if projection is None:
+        return await db.run(
+            lambda session: paginate(filters.apply(session.query(Endpoint)), response, keys, skip, limit, cursor)
+        )
+    rows = await db.run(lambda session: paginate(
+        filters.apply(session.query(*projection.columns(keys))), response, keys, skip, limit, cursor
+    ))
+    return projection.render(rows, response)
 
 
 @router.get("/{uid}", response_model=EndpointResponse)
-def get_endpoint(uid: UUID, db: Session = Depends(get_db)):
-    endpoint = db.query(Endpoint).filter(Endpoint.uid == uid).first()
+async def get_endpoint(
+    uid: UUID,
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    endpoint = await db.run(lambda session: session.query(Endpoint).filter(Endpoint.uid == uid).first())
     if not endpoint:
         raise HTTPException(status_code=404, detail="Endpoint not found")
-    return endpoint
+    etag = entity_etag(Endpoint, endpoint.uid, endpoint.updated_at)
+    return conditional_response(request, response, etag, endpoint.updated_at) or endpoint
 
 
 @router.post("", response_model=EndpointResponse, status_code=201)
@@ -33,10 +70,35 @@ def create_endpoint(endpoint_in: EndpointCreate, db: Session = Depends(get_db)):
     )
     db.add(endpoint)
     db.commit()
+    graph_cache.invalidate()
     db.refresh(endpoint)
     return endpoint
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_endpoints(
+    items: list[EndpointBulkItem] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create endpoints, or update them in place when ``uid`` names an existing one."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "uid": item.uid or uuid.uuid4(),
+            "kind": item.kind,
+            "url": item.url,
+            "metadata": item.metadata,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+    result = bulk_upsert(db, Endpoint, rows, {}, ["uid"], ["kind", "url", "metadata", "updated_at"])
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.put("/{uid}", response_model=EndpointResponse)
 def update_endpoint(uid: UUID, endpoint_in: EndpointUpdate, db: Session = Depends(get_db)):
     endpoint = db.query(Endpoint).filter(Endpoint.uid == uid).first()
@@ -51,6 +113,7 @@ def update_endpoint(uid: UUID, endpoint_in: EndpointUpdate, db: Session = Depend
         setattr(endpoint, field, value)
 
     db.commit()
+    graph_cache.invalidate()
     db.refresh(endpoint)
     return endpoint
 
@@ -62,4 +125,6 @@ def delete_endpoint(uid: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Endpoint not found")
 
     db.delete(endpoint)
+    refresh_neighbors(db, [uid])
     db.commit()
+    graph_cache.invalidate()
@@ -0,0 +1,104 @@
+import csv
+import io
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.catalog_import import RECORD_TYPES
+from app.database import get_read_db
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_CHUNK_ROWS = 1000
+
+# URL table name -> catalog import record type, so an NDJSON export can be re-imported as is.
+EXPORT_TABLES = {
+    "datasets": "dataset",
+    "endpoints": "endpoint",
+    "services": "service",
+    "dataset-endpoints": "dataset_endpoint",
+    "dataset-services": "dataset_service",
+    "service-endpoints": "service_endpoint",
+    "affinities": "affinity",
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _csv_value(value):
+    value = _plain(value)
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def _columns(table) -> list:
+    # Generated columns are derived by the database and cannot be imported.
+    return [column for column in table.columns if column.computed is None]
+
+
+def _batches(db: Session, table):
+    statement = select(*_columns(table)).order_by(*table.primary_key.columns)
+    result = db.execute(statement.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+    yield from result.partitions()
+
+
+def _ndjson(db: Session, table, record: str):
+    # orjson writes UUIDs and datetimes itself, in the same form as ``_plain``; it
+    # needs plain ``str`` keys rather than SQLAlchemy's ``quoted_name``.
+    columns = [str(column.name) for column in _columns(table)]
+    for rows in _batches(db, table):
+        yield b"".join(
+            orjson.dumps({"record": record, **dict(zip(columns, row))}, option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+def _csv(db: Session, table):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in _columns(table)])
+    for rows in _batches(db, table):
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/{table}")
+def export_table(table: str, format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_read_db)):
+    """Stream every row of ``table`` as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in batches of ``EXPORT_CHUNK_ROWS``
+    and serialized directly, without building response models. NDJSON lines carry
+    the ``record`` field understood by ``POST /import``.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table '{table}'")
+    record = EXPORT_TABLES[table]
+    model_table = RECORD_TYPES[record].model.__table__
+
+    body = _ndjson(db, model_table, record) if format == "ndjson" else _csv(db, model_table)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
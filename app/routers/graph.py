@@ -0,0 +1,113 @@
+import json
+
+import orjson
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.conditional import conditional_response, make_etag
+from app.database import get_read_db
+from app.graph import NODE_MODELS, NODE_TYPES
+from app.models.affinity_triple import AffinityTriple
+from app.models.dataset import Dataset
+from app.models.dataset_endpoint import DatasetEndpoint
+from app.models.dataset_service import DatasetService
+from app.models.endpoint import Endpoint
+from app.models.service import Service
+from app.models.service_endpoint import ServiceEndpoint
+
+router = APIRouter(prefix="/graph", tags=["graph"])
+
+SNAPSHOT_CHUNK_ROWS = 1000
+
+SNAPSHOT_EDGES = (
+    ("dataset-endpoint", DatasetEndpoint.dataset_uid, DatasetEndpoint.endpoint_uid, DatasetEndpoint.role),
+    ("dataset-service", DatasetService.dataset_uid, DatasetService.service_uid, DatasetService.role),
+    ("service-endpoint", ServiceEndpoint.service_uid, ServiceEndpoint.endpoint_uid, ServiceEndpoint.role),
+)
+
+
+def _snapshot_etag(db: Session) -> str:
+    """Fingerprint every table by row count and newest ``updated_at`` in one query."""
+    fingerprint = union_all(
+        *[
+            select(
+                literal(model.__tablename__).label("table_name"),
+                func.count().label("rows"),
+                func.max(model.updated_at).label("latest"),
+            ).select_from(model)
+            for model in (Dataset, Endpoint, Service, DatasetEndpoint, DatasetService, ServiceEndpoint, AffinityTriple)
+        ]
+    )
+    parts = sorted(f"{row.table_name}:{row.rows}:{row.latest}" for row in db.execute(fingerprint))
+    return make_etag(*parts)
+
+
+def _json_array(key: str, items, first: bool = False):
+    yield ("" if first else ",") + json.dumps(key) + ":["
+    chunk = []
+    separator = ""
+    for item in items:
+        chunk.append(orjson.dumps(item).decode())
+        if len(chunk) >= SNAPSHOT_CHUNK_ROWS:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
+
+
+def _streamed(db: Session, statement):
+    return db.execute(statement.execution_options(yield_per=SNAPSHOT_CHUNK_ROWS))
+
+
+def _snapshot_nodes(db: Session):
+    for node_type in NODE_TYPES:
+        model = NODE_MODELS[node_type]
+        for row in _streamed(db, select(model.uid, model.display_name)):
+            yield {"uid": str(row.uid), "type": node_type, "name": row.display_name}
+
+
+def _snapshot_edges(db: Session):
+    for edge_type, source, target, role in SNAPSHOT_EDGES:
+        for row in _streamed(db, select(source, target, role)):
+            yield {"source": str(row[0]), "target": str(row[1]), "type": edge_type, "role": row[2]}
+
+
+def _snapshot_affinities(db: Session):
+    statement = select(
+        AffinityTriple.triple_uid, AffinityTriple.dataset_uid, AffinityTriple.endpoint_uids, AffinityTriple.service_uids
+    )
+    for row in _streamed(db, statement):
+        yield {
+            "uid": str(row.triple_uid),
+            "dataset_uid": str(row.dataset_uid) if row.dataset_uid else None,
+            "endpoint_uids": [str(uid) for uid in row.endpoint_uids or []],
+            "service_uids": [str(uid) for uid in row.service_uids or []],
+        }
+
+
+def _snapshot_body(db: Session, etag: str):
+    yield '{"etag":' + json.dumps(etag)
+    yield from _json_array("nodes", _snapshot_nodes(db))
+    yield from _json_array("edges", _snapshot_edges(db))
+    yield from _json_array("affinities", _snapshot_affinities(db))
+    yield "}"
+
+
+@router.get("/snapshot")
+def get_graph_snapshot(request: Request, db: Session = Depends(get_read_db)):
+    """Stream every node, pairwise edge and affinity triple in a compact form.
+
+    All reads happen in one transaction (REPEATABLE READ on PostgreSQL) so the
+    ETag and the streamed body describe the same state of the graph.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    etag = _snapshot_etag(db)
+    response = StreamingResponse(_snapshot_body(db, etag), media_type="application/json")
+    return conditional_response(request, response, etag) or response
@@ -1,153 +1,209 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import literal, null, select, union_all
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.affinity_triple import AffinityTriple
+from app.conditional import PROCESS_EPOCH, conditional_response, make_etag
+from app.config import settings
+from app.database import SessionRunner, get_read_session_runner
+from app.graph import (
+    NODE_MODELS,
+    NODE_TYPES,
+    classify_uids,
+    linked_node,
+    linked_response,
+    load_nodes,
+    traverse,
+)
+from app.graph_cache import Graph, graph_cache
 from app.models.dataset import Dataset
-from app.models.dataset_endpoint import DatasetEndpoint
-from app.models.dataset_service import DatasetService
 from app.models.endpoint import Endpoint
 from app.models.service import Service
-from app.models.service_endpoint import ServiceEndpoint
-from app.schemas.linked import LinkedEntitiesBatchRequest, LinkedEntitiesResponse, LinkedNode
+from app.neighbors import neighbor_edges, neighbor_uids
+from app.schemas.linked import (
+    LinkedEntitiesBatchRequest,
+    LinkedEntitiesResponse,
+    LinkedNode,
+    TraversalEdge,
+    TraversalNode,
+    TraversalResponse,
+)
 
 router = APIRouter(prefix="/linked", tags=["linked"])
 
+NOT_FOUND_DETAIL = "No dataset, endpoint, or service found for the given uid"
 
-def _endpoint_display_name(endpoint: Endpoint) -> str:
-    if endpoint.kind and endpoint.url:
-        return f"{endpoint.kind}: {endpoint.url}"
-    return endpoint.kind or endpoint.url or str(endpoint.uid)
+MAX_TRAVERSAL_DEPTH = 6
+MAX_TRAVERSAL_NODES = 5000
 
 
-def _service_display_name(service: Service) -> str:
-    return service.type or service.openapi_url or str(service.uid)
+def _linked_statement(uid: UUID):
+    """Build the single statement that resolves ``uid`` into its type and hydrated neighbours.
 
-def _ckan_name(metadata: dict | None) -> str:
-    if isinstance(metadata, dict):
-        value = metadata.get("ckan_name")
-        if value:
-            return str(value)
-    return "none"
+    The result holds one ``row_kind='node'`` row per neighbouring dataset, endpoint or
+    service plus one ``row_kind='input'`` row whose ``node_type`` is the type of ``uid``
+    (NULL when it is unknown). Neighbours come from one range scan of ``ndp_neighbor``
+    per type, joined to the entity tables for their display fields.
+    """
+    input_rows = union_all(
+        select(literal("dataset").label("node_type"), literal(0).label("rank")).where(Dataset.uid == uid),
+        select(literal("endpoint").label("node_type"), literal(1).label("rank")).where(Endpoint.uid == uid),
+        select(literal("service").label("node_type"), literal(2).label("rank")).where(Service.uid == uid),
+    ).cte("input_rows")
+    input_type = select(input_rows.c.node_type).order_by(input_rows.c.rank).limit(1).scalar_subquery()
+
+    nodes = [
+        select(
+            literal("node").label("row_kind"),
+            literal(node_type).label("node_type"),
+            model.uid,
+            model.display_name,
+            model.ckan_name,
+        ).where(model.uid.in_(neighbor_uids(uid, node_type)), model.uid != uid)
+        for node_type, model in NODE_MODELS.items()
+    ]
+    return union_all(*nodes, select(literal("input"), input_type, null(), null(), null()))
 
 
 def _build_linked_entities(uid: UUID, db: Session) -> LinkedEntitiesResponse:
-    dataset = db.query(Dataset).filter(Dataset.uid == uid).first()
-    endpoint = db.query(Endpoint).filter(Endpoint.uid == uid).first()
-    service = db.query(Service).filter(Service.uid == uid).first()
-
-    if not any([dataset, endpoint, service]):
-        raise HTTPException(status_code=404, detail="No dataset, endpoint, or service found for the given uid")
-
-    dataset_uids: set[UUID] = set()
-    endpoint_uids: set[UUID] = set()
-    service_uids: set[UUID] = set()
-
-    if dataset:
-        input_type = "dataset"
-        endpoint_uids.update(
-            row.endpoint_uid
-            for row in db.query(DatasetEndpoint).filter(DatasetEndpoint.dataset_uid == uid).all()
-        )
-        service_uids.update(
-            row.service_uid
-            for row in db.query(DatasetService).filter(DatasetService.dataset_uid == uid).all()
-        )
-        for affinity in db.query(AffinityTriple).filter(AffinityTriple.dataset_uid == uid).all():
-            endpoint_uids.update(affinity.endpoint_uids or [])
-            service_uids.update(affinity.service_uids or [])
-
-    elif endpoint:
-        input_type = "endpoint"
-        dataset_uids.update(
-            row.dataset_uid
-            for row in db.query(DatasetEndpoint).filter(DatasetEndpoint.endpoint_uid == uid).all()
-        )
-        service_uids.update(
-            row.service_uid
-            for row in db.query(ServiceEndpoint).filter(ServiceEndpoint.endpoint_uid == uid).all()
-        )
-        for affinity in db.query(AffinityTriple).all():
-            affinity_endpoint_uids = affinity.endpoint_uids or []
-            if uid in affinity_endpoint_uids:
-                if affinity.dataset_uid:
-                    dataset_uids.add(affinity.dataset_uid)
-                endpoint_uids.update(affinity_endpoint_uids)
-                service_uids.update(affinity.service_uids or [])
+    rows = db.execute(_linked_statement(uid)).all()
+
+    input_type = next(row.node_type for row in rows if row.row_kind == "input")
+    if input_type is None:
+        raise HTTPException(status_code=404, detail=NOT_FOUND_DETAIL)
+
+    nodes: dict[str, list[LinkedNode]] = {node_type: [] for node_type in NODE_TYPES}
+    for row in rows:
+        if row.row_kind == "node":
+            nodes[row.node_type].append(linked_node(row))
+    return linked_response(uid, input_type, nodes)
+
+
+def _build_linked_entities_batch(uids: list[UUID], db: Session) -> list[LinkedEntitiesResponse]:
+    if not uids:
+        return []
+
+    types = classify_uids(db, set(uids))
+    for uid in uids:
+        if uid not in types:
+            raise HTTPException(status_code=404, detail=NOT_FOUND_DETAIL)
+
+    neighbours: dict[UUID, set[tuple[str, UUID]]] = {uid: set() for uid in types}
+    for uid, node_type, neighbour_uid, _via in neighbor_edges(db, types):
+        neighbours[uid].add((node_type, neighbour_uid))
+
+    uids_by_type: dict[str, set[UUID]] = {node_type: set() for node_type in NODE_TYPES}
+    for pairs in neighbours.values():
+        for node_type, neighbour_uid in pairs:
+            uids_by_type[node_type].add(neighbour_uid)
+    nodes: dict[UUID, LinkedNode] = {}
+    for node_type, node_uids in uids_by_type.items():
+        if node_uids:
+            nodes.update(load_nodes(db, node_type, node_uids))
+
+    responses = []
+    for uid in uids:
+        grouped: dict[str, list[LinkedNode]] = {node_type: [] for node_type in NODE_TYPES}
+        for node_type, neighbour_uid in neighbours[uid]:
+            if neighbour_uid != uid and neighbour_uid in nodes:
+                grouped[node_type].append(nodes[neighbour_uid])
+        responses.append(linked_response(uid, types[uid], grouped))
+    return responses
+
+
+def _linked_from_graph(graph: Graph, uids: list[UUID]) -> list[LinkedEntitiesResponse]:
+    responses = [graph.linked(uid) for uid in uids]
+    if any(response is None for response in responses):
+        raise HTTPException(status_code=404, detail=NOT_FOUND_DETAIL)
+    return responses
+
+
+def _traverse(db: Session, graph: Graph | None, uid: UUID, depth: int, max_nodes: int) -> TraversalResponse:
+    if graph is not None:
+        input_type = graph.types.get(uid)
+        expand = graph.edges
+    else:
+        input_type = classify_uids(db, {uid}).get(uid)
+
+        def expand(frontier):
+            return neighbor_edges(db, frontier)
+
+    if input_type is None:
+        raise HTTPException(status_code=404, detail=NOT_FOUND_DETAIL)
 
+    visited, edges, truncated = traverse(uid, input_type, expand, depth, max_nodes)
+
+    if graph is not None:
+        hydrated = {node_uid: graph.nodes[node_uid] for node_uid in visited}
     else:
-        input_type = "service"
-        dataset_uids.update(
-            row.dataset_uid
-            for row in db.query(DatasetService).filter(DatasetService.service_uid == uid).all()
-        )
-        endpoint_uids.update(
-            row.endpoint_uid
-            for row in db.query(ServiceEndpoint).filter(ServiceEndpoint.service_uid == uid).all()
-        )
-        for affinity in db.query(AffinityTriple).all():
-            affinity_service_uids = affinity.service_uids or []
-            if uid in affinity_service_uids:
-                if affinity.dataset_uid:
-                    dataset_uids.add(affinity.dataset_uid)
-                endpoint_uids.update(affinity.endpoint_uids or [])
-                service_uids.update(affinity_service_uids)
-
-    dataset_uids.discard(uid)
-    endpoint_uids.discard(uid)
-    service_uids.discard(uid)
-
-    datasets = []
-    if dataset_uids:
-        datasets = db.query(Dataset).filter(Dataset.uid.in_(dataset_uids)).all()
-
-    endpoints = []
-    if endpoint_uids:
-        endpoints = db.query(Endpoint).filter(Endpoint.uid.in_(endpoint_uids)).all()
-
-    services = []
-    if service_uids:
-        services = db.query(Service).filter(Service.uid.in_(service_uids)).all()
-
-    return LinkedEntitiesResponse(
+        hydrated = {}
+        for node_type in NODE_TYPES:
+            node_uids = {node_uid for node_uid, (t, _hop) in visited.items() if t == node_type}
+            if node_uids:
+                hydrated.update(load_nodes(db, node_type, node_uids))
+
+    nodes = [
+        TraversalNode(**hydrated[node_uid].model_dump(), type=node_type, hop=hop)
+        for node_uid, (node_type, hop) in visited.items()
+        if node_uid in hydrated
+    ]
+    return TraversalResponse(
         input_uid=uid,
         input_type=input_type,
-        datasets=sorted(
-            [LinkedNode(uid=item.uid, name=item.title, ckan_name=_ckan_name(item.metadata_)) for item in datasets],
-            key=lambda x: str(x.uid),
-        ),
-        endpoints=sorted(
-            [
-                LinkedNode(
-                    uid=item.uid,
-                    name=_endpoint_display_name(item),
-                    ckan_name=_ckan_name(item.metadata_),
-                )
-                for item in endpoints
-            ],
-            key=lambda x: str(x.uid),
-        ),
-        services=sorted(
-            [
-                LinkedNode(
-                    uid=item.uid,
-                    name=_service_display_name(item),
-                    ckan_name=_ckan_name(item.metadata_),
-                )
-                for item in services
-            ],
-            key=lambda x: str(x.uid),
+        depth=depth,
+        truncated=truncated,
+        nodes=sorted(nodes, key=lambda x: (x.hop, str(x.uid))),
+        edges=sorted(
+            (
+                TraversalEdge(source=source, target=target, via=via, hop=hop)
+                for source, target, via, hop in edges
+                if source in hydrated and target in hydrated
+            ),
+            key=lambda x: (x.hop, str(x.source), str(x.target), x.via),
         ),
     )
 
 
 @router.get("/{uid}", response_model=LinkedEntitiesResponse)
-def get_linked_entities(uid: UUID, db: Session = Depends(get_db)):
-    return _build_linked_entities(uid, db)
+async def get_linked_entities(
+    uid: UUID,
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    """Linked entities of ``uid``.
+
+    With the graph cache the ETag comes from the cache version, which every write
+    (in any worker, via ``ndp_changes``) bumps, so a matching client is answered
+    before the graph is touched. Without it the ETag hashes the response.
+    """
+    if settings.graph_cache_enabled:
+        etag = make_etag("linked", PROCESS_EPOCH, graph_cache.version, uid)
+        not_modified = conditional_response(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+        return _linked_from_graph(await graph_cache.graph_async(db.primary), [uid])[0]
+
+    linked = await db.run(lambda session: _build_linked_entities(uid, session))
+    return conditional_response(request, response, make_etag("linked", linked.model_dump_json())) or linked
 
 
 @router.post("/batch", response_model=list[LinkedEntitiesResponse])
-def get_linked_entities_batch(payload: LinkedEntitiesBatchRequest, db: Session = Depends(get_db)):
-    return [_build_linked_entities(uid, db) for uid in payload.uids]
+async def get_linked_entities_batch(
+    payload: LinkedEntitiesBatchRequest, db: SessionRunner = Depends(get_read_session_runner)
+):
+    if settings.graph_cache_enabled:
+        return _linked_from_graph(await graph_cache.graph_async(db.primary), payload.uids)
+    return await db.run(lambda session: _build_linked_entities_batch(payload.uids, session))
+
+
+@router.get("/{uid}/traverse", response_model=TraversalResponse)
+async def traverse_linked_entities(
+    uid: UUID,
+    depth: int = Query(2, ge=1, le=MAX_TRAVERSAL_DEPTH),
+    max_nodes: int = Query(500, ge=1, le=MAX_TRAVERSAL_NODES),
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    graph = await graph_cache.graph_async(db.primary) if settings.graph_cache_enabled else None
+    return await db.run(_traverse, graph, uid, depth, max_nodes)
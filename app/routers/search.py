@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.database import SessionRunner, get_read_session_runner
+from app.graph import NODE_TYPES
+from app.schemas.search import SearchResult
+from app.search import search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+MAX_SEARCH_RESULTS = 100
+
+
+@router.get("", response_model=list[SearchResult])
+async def search_entities(
+    q: str = Query(..., min_length=1),
+    types: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    """Rank datasets, endpoints and services matching ``q``; ``types`` restricts the entity types (comma-separated)."""
+    selected = [item.strip() for item in types.split(",") if item.strip()] if types else list(NODE_TYPES)
+    unknown = [item for item in selected if item not in NODE_TYPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown type '{unknown[0]}'")
+    return await db.run(search, q, selected, limit)
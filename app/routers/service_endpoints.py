@@ -1,12 +1,18 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert, existing_uids
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.graph_cache import graph_cache
+from app.pagination import paginate
 from app.models.endpoint import Endpoint
 from app.models.service import Service
 from app.models.service_endpoint import ServiceEndpoint
+from app.neighbors import refresh_neighbors
+from app.schemas.bulk import BulkResponse
 from app.schemas.service_endpoint import ServiceEndpointCreate, ServiceEndpointResponse
 
 router = APIRouter(prefix="/service-endpoints", tags=["service-endpoints"])
@@ -20,16 +26,25 @@ def validate_references(db: Session, service_uid: UUID, endpoint_uid: UUID):
 
 
 @router.get("", response_model=list[ServiceEndpointResponse])
-def list_service_endpoints(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(ServiceEndpoint).offset(skip).limit(limit).all()
+async def list_service_endpoints(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [ServiceEndpoint.service_uid, ServiceEndpoint.endpoint_uid]
+    return await db.run(lambda session: paginate(session.query(ServiceEndpoint), response, keys, skip, limit, cursor))
 
 
 @router.get("/{service_uid}/{endpoint_uid}", response_model=ServiceEndpointResponse)
-def get_service_endpoint(service_uid: UUID, endpoint_uid: UUID, db: Session = Depends(get_db)):
-    item = db.query(ServiceEndpoint).filter(
-        ServiceEndpoint.service_uid == service_uid,
-        ServiceEndpoint.endpoint_uid == endpoint_uid
-    ).first()
+async def get_service_endpoint(service_uid: UUID, endpoint_uid: UUID, db: SessionRunner = Depends(get_read_session_runner)):
+    item = await db.run(
+        lambda session: session.query(ServiceEndpoint).filter(
+            ServiceEndpoint.service_uid == service_uid,
+            ServiceEndpoint.endpoint_uid == endpoint_uid
+        ).first()
+    )
     if not item:
         raise HTTPException(status_code=404, detail="ServiceEndpoint not found")
     return item
@@ -45,11 +60,40 @@ def create_service_endpoint(data: ServiceEndpointCreate, db: Session = Depends(g
         attrs=data.attrs,
     )
     db.add(item)
+    refresh_neighbors(db, [data.service_uid, data.endpoint_uid])
     db.commit()
+    graph_cache.invalidate()
     db.refresh(item)
     return item
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_service_endpoints(
+    items: list[ServiceEndpointCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create links, or update ``role``/``attrs`` of links that already exist."""
+    services = existing_uids(db, Service.uid, [item.service_uid for item in items])
+    endpoints = existing_uids(db, Endpoint.uid, [item.endpoint_uid for item in items])
+    now = datetime.utcnow()
+    rows: list[dict | None] = []
+    errors: dict[int, str] = {}
+    for index, item in enumerate(items):
+        if item.service_uid not in services:
+            errors[index] = f"Service '{item.service_uid}' not found"
+        elif item.endpoint_uid not in endpoints:
+            errors[index] = f"Endpoint '{item.endpoint_uid}' not found"
+        rows.append(None if index in errors else {**item.model_dump(), "updated_at": now})
+
+    result = bulk_upsert(
+        db, ServiceEndpoint, rows, errors, ["service_uid", "endpoint_uid"], ["role", "attrs", "updated_at"]
+    )
+    refresh_neighbors(db, [uid for row in rows if row for uid in (row["service_uid"], row["endpoint_uid"])])
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.delete("/{service_uid}/{endpoint_uid}", status_code=204)
 def delete_service_endpoint(service_uid: UUID, endpoint_uid: UUID, db: Session = Depends(get_db)):
     item = db.query(ServiceEndpoint).filter(
@@ -59,4 +103,6 @@ def delete_service_endpoint(service_uid: UUID, endpoint_uid: UUID, db: Session =
     if not item:
         raise HTTPException(status_code=404, detail="ServiceEndpoint not found")
     db.delete(item)
+    refresh_neighbors(db, [service_uid, endpoint_uid])
     db.commit()
+    graph_cache.invalidate()
@@ -1,26 +1,64 @@
+import uuid
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.bulk import MAX_BULK_ITEMS, bulk_upsert
+from app.conditional import conditional_response, entity_etag
+from app.database import SessionRunner, get_db, get_read_session_runner
+from app.filters import ListFilters
+from app.graph_cache import graph_cache
+from app.pagination import paginate
+from app.projection import Projection
 from app.models.service import Service
-from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
+from app.neighbors import refresh_neighbors
+from app.schemas.bulk import BulkResponse
+from app.schemas.service import ServiceBulkItem, ServiceCreate, ServiceUpdate, ServiceResponse
 
 router = APIRouter(prefix="/services", tags=["services"])
 
 
 @router.get("", response_model=list[ServiceResponse])
-def list_services(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Service).offset(skip).limit(limit).all()
+async def list_services(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    fields: str | None = None,
+    metadata_keys: str | None = None,
+    metadata: str | None = None,
+    metadata_has: str | None = None,
+    type: str | None = None,
+    source_ep: str | None = None,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    keys = [Service.created_at, Service.uid]
+    filters = ListFilters.parse(Service, metadata, metadata_has, type=type, source_ep=source_ep)
+    projection = Projection.parse(Service, ServiceResponse, fields, metadata_keys)
+    if projection is None:
+        return await db.run(
+            lambda session: paginate(filters.apply(session.query(Service)), response, keys, skip, limit, cursor)
+        )
+    rows = await db.run(lambda session: paginate(
+        filters.apply(session.query(*projection.columns(keys))), response, keys, skip, limit, cursor
+    ))
+    return projection.render(rows, response)
 
 
 @router.get("/{uid}", response_model=ServiceResponse)
-def get_service(uid: UUID, db: Session = Depends(get_db)):
-    service = db.query(Service).filter(Service.uid == uid).first()
+async def get_service(
+    uid: UUID,
+    request: Request,
+    response: Response,
+    db: SessionRunner = Depends(get_read_session_runner),
+):
+    service = await db.run(lambda session: session.query(Service).filter(Service.uid == uid).first())
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    return service
+    etag = entity_etag(Service, service.uid, service.updated_at)
+    return conditional_response(request, response, etag, service.updated_at) or service
 
 
 @router.post("", response_model=ServiceResponse, status_code=201)
@@ -34,10 +72,38 @@ def create_service(data: ServiceCreate, db: Session = Depends(get_db)):
     )
     db.add(service)
     db.commit()
+    graph_cache.invalidate()
     db.refresh(service)
     return service
 
 
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert_services(
+    items: list[ServiceBulkItem] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    """Create services, or update them in place when ``uid`` names an existing one."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "uid": item.uid or uuid.uuid4(),
+            "type": item.type,
+            "openapi_url": item.openapi_url,
+            "version": item.version,
+            "source_ep": item.source_ep,
+            "metadata": item.metadata,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+    update_columns = ["type", "openapi_url", "version", "source_ep", "metadata", "updated_at"]
+    result = bulk_upsert(db, Service, rows, {}, ["uid"], update_columns)
+    db.commit()
+    graph_cache.invalidate()
+    return result
+
+
 @router.put("/{uid}", response_model=ServiceResponse)
 def update_service(uid: UUID, data: ServiceUpdate, db: Session = Depends(get_db)):
     service = db.query(Service).filter(Service.uid == uid).first()
@@ -52,6 +118,7 @@ def update_service(uid: UUID, data: ServiceUpdate, db: Session = Depends(get_db)
         setattr(service, field, value)
 
     db.commit()
+    graph_cache.invalidate()
     db.refresh(service)
     return service
 
@@ -62,4 +129,6 @@ def delete_service(uid: UUID, db: Session = Depends(get_db)):
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     db.delete(service)
+    refresh_neighbors(db, [uid])
     db.commit()
+    graph_cache.invalidate()
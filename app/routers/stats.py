@@ -0,0 +1,202 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import distinct, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_read_db, primary_session
+from app.graph_cache import graph_cache
+from app.metrics import record_cache_lookup
+from app.models.affinity_triple import AffinityTriple
+from app.models.affinity_triple_endpoint import AffinityTripleEndpoint
+from app.models.affinity_triple_service import AffinityTripleService
+from app.models.dataset import Dataset
+from app.models.dataset_endpoint import DatasetEndpoint
+from app.models.dataset_service import DatasetService
+from app.models.endpoint import Endpoint
+from app.models.service import Service
+from app.models.service_endpoint import ServiceEndpoint
+from app.schemas.stats import (
+    DatasetHub,
+    EdgeRoleCounts,
+    EntityCounts,
+    LabelCount,
+    LatestAffinity,
+    NodeCounts,
+    RoleCount,
+    StatsResponse,
+    VersionCount,
+)
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+TOP_LIMIT = 5
+
+# (graph_cache.version, StatsResponse) of the last computation, reused while no
+# write has invalidated the graph cache.
+_materialized: tuple[int, StatsResponse] | None = None
+
+
+def _count(key: str, model, *criteria, column=None):
+    counted = func.count(distinct(column)) if column is not None else func.count()
+    return select(literal(key).label("key"), counted.label("total")).select_from(model).where(*criteria)
+
+
+def _scalar_counts(db: Session) -> dict[str, int]:
+    dataset_linked = union_all(
+        select(DatasetEndpoint.dataset_uid),
+        select(DatasetService.dataset_uid),
+        select(AffinityTriple.dataset_uid).where(AffinityTriple.dataset_uid.is_not(None)),
+    )
+    endpoint_linked = union_all(
+        select(DatasetEndpoint.endpoint_uid),
+        select(ServiceEndpoint.endpoint_uid),
+        select(AffinityTripleEndpoint.endpoint_uid),
+    )
+    service_linked = union_all(
+        select(DatasetService.service_uid),
+        select(ServiceEndpoint.service_uid),
+        select(AffinityTripleService.service_uid),
+    )
+    statement = union_all(
+        _count("datasets", Dataset),
+        _count("endpoints", Endpoint),
+        _count("services", Service),
+        _count("dataset_endpoints", DatasetEndpoint),
+        _count("dataset_services", DatasetService),
+        _count("service_endpoints", ServiceEndpoint),
+        _count("affinities", AffinityTriple),
+        _count("affinity_endpoint_members", AffinityTripleEndpoint),
+        _count("affinity_service_members", AffinityTripleService),
+        _count("covered_datasets", AffinityTriple, column=AffinityTriple.dataset_uid),
+        _count("covered_endpoints", AffinityTripleEndpoint, column=AffinityTripleEndpoint.endpoint_uid),
+        _count("covered_services", AffinityTripleService, column=AffinityTripleService.service_uid),
+        _count("orphan_datasets", Dataset, Dataset.uid.not_in(dataset_linked)),
+        _count("orphan_endpoints", Endpoint, Endpoint.uid.not_in(endpoint_linked)),
+        _count("orphan_services", Service, Service.uid.not_in(service_linked)),
+    )
+    return {row.key: row.total for row in db.execute(statement)}
+
+
+def _edge_roles(db: Session) -> EdgeRoleCounts:
+    statement = union_all(
+        *[
+            select(literal(key).label("key"), model.role, func.count().label("total")).group_by(model.role)
+            for key, model in (
+                ("dataset_endpoints", DatasetEndpoint),
+                ("dataset_services", DatasetService),
+                ("service_endpoints", ServiceEndpoint),
+            )
+        ]
+    )
+    roles: dict[str, list[RoleCount]] = {"dataset_endpoints": [], "dataset_services": [], "service_endpoints": []}
+    for row in db.execute(statement):
+        roles[row.key].append(RoleCount(role=row.role, count=row.total))
+    for counts in roles.values():
+        counts.sort(key=lambda x: (-x.count, x.role or ""))
+    return EdgeRoleCounts(**roles)
+
+
+def _top_labels(db: Session, column, uid_column, members) -> list[LabelCount]:
+    label = func.coalesce(column, "unknown")
+    rows = db.execute(
+        select(label.label("label"), func.count().label("total"))
+        .where(uid_column.in_(select(members)))
+        .group_by(label)
+        .order_by(func.count().desc(), label)
+        .limit(TOP_LIMIT)
+    )
+    return [LabelCount(label=row.label, count=row.total) for row in rows]
+
+
+def compute_stats(db: Session) -> StatsResponse:
+    """Compute the dashboard figures with aggregate queries."""
+    counts = _scalar_counts(db)
+
+    versions = db.execute(
+        select(AffinityTriple.version, func.count().label("total"))
+        .group_by(AffinityTriple.version)
+        .order_by(AffinityTriple.version)
+    )
+
+    hub_total = func.count().label("total")
+    hubs = db.execute(
+        select(AffinityTriple.dataset_uid, Dataset.title, hub_total)
+        .join(Dataset, Dataset.uid == AffinityTriple.dataset_uid)
+        .group_by(AffinityTriple.dataset_uid, Dataset.title)
+        .order_by(hub_total.desc(), AffinityTriple.dataset_uid)
+        .limit(TOP_LIMIT)
+    )
+
+    endpoint_count = (
+        select(func.count())
+        .where(AffinityTripleEndpoint.triple_uid == AffinityTriple.triple_uid)
+        .scalar_subquery()
+    )
+    service_count = (
+        select(func.count())
+        .where(AffinityTripleService.triple_uid == AffinityTriple.triple_uid)
+        .scalar_subquery()
+    )
+    latest = db.execute(
+        select(
+            AffinityTriple.triple_uid,
+            AffinityTriple.dataset_uid,
+            Dataset.title,
+            AffinityTriple.updated_at,
+            endpoint_count.label("endpoint_count"),
+            service_count.label("service_count"),
+        )
+        .outerjoin(Dataset, Dataset.uid == AffinityTriple.dataset_uid)
+        .order_by(AffinityTriple.updated_at.desc(), AffinityTriple.triple_uid)
+        .limit(TOP_LIMIT)
+    )
+
+    return StatsResponse(
+        counts=EntityCounts(**{key: counts[key] for key in EntityCounts.model_fields}),
+        covered=NodeCounts(
+            datasets=counts["covered_datasets"],
+            endpoints=counts["covered_endpoints"],
+            services=counts["covered_services"],
+        ),
+        orphans=NodeCounts(
+            datasets=counts["orphan_datasets"],
+            endpoints=counts["orphan_endpoints"],
+            services=counts["orphan_services"],
+        ),
+        edge_roles=_edge_roles(db),
+        affinity_versions=[VersionCount(version=row.version, count=row.total) for row in versions],
+        affinity_endpoint_members=counts["affinity_endpoint_members"],
+        affinity_service_members=counts["affinity_service_members"],
+        top_datasets=[DatasetHub(uid=row.dataset_uid, name=row.title, count=row.total) for row in hubs],
+        top_endpoint_kinds=_top_labels(db, Endpoint.kind, Endpoint.uid, AffinityTripleEndpoint.endpoint_uid),
+        top_service_types=_top_labels(db, Service.type, Service.uid, AffinityTripleService.service_uid),
+        latest_affinities=[
+            LatestAffinity(
+                triple_uid=row.triple_uid,
+                dataset_uid=row.dataset_uid,
+                dataset_name=row.title,
+                endpoint_count=row.endpoint_count,
+                service_count=row.service_count,
+                updated_at=row.updated_at,
+            )
+            for row in latest
+        ],
+    )
+
+
+@router.get("", response_model=StatsResponse)
+def get_stats(db: Session = Depends(get_read_db)):
+    global _materialized
+    if not settings.graph_cache_enabled:
+        return compute_stats(db)
+
+    version = graph_cache.version
+    materialized = _materialized
+    hit = materialized is not None and materialized[0] == version
+    record_cache_lookup("stats", hit)
+    if hit:
+        return materialized[1]
+    # Computed on the primary: the cached figures must match the version they are keyed by.
+    stats = compute_stats(primary_session(db))
+    _materialized = (version, stats)
+    return stats
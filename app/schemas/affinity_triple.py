@@ -13,6 +13,10 @@ class AffinityTripleCreate(BaseModel):
     version: int | None = None
 
 
+class AffinityTripleBulkItem(AffinityTripleCreate):
+    triple_uid: UUID | None = None
+
+
 class AffinityTripleUpdate(BaseModel):
     dataset_uid: UUID | None = None
     endpoint_uids: list[UUID] | None = None
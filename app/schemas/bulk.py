@@ -0,0 +1,18 @@
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "skipped", "error"]
+    uid: UUID | None = None
+    detail: str | None = None
+
+
+class BulkResponse(BaseModel):
+    created: int
+    updated: int
+    errors: int
+    results: list[BulkItemResult]
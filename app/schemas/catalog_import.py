@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    records: int = 0
+    applied: dict[str, int] = Field(default_factory=dict)
+    error_count: int = 0
+    errors: list[ImportLineError] = Field(default_factory=list)
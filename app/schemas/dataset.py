@@ -11,6 +11,10 @@ class DatasetCreate(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class DatasetBulkItem(DatasetCreate):
+    uid: UUID | None = None
+
+
 class DatasetUpdate(BaseModel):
     title: str | None = None
     source_ep: str | None = None
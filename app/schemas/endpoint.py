@@ -11,6 +11,10 @@ class EndpointCreate(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class EndpointBulkItem(EndpointCreate):
+    uid: UUID | None = None
+
+
 class EndpointUpdate(BaseModel):
     kind: str | None = None
     url: str | None = None
@@ -20,3 +20,24 @@ class LinkedEntitiesResponse(BaseModel):
 
 class LinkedEntitiesBatchRequest(BaseModel):
     uids: list[UUID]
+
+
+class TraversalNode(LinkedNode):
+    type: Literal["dataset", "endpoint", "service"]
+    hop: int
+
+
+class TraversalEdge(BaseModel):
+    source: UUID
+    target: UUID
+    via: Literal["dataset_endpoint", "dataset_service", "service_endpoint", "affinity"]
+    hop: int
+
+
+class TraversalResponse(BaseModel):
+    input_uid: UUID
+    input_type: Literal["dataset", "endpoint", "service"]
+    depth: int
+    truncated: bool
+    nodes: list[TraversalNode]
+    edges: list[TraversalEdge]
@@ -0,0 +1,8 @@
+from typing import Literal
+
+from app.schemas.linked import LinkedNode
+
+
+class SearchResult(LinkedNode):
+    type: Literal["dataset", "endpoint", "service"]
+    score: float
@@ -13,6 +13,10 @@ class ServiceCreate(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class ServiceBulkItem(ServiceCreate):
+    uid: UUID | None = None
+
+
 class ServiceUpdate(BaseModel):
     type: str | None = None
     openapi_url: str | None = None
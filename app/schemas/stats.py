@@ -0,0 +1,70 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class EntityCounts(BaseModel):
+    datasets: int
+    endpoints: int
+    services: int
+    dataset_endpoints: int
+    dataset_services: int
+    service_endpoints: int
+    affinities: int
+
+
+class NodeCounts(BaseModel):
+    datasets: int
+    endpoints: int
+    services: int
+
+
+class RoleCount(BaseModel):
+    role: str | None = None
+    count: int
+
+
+class EdgeRoleCounts(BaseModel):
+    dataset_endpoints: list[RoleCount]
+    dataset_services: list[RoleCount]
+    service_endpoints: list[RoleCount]
+
+
+class VersionCount(BaseModel):
+    version: int | None = None
+    count: int
+
+
+class LabelCount(BaseModel):
+    label: str
+    count: int
+
+
+class DatasetHub(BaseModel):
+    uid: UUID
+    name: str | None = None
+    count: int
+
+
+class LatestAffinity(BaseModel):
+    triple_uid: UUID
+    dataset_uid: UUID | None = None
+    dataset_name: str | None = None
+    endpoint_count: int
+    service_count: int
+    updated_at: datetime
+
+
+class StatsResponse(BaseModel):
+    counts: EntityCounts
+    covered: NodeCounts
+    orphans: NodeCounts
+    edge_roles: EdgeRoleCounts
+    affinity_versions: list[VersionCount]
+    affinity_endpoint_members: int
+    affinity_service_members: int
+    top_datasets: list[DatasetHub]
+    top_endpoint_kinds: list[LabelCount]
+    top_service_types: list[LabelCount]
+    latest_affinities: list[LatestAffinity]
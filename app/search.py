@@ -0,0 +1,104 @@
+"""Ranked full-text and fuzzy search over datasets, endpoints and services.
+
+On PostgreSQL each entity table carries generated ``search_vector`` (tsvector) and
+``search_text`` columns with GIN indexes (migration 013): words are matched with
+``websearch_to_tsquery`` and misspellings with ``pg_trgm`` word similarity. On
+SQLite every entity table has an FTS5 side table kept current by triggers, and
+words are matched by prefix.
+"""
+import re
+from uuid import UUID
+
+from sqlalchemy import DDL, Float, String, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column
+
+from app.database import Base
+from app.graph import NODE_MODELS, NODE_TYPES, load_nodes
+from app.schemas.search import SearchResult
+from app.types import GUID
+
+# Name columns (ranked first) and the metadata keys indexed for each entity type.
+SEARCH_COLUMNS = {"dataset": ("title",), "endpoint": ("kind", "url"), "service": ("type", "openapi_url")}
+SEARCH_METADATA_KEYS = ("ckan_name", "keywords", "ndp_ep_name")
+
+_WORD = re.compile(r"\w+")
+
+
+def _sqlite_body(row: str, node_type: str) -> str:
+    parts = [f"{row}.{name}" for name in SEARCH_COLUMNS[node_type]]
+    parts += [f"json_extract({row}.metadata, '$.{key}')" for key in SEARCH_METADATA_KEYS]
+    return " || ' ' || ".join(f"coalesce({part}, '')" for part in parts)
+
+
+def _sqlite_ddl(node_type: str) -> list[str]:
+    table = NODE_MODELS[node_type].__tablename__
+    fts = f"{table}_search"
+    insert = f"INSERT INTO {fts}(rowid, body) VALUES (new.rowid, {_sqlite_body('new', node_type)});"
+    delete = f"DELETE FROM {fts} WHERE rowid = old.rowid;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(body)",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+    ]
+
+
+for _node_type in NODE_TYPES:
+    for _statement in _sqlite_ddl(_node_type):
+        event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        Base.metadata,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {NODE_MODELS[_node_type].__tablename__}_search").execute_if(dialect="sqlite"),
+    )
+
+
+def _postgresql_select(node_type: str) -> str:
+    return (
+        f"SELECT '{node_type}' AS node_type, uid, "
+        "ts_rank(search_vector, query.tsquery) + word_similarity(:q, search_text) AS score "
+        f"FROM {NODE_MODELS[node_type].__tablename__}, query "
+        "WHERE search_vector @@ query.tsquery OR :q <% search_text"
+    )
+
+
+def _sqlite_select(node_type: str) -> str:
+    table = NODE_MODELS[node_type].__tablename__
+    return (
+        f"SELECT '{node_type}' AS node_type, {table}.uid, -bm25({table}_search) AS score "
+        f"FROM {table}_search JOIN {table} ON {table}.rowid = {table}_search.rowid "
+        f"WHERE {table}_search MATCH :match"
+    )
+
+
+def search(db: Session, q: str, types: list[str], limit: int) -> list[SearchResult]:
+    """The ``limit`` best matches for ``q`` among ``types``, best first."""
+    if db.get_bind().dialect.name == "postgresql":
+        statement = (
+            "WITH query AS (SELECT websearch_to_tsquery('simple', :q) AS tsquery) "
+            + " UNION ALL ".join(_postgresql_select(node_type) for node_type in types)
+        )
+        params = {"q": q}
+    else:
+        words = _WORD.findall(q)
+        if not words:
+            return []
+        statement = " UNION ALL ".join(_sqlite_select(node_type) for node_type in types)
+        params = {"match": " ".join(f'"{word}"*' for word in words)}
+
+    hits = db.execute(
+        text(f"{statement} ORDER BY score DESC LIMIT :limit")
+        .columns(column("node_type", String), column("uid", GUID()), column("score", Float)),
+        {**params, "limit": limit},
+    ).all()
+
+    nodes = {}
+    for node_type in {hit.node_type for hit in hits}:
+        uids: set[UUID] = {hit.uid for hit in hits if hit.node_type == node_type}
+        nodes.update(load_nodes(db, node_type, uids))
+    return [
+        SearchResult(type=hit.node_type, score=hit.score, **nodes[hit.uid].model_dump())
+        for hit in hits
+        if hit.uid in nodes
+    ]
@@ -4,6 +4,7 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from app.affinity_members import sync_affinity_members
 from app.database import SessionLocal
 from app.models.affinity_triple import AffinityTriple
 from app.models.dataset import Dataset
@@ -12,6 +13,7 @@ from app.models.dataset_service import DatasetService
 from app.models.endpoint import Endpoint
 from app.models.service import Service
 from app.models.service_endpoint import ServiceEndpoint
+from app.neighbors import rebuild_neighbors
 
 SEED_SOURCE_EP = "demo-seed-ui-v1"
 SEED_VERSION = 1
@@ -192,6 +194,7 @@ def reset_seed_data(db: Session) -> None:
     db.query(Dataset).filter(Dataset.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
     db.query(Service).filter(Service.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
     db.query(Endpoint).filter(Endpoint.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
+    rebuild_neighbors(db)
     db.commit()
 
 
@@ -276,6 +279,7 @@ def create_relationships_and_affinities(
     endpoints: list[Endpoint],
 ) -> None:
     total = len(datasets)
+    affinities: list[AffinityTriple] = []
 
     for idx in range(total):
         dataset = datasets[idx]
@@ -343,7 +347,12 @@ def create_relationships_and_affinities(
             version=SEED_VERSION,
         )
         db.add(affinity)
+        affinities.append(affinity)
 
+    db.flush()
+    for affinity in affinities:
+        sync_affinity_members(db, affinity)
+    rebuild_neighbors(db)
     db.commit()
 
 
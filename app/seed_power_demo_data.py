@@ -5,6 +5,7 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from app.affinity_members import sync_affinity_members
 from app.database import SessionLocal
 from app.models.affinity_triple import AffinityTriple
 from app.models.dataset import Dataset
@@ -13,6 +14,7 @@ from app.models.dataset_service import DatasetService
 from app.models.endpoint import Endpoint
 from app.models.service import Service
 from app.models.service_endpoint import ServiceEndpoint
+from app.neighbors import rebuild_neighbors
 
 SEED_SOURCE_EP = "demo-seed-power-v1"
 
@@ -100,6 +102,7 @@ def reset_seed_data(db: Session) -> None:
     db.query(Dataset).filter(Dataset.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
     db.query(Service).filter(Service.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
     db.query(Endpoint).filter(Endpoint.source_ep == SEED_SOURCE_EP).delete(synchronize_session=False)
+    rebuild_neighbors(db)
     db.commit()
 
 
@@ -201,7 +204,7 @@ def link_graph(
     ds_ep_edges = 0
     ds_svc_edges = 0
     svc_ep_edges = 0
-    affinity_rows = 0
+    affinities: list[AffinityTriple] = []
 
     for svc in services:
         endpoint_count = rng.randint(2, min(5, len(endpoints)))
@@ -260,24 +263,27 @@ def link_graph(
             triple_services = rng.sample(selected_svcs, rng.randint(1, len(selected_svcs)))
             triple_endpoints = rng.sample(selected_eps, rng.randint(1, len(selected_eps)))
 
-            db.add(
-                AffinityTriple(
-                    dataset_uid=ds.uid,
-                    service_uids=[svc.uid for svc in triple_services],
-                    endpoint_uids=[ep.uid for ep in triple_endpoints],
-                    attrs={
-                        "seed_source": SEED_SOURCE_EP,
-                        "scenario": f"pipeline-{idx + 1:03d}-{t + 1}",
-                        "confidence": round(rng.uniform(0.78, 0.99), 2),
-                        "notes": "Synthetic multi-hop affinity for high-coverage demo",
-                    },
-                    version=rng.randint(1, 5),
-                )
+            affinity = AffinityTriple(
+                dataset_uid=ds.uid,
+                service_uids=[svc.uid for svc in triple_services],
+                endpoint_uids=[ep.uid for ep in triple_endpoints],
+                attrs={
+                    "seed_source": SEED_SOURCE_EP,
+                    "scenario": f"pipeline-{idx + 1:03d}-{t + 1}",
+                    "confidence": round(rng.uniform(0.78, 0.99), 2),
+                    "notes": "Synthetic multi-hop affinity for high-coverage demo",
+                },
+                version=rng.randint(1, 5),
             )
-            affinity_rows += 1
+            db.add(affinity)
+            affinities.append(affinity)
 
+    db.flush()
+    for affinity in affinities:
+        sync_affinity_members(db, affinity)
+    rebuild_neighbors(db)
     db.commit()
-    return ds_ep_edges, ds_svc_edges, svc_ep_edges, affinity_rows
+    return ds_ep_edges, ds_svc_edges, svc_ep_edges, len(affinities)
 
 
 def seed_demo_power(reset: bool, datasets_n: int, services_n: int, endpoints_n: int, seed: int) -> SeedOutput:
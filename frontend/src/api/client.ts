@@ -6,9 +6,14 @@ import type {
   DatasetEndpoint, DatasetEndpointCreate,
   DatasetService, DatasetServiceCreate,
   ServiceEndpoint, ServiceEndpointCreate,
-  Affinity, AffinityCreate, AffinityUpdate
+  Affinity, AffinityCreate, AffinityUpdate,
+  LinkedEntities, Traversal, GraphSnapshot, Stats
 } from '../types';
 
+export type ListParams = { skip?: number; limit?: number; cursor?: string };
+
+export const NEXT_CURSOR_HEADER = 'x-next-cursor';
+
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 const api = axios.create({
@@ -20,7 +25,7 @@ const api = axios.create({
 
 // Endpoints
 export const endpointsApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<Endpoint[]>('/ep', { params }),
+  list: (params?: ListParams) => api.get<Endpoint[]>('/ep', { params }),
   get: (uid: string) => api.get<Endpoint>(`/ep/${uid}`),
   create: (data: EndpointCreate) => api.post<Endpoint>('/ep', data),
   update: (uid: string, data: EndpointUpdate) => api.put<Endpoint>(`/ep/${uid}`, data),
@@ -29,7 +34,7 @@ export const endpointsApi = {
 
 // Datasets
 export const datasetsApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<Dataset[]>('/datasets', { params }),
+  list: (params?: ListParams) => api.get<Dataset[]>('/datasets', { params }),
   get: (uid: string) => api.get<Dataset>(`/datasets/${uid}`),
   create: (data: DatasetCreate) => api.post<Dataset>('/datasets', data),
   update: (uid: string, data: DatasetUpdate) => api.put<Dataset>(`/datasets/${uid}`, data),
@@ -38,7 +43,7 @@ export const datasetsApi = {
 
 // Services
 export const servicesApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<Service[]>('/services', { params }),
+  list: (params?: ListParams) => api.get<Service[]>('/services', { params }),
   get: (uid: string) => api.get<Service>(`/services/${uid}`),
   create: (data: ServiceCreate) => api.post<Service>('/services', data),
   update: (uid: string, data: ServiceUpdate) => api.put<Service>(`/services/${uid}`, data),
@@ -47,7 +52,7 @@ export const servicesApi = {
 
 // Dataset-Endpoints
 export const datasetEndpointsApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<DatasetEndpoint[]>('/dataset-endpoints', { params }),
+  list: (params?: ListParams) => api.get<DatasetEndpoint[]>('/dataset-endpoints', { params }),
   get: (datasetUid: string, endpointUid: string) =>
     api.get<DatasetEndpoint>(`/dataset-endpoints/${datasetUid}/${endpointUid}`),
   create: (data: DatasetEndpointCreate) => api.post<DatasetEndpoint>('/dataset-endpoints', data),
@@ -57,7 +62,7 @@ export const datasetEndpointsApi = {
 
 // Dataset-Services
 export const datasetServicesApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<DatasetService[]>('/dataset-services', { params }),
+  list: (params?: ListParams) => api.get<DatasetService[]>('/dataset-services', { params }),
   get: (datasetUid: string, serviceUid: string) =>
     api.get<DatasetService>(`/dataset-services/${datasetUid}/${serviceUid}`),
   create: (data: DatasetServiceCreate) => api.post<DatasetService>('/dataset-services', data),
@@ -67,7 +72,7 @@ export const datasetServicesApi = {
 
 // Service-Endpoints
 export const serviceEndpointsApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<ServiceEndpoint[]>('/service-endpoints', { params }),
+  list: (params?: ListParams) => api.get<ServiceEndpoint[]>('/service-endpoints', { params }),
   get: (serviceUid: string, endpointUid: string) =>
     api.get<ServiceEndpoint>(`/service-endpoints/${serviceUid}/${endpointUid}`),
   create: (data: ServiceEndpointCreate) => api.post<ServiceEndpoint>('/service-endpoints', data),
@@ -77,11 +82,27 @@ export const serviceEndpointsApi = {
 
 // Affinities
 export const affinitiesApi = {
-  list: (params?: { skip?: number; limit?: number }) => api.get<Affinity[]>('/affinities', { params }),
+  list: (params?: ListParams) => api.get<Affinity[]>('/affinities', { params }),
   get: (uid: string) => api.get<Affinity>(`/affinities/${uid}`),
   create: (data: AffinityCreate) => api.post<Affinity>('/affinities', data),
   update: (uid: string, data: AffinityUpdate) => api.put<Affinity>(`/affinities/${uid}`, data),
   delete: (uid: string) => api.delete(`/affinities/${uid}`),
 };
 
+// Linked entities
+export const linkedApi = {
+  get: (uid: string) => api.get<LinkedEntities>(`/linked/${uid}`),
+  batch: (uids: string[]) => api.post<LinkedEntities[]>('/linked/batch', { uids }),
+  traverse: (uid: string, params?: { depth?: number; max_nodes?: number }) =>
+    api.get<Traversal>(`/linked/${uid}/traverse`, { params }),
+};
+
+export const graphApi = {
+  snapshot: () => api.get<GraphSnapshot>('/graph/snapshot'),
+};
+
+export const statsApi = {
+  get: () => api.get<Stats>('/stats'),
+};
+
 export default api;
@@ -1,6 +1,8 @@
 import { useEffect, useMemo, useState } from 'react';
 import { useSearchParams } from 'react-router-dom';
-import { affinitiesApi, datasetsApi, endpointsApi, servicesApi } from '../api/client';
+import type { AxiosResponse } from 'axios';
+import { NEXT_CURSOR_HEADER, affinitiesApi, datasetsApi, endpointsApi, servicesApi } from '../api/client';
+import type { ListParams } from '../api/client';
 import { Pagination } from '../components/Pagination';
 import type { Affinity, AffinityCreate, Dataset, Endpoint, Service } from '../types';
 
@@ -40,15 +42,15 @@ export function Affinities() {
   const [attrsError, setAttrsError] = useState<string | null>(null);
 
   const fetchAll = async <T,>(
-    listFn: (params?: { skip?: number; limit?: number }) => Promise<{ data: T[] }>
+    listFn: (params?: ListParams) => Promise<AxiosResponse<T[]>>
   ): Promise<T[]> => {
     const all: T[] = [];
-    let skip = 0;
+    let cursor: string | undefined;
     while (true) {
-      const response = await listFn({ skip, limit: FETCH_LIMIT });
+      const response = await listFn({ cursor, limit: FETCH_LIMIT });
       all.push(...response.data);
-      if (response.data.length < FETCH_LIMIT) break;
-      skip += FETCH_LIMIT;
+      cursor = response.headers[NEXT_CURSOR_HEADER] || undefined;
+      if (!cursor) break;
     }
     return all;
   };
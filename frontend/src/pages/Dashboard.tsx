@@ -1,24 +1,8 @@
 import { useEffect, useMemo, useState } from 'react';
 import type { CSSProperties } from 'react';
 import { Link } from 'react-router-dom';
-import {
-  affinitiesApi,
-  datasetEndpointsApi,
-  datasetServicesApi,
-  datasetsApi,
-  endpointsApi,
-  serviceEndpointsApi,
-  servicesApi
-} from '../api/client';
-import type {
-  Affinity,
-  Dataset,
-  DatasetEndpoint,
-  DatasetService,
-  Endpoint,
-  Service,
-  ServiceEndpoint
-} from '../types';
+import { statsApi } from '../api/client';
+import type { Stats } from '../types';
 
 function pct(numerator: number, denominator: number): number {
   if (!denominator) return 0;
@@ -29,8 +13,6 @@ function shortUid(uid: string): string {
   return uid.slice(0, 8);
 }
 
-const FETCH_LIMIT = 1000;
-
 const DEMO_STEPS = [
   {
     title: 'Nodes',
@@ -61,60 +43,17 @@ const DEMO_STEPS = [
 export function Dashboard() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
-  const [affinities, setAffinities] = useState<Affinity[]>([]);
-  const [datasets, setDatasets] = useState<Dataset[]>([]);
-  const [endpoints, setEndpoints] = useState<Endpoint[]>([]);
-  const [services, setServices] = useState<Service[]>([]);
-  const [datasetEndpoints, setDatasetEndpoints] = useState<DatasetEndpoint[]>([]);
-  const [datasetServices, setDatasetServices] = useState<DatasetService[]>([]);
-  const [serviceEndpoints, setServiceEndpoints] = useState<ServiceEndpoint[]>([]);
+  const [stats, setStats] = useState<Stats | null>(null);
 
   const [demoMode, setDemoMode] = useState(false);
   const [demoStep, setDemoStep] = useState(0);
 
   useEffect(() => {
-    const fetchAll = async <T,>(
-      listFn: (params?: { skip?: number; limit?: number }) => Promise<{ data: T[] }>
-    ): Promise<T[]> => {
-      const all: T[] = [];
-      let skip = 0;
-      while (true) {
-        const response = await listFn({ skip, limit: FETCH_LIMIT });
-        all.push(...response.data);
-        if (response.data.length < FETCH_LIMIT) break;
-        skip += FETCH_LIMIT;
-      }
-      return all;
-    };
-
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [
-          affinitiesData,
-          datasetsData,
-          endpointsData,
-          servicesData,
-          datasetEndpointsData,
-          datasetServicesData,
-          serviceEndpointsData
-        ] = await Promise.all([
-          fetchAll(affinitiesApi.list),
-          fetchAll(datasetsApi.list),
-          fetchAll(endpointsApi.list),
-          fetchAll(servicesApi.list),
-          fetchAll(datasetEndpointsApi.list),
-          fetchAll(datasetServicesApi.list),
-          fetchAll(serviceEndpointsApi.list)
-        ]);
-
-        setAffinities(affinitiesData);
-        setDatasets(datasetsData);
-        setEndpoints(endpointsData);
-        setServices(servicesData);
-        setDatasetEndpoints(datasetEndpointsData);
-        setDatasetServices(datasetServicesData);
-        setServiceEndpoints(serviceEndpointsData);
+        const response = await statsApi.get();
+        setStats(response.data);
         setError(null);
       } catch (err) {
         setError('Failed to load dashboard data');
@@ -127,70 +66,34 @@ export function Dashboard() {
     fetchData();
   }, []);
 
-  const datasetById = useMemo(() => {
-    return new Map(datasets.map((dataset) => [dataset.uid, dataset]));
-  }, [datasets]);
-
-  const endpointById = useMemo(() => {
-    return new Map(endpoints.map((endpoint) => [endpoint.uid, endpoint]));
-  }, [endpoints]);
-
-  const serviceById = useMemo(() => {
-    return new Map(services.map((service) => [service.uid, service]));
-  }, [services]);
-
   const analytics = useMemo(() => {
-    const datasetsCovered = new Set(affinities.map((affinity) => affinity.dataset_uid).filter(Boolean));
-    const endpointsUsedByAffinities = new Set(affinities.flatMap((affinity) => affinity.endpoint_uids || []));
-    const servicesUsedByAffinities = new Set(affinities.flatMap((affinity) => affinity.service_uids || []));
+    const counts = stats?.counts;
+    const covered = stats?.covered;
+    const affinities = counts?.affinities || 0;
 
-    const avgEndpointsPerAffinity = affinities.length
-      ? (affinities.reduce((sum, affinity) => sum + (affinity.endpoint_uids?.length || 0), 0) / affinities.length).toFixed(1)
+    const avgEndpointsPerAffinity = affinities
+      ? ((stats?.affinity_endpoint_members || 0) / affinities).toFixed(1)
       : '0.0';
-    const avgServicesPerAffinity = affinities.length
-      ? (affinities.reduce((sum, affinity) => sum + (affinity.service_uids?.length || 0), 0) / affinities.length).toFixed(1)
+    const avgServicesPerAffinity = affinities
+      ? ((stats?.affinity_service_members || 0) / affinities).toFixed(1)
       : '0.0';
 
-    const datasetCoverage = pct(datasetsCovered.size, datasets.length);
-    const endpointCoverage = pct(endpointsUsedByAffinities.size, endpoints.length);
-    const serviceCoverage = pct(servicesUsedByAffinities.size, services.length);
+    const datasetCoverage = pct(covered?.datasets || 0, counts?.datasets || 0);
+    const endpointCoverage = pct(covered?.endpoints || 0, counts?.endpoints || 0);
+    const serviceCoverage = pct(covered?.services || 0, counts?.services || 0);
 
     const systemReadiness = Math.round((datasetCoverage + endpointCoverage + serviceCoverage) / 3);
 
-    const affinityByDataset = new Map<string, number>();
-    for (const affinity of affinities) {
-      if (!affinity.dataset_uid) continue;
-      affinityByDataset.set(affinity.dataset_uid, (affinityByDataset.get(affinity.dataset_uid) || 0) + 1);
-    }
-
-    const topDatasets = [...affinityByDataset.entries()]
-      .map(([uid, total]) => ({ uid, total, label: datasetById.get(uid)?.title || `Dataset ${shortUid(uid)}` }))
-      .sort((a, b) => b.total - a.total)
-      .slice(0, 5);
-
-    const endpointKindCounts = new Map<string, number>();
-    for (const uid of endpointsUsedByAffinities) {
-      const kind = endpointById.get(uid)?.kind || 'unknown';
-      endpointKindCounts.set(kind, (endpointKindCounts.get(kind) || 0) + 1);
-    }
-
-    const serviceTypeCounts = new Map<string, number>();
-    for (const uid of servicesUsedByAffinities) {
-      const type = serviceById.get(uid)?.type || 'unknown';
-      serviceTypeCounts.set(type, (serviceTypeCounts.get(type) || 0) + 1);
-    }
-
-    const topEndpointKinds = [...endpointKindCounts.entries()].sort((a, b) => b[1] - a[1]).slice(0, 5);
-    const topServiceTypes = [...serviceTypeCounts.entries()].sort((a, b) => b[1] - a[1]).slice(0, 5);
+    const topDatasets = (stats?.top_datasets || []).map((item) => ({
+      uid: item.uid,
+      total: item.count,
+      label: item.name || `Dataset ${shortUid(item.uid)}`
+    }));
 
-    const latestAffinities = [...affinities]
-      .sort((a, b) => new Date(b.updated_at).getTime() - new Date(a.updated_at).getTime())
-      .slice(0, 5);
+    const topEndpointKinds = (stats?.top_endpoint_kinds || []).map((item) => [item.label, item.count] as const);
+    const topServiceTypes = (stats?.top_service_types || []).map((item) => [item.label, item.count] as const);
 
     return {
-      datasetsCovered,
-      endpointsUsedByAffinities,
-      servicesUsedByAffinities,
       datasetCoverage,
       endpointCoverage,
       serviceCoverage,
@@ -200,14 +103,16 @@ export function Dashboard() {
       topDatasets,
       topEndpointKinds,
       topServiceTypes,
-      latestAffinities
+      latestAffinities: stats?.latest_affinities || []
     };
-  }, [affinities, datasets.length, endpoints.length, services.length, datasetById, endpointById, serviceById]);
+  }, [stats]);
 
   if (loading) return <div>Loading...</div>;
 
   const readinessStyle = { '--readiness': `${analytics.systemReadiness}%` } as CSSProperties;
   const currentStep = DEMO_STEPS[demoStep];
+  const counts = stats?.counts;
+  const covered = stats?.covered;
 
   return (
     <div className="dashboard">
@@ -270,19 +175,19 @@ export function Dashboard() {
       <section className="stats-grid">
         <article className="stat-card">
           <p>Total Affinities</p>
-          <h3>{affinities.length}</h3>
+          <h3>{counts?.affinities || 0}</h3>
         </article>
         <article className="stat-card">
           <p>Datasets Covered</p>
-          <h3>{analytics.datasetsCovered.size} / {datasets.length}</h3>
+          <h3>{covered?.datasets || 0} / {counts?.datasets || 0}</h3>
         </article>
         <article className="stat-card">
           <p>Endpoints Used</p>
-          <h3>{analytics.endpointsUsedByAffinities.size} / {endpoints.length}</h3>
+          <h3>{covered?.endpoints || 0} / {counts?.endpoints || 0}</h3>
         </article>
         <article className="stat-card">
           <p>Services Used</p>
-          <h3>{analytics.servicesUsedByAffinities.size} / {services.length}</h3>
+          <h3>{covered?.services || 0} / {counts?.services || 0}</h3>
         </article>
         <article className="stat-card">
           <p>Avg Endpoints per Affinity</p>
@@ -321,19 +226,19 @@ export function Dashboard() {
           <div className="edge-grid">
             <div>
               <p>Dataset-Endpoint edges</p>
-              <h4>{datasetEndpoints.length}</h4>
+              <h4>{counts?.dataset_endpoints || 0}</h4>
             </div>
             <div>
               <p>Dataset-Service edges</p>
-              <h4>{datasetServices.length}</h4>
+              <h4>{counts?.dataset_services || 0}</h4>
             </div>
             <div>
               <p>Service-Endpoint edges</p>
-              <h4>{serviceEndpoints.length}</h4>
+              <h4>{counts?.service_endpoints || 0}</h4>
             </div>
             <div>
               <p>Total graph edges</p>
-              <h4>{datasetEndpoints.length + datasetServices.length + serviceEndpoints.length}</h4>
+              <h4>{(counts?.dataset_endpoints || 0) + (counts?.dataset_services || 0) + (counts?.service_endpoints || 0)}</h4>
             </div>
           </div>
           <div className="graph-link-row">
@@ -401,9 +306,9 @@ export function Dashboard() {
             <ul className="timeline-list">
               {analytics.latestAffinities.map((affinity) => (
                 <li key={affinity.triple_uid}>
-                  <p>{datasetById.get(affinity.dataset_uid || '')?.title || `Dataset ${shortUid(affinity.dataset_uid || affinity.triple_uid)}`}</p>
+                  <p>{affinity.dataset_name || `Dataset ${shortUid(affinity.dataset_uid || affinity.triple_uid)}`}</p>
                   <small>
-                    {new Date(affinity.updated_at).toLocaleString()} | {affinity.endpoint_uids?.length || 0} endpoints | {affinity.service_uids?.length || 0} services
+                    {new Date(affinity.updated_at).toLocaleString()} | {affinity.endpoint_count} endpoints | {affinity.service_count} services
                   </small>
                 </li>
               ))}
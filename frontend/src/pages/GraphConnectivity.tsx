@@ -1,25 +1,10 @@
 import { useEffect, useMemo, useState } from 'react';
 import { useSearchParams } from 'react-router-dom';
-import {
-  affinitiesApi,
-  datasetEndpointsApi,
-  datasetServicesApi,
-  datasetsApi,
-  endpointsApi,
-  serviceEndpointsApi,
-  servicesApi,
-} from '../api/client';
-import type {
-  Affinity,
-  Dataset,
-  DatasetEndpoint,
-  DatasetService,
-  Endpoint,
-  Service,
-  ServiceEndpoint,
-} from '../types';
+import { graphApi } from '../api/client';
+import type { GraphSnapshotAffinity, GraphSnapshotEdge, GraphSnapshotNode } from '../types';
 
 type NodeType = 'dataset' | 'service' | 'endpoint';
+type SnapshotEdgeType = GraphSnapshotEdge['type'];
 type GraphMode = 'combined' | 'pairwise' | 'triple';
 
 type GraphNode = {
@@ -56,13 +41,13 @@ export function GraphConnectivity() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
-  const [datasets, setDatasets] = useState<Dataset[]>([]);
-  const [services, setServices] = useState<Service[]>([]);
-  const [endpoints, setEndpoints] = useState<Endpoint[]>([]);
-  const [datasetEndpoints, setDatasetEndpoints] = useState<DatasetEndpoint[]>([]);
-  const [datasetServices, setDatasetServices] = useState<DatasetService[]>([]);
-  const [serviceEndpoints, setServiceEndpoints] = useState<ServiceEndpoint[]>([]);
-  const [affinities, setAffinities] = useState<Affinity[]>([]);
+  const [datasets, setDatasets] = useState<GraphSnapshotNode[]>([]);
+  const [services, setServices] = useState<GraphSnapshotNode[]>([]);
+  const [endpoints, setEndpoints] = useState<GraphSnapshotNode[]>([]);
+  const [datasetEndpoints, setDatasetEndpoints] = useState<{ dataset_uid: string; endpoint_uid: string }[]>([]);
+  const [datasetServices, setDatasetServices] = useState<{ dataset_uid: string; service_uid: string }[]>([]);
+  const [serviceEndpoints, setServiceEndpoints] = useState<{ service_uid: string; endpoint_uid: string }[]>([]);
+  const [affinities, setAffinities] = useState<GraphSnapshotAffinity[]>([]);
 
   const [focusDataset, setFocusDataset] = useState('');
   const [graphMode, setGraphMode] = useState<GraphMode>(initialMode);
@@ -71,31 +56,23 @@ export function GraphConnectivity() {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [
-          dsRes,
-          svcRes,
-          epRes,
-          dsEpRes,
-          dsSvcRes,
-          svcEpRes,
-          affRes,
-        ] = await Promise.all([
-          datasetsApi.list(),
-          servicesApi.list(),
-          endpointsApi.list(),
-          datasetEndpointsApi.list(),
-          datasetServicesApi.list(),
-          serviceEndpointsApi.list(),
-          affinitiesApi.list(),
-        ]);
-
-        setDatasets(dsRes.data);
-        setServices(svcRes.data);
-        setEndpoints(epRes.data);
-        setDatasetEndpoints(dsEpRes.data);
-        setDatasetServices(dsSvcRes.data);
-        setServiceEndpoints(svcEpRes.data);
-        setAffinities(affRes.data);
+        const { data } = await graphApi.snapshot();
+        const nodesOf = (type: NodeType) => data.nodes.filter((node) => node.type === type);
+        const edgesOf = (type: SnapshotEdgeType) => data.edges.filter((edge) => edge.type === type);
+
+        setDatasets(nodesOf('dataset'));
+        setServices(nodesOf('service'));
+        setEndpoints(nodesOf('endpoint'));
+        setDatasetEndpoints(
+          edgesOf('dataset-endpoint').map((edge) => ({ dataset_uid: edge.source, endpoint_uid: edge.target }))
+        );
+        setDatasetServices(
+          edgesOf('dataset-service').map((edge) => ({ dataset_uid: edge.source, service_uid: edge.target }))
+        );
+        setServiceEndpoints(
+          edgesOf('service-endpoint').map((edge) => ({ service_uid: edge.source, endpoint_uid: edge.target }))
+        );
+        setAffinities(data.affinities);
         setError(null);
       } catch (err) {
         setError('Failed to load graph data');
@@ -189,21 +166,21 @@ export function GraphConnectivity() {
     const nodes: GraphNode[] = [
       ...[...visibleDatasetIds].map((id, i) => ({
         id,
-        label: datasetById.get(id)?.title || `Dataset ${shortUid(id)}`,
+        label: datasetById.get(id)?.name || `Dataset ${shortUid(id)}`,
         type: 'dataset' as const,
         x: 160,
         y: yDatasets[i],
       })),
       ...[...visibleServiceIds].map((id, i) => ({
         id,
-        label: serviceById.get(id)?.type || `Service ${shortUid(id)}`,
+        label: serviceById.get(id)?.name || `Service ${shortUid(id)}`,
         type: 'service' as const,
         x: 600,
         y: yServices[i],
       })),
       ...[...visibleEndpointIds].map((id, i) => ({
         id,
-        label: endpointById.get(id)?.kind || `Endpoint ${shortUid(id)}`,
+        label: endpointById.get(id)?.name || `Endpoint ${shortUid(id)}`,
         type: 'endpoint' as const,
         x: 1040,
         y: yEndpoints[i],
@@ -291,7 +268,7 @@ export function GraphConnectivity() {
     });
 
     return {
-      title: datasetById.get(focusDataset)?.title || `Dataset ${shortUid(focusDataset)}`,
+      title: datasetById.get(focusDataset)?.name || `Dataset ${shortUid(focusDataset)}`,
       services: directServices.size,
       endpoints: directEndpoints.size,
       triples: tripleRows.length,
@@ -325,7 +302,7 @@ export function GraphConnectivity() {
             <option value="">Top connected nodes</option>
             {datasets.map((dataset) => (
               <option key={dataset.uid} value={dataset.uid}>
-                {dataset.title || `Dataset ${shortUid(dataset.uid)}`}
+                {dataset.name || `Dataset ${shortUid(dataset.uid)}`}
               </option>
             ))}
           </select>
@@ -141,3 +141,110 @@ export interface AffinityUpdate {
   attrs?: Record<string, unknown>;
   version?: number;
 }
+
+export type NodeType = 'dataset' | 'endpoint' | 'service';
+
+export interface LinkedNode {
+  uid: string;
+  name?: string;
+  ckan_name?: string;
+}
+
+export interface LinkedEntities {
+  input_uid: string;
+  input_type: NodeType;
+  datasets: LinkedNode[];
+  endpoints: LinkedNode[];
+  services: LinkedNode[];
+}
+
+export interface TraversalNode extends LinkedNode {
+  type: NodeType;
+  hop: number;
+}
+
+export interface TraversalEdge {
+  source: string;
+  target: string;
+  via: 'dataset_endpoint' | 'dataset_service' | 'service_endpoint' | 'affinity';
+  hop: number;
+}
+
+export interface Traversal {
+  input_uid: string;
+  input_type: NodeType;
+  depth: number;
+  truncated: boolean;
+  nodes: TraversalNode[];
+  edges: TraversalEdge[];
+}
+
+export interface GraphSnapshotNode {
+  uid: string;
+  type: NodeType;
+  name: string | null;
+}
+
+export interface GraphSnapshotEdge {
+  source: string;
+  target: string;
+  type: 'dataset-endpoint' | 'dataset-service' | 'service-endpoint';
+  role: string | null;
+}
+
+export interface GraphSnapshotAffinity {
+  uid: string;
+  dataset_uid: string | null;
+  endpoint_uids: string[];
+  service_uids: string[];
+}
+
+export interface GraphSnapshot {
+  etag: string;
+  nodes: GraphSnapshotNode[];
+  edges: GraphSnapshotEdge[];
+  affinities: GraphSnapshotAffinity[];
+}
+
+export interface RoleCount {
+  role: string | null;
+  count: number;
+}
+
+export interface LabelCount {
+  label: string;
+  count: number;
+}
+
+export interface Stats {
+  counts: {
+    datasets: number;
+    endpoints: number;
+    services: number;
+    dataset_endpoints: number;
+    dataset_services: number;
+    service_endpoints: number;
+    affinities: number;
+  };
+  covered: { datasets: number; endpoints: number; services: number };
+  orphans: { datasets: number; endpoints: number; services: number };
+  edge_roles: {
+    dataset_endpoints: RoleCount[];
+    dataset_services: RoleCount[];
+    service_endpoints: RoleCount[];
+  };
+  affinity_versions: { version: number | null; count: number }[];
+  affinity_endpoint_members: number;
+  affinity_service_members: number;
+  top_datasets: { uid: string; name: string | null; count: number }[];
+  top_endpoint_kinds: LabelCount[];
+  top_service_types: LabelCount[];
+  latest_affinities: {
+    triple_uid: string;
+    dataset_uid: string | null;
+    dataset_name: string | null;
+    endpoint_count: number;
+    service_count: number;
+    updated_at: string;
+  }[];
+}
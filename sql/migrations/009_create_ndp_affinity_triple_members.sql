@@ -0,0 +1,30 @@
+-- Normalized membership tables for ndp_affinity_triple.endpoint_uids / service_uids.
+-- The arrays stay the API representation; these rows are written alongside them.
+CREATE TABLE ndp_affinity_triple_endpoint (
+    triple_uid UUID NOT NULL REFERENCES ndp_affinity_triple(triple_uid) ON DELETE CASCADE,
+    endpoint_uid UUID NOT NULL REFERENCES ndp_endpoint(uid) ON DELETE CASCADE,
+    PRIMARY KEY (triple_uid, endpoint_uid)
+);
+
+CREATE TABLE ndp_affinity_triple_service (
+    triple_uid UUID NOT NULL REFERENCES ndp_affinity_triple(triple_uid) ON DELETE CASCADE,
+    service_uid UUID NOT NULL REFERENCES ndp_service(uid) ON DELETE CASCADE,
+    PRIMARY KEY (triple_uid, service_uid)
+);
+
+-- Reverse lookup indexes (the primary keys already cover triple_uid)
+CREATE INDEX idx_ndp_affinity_triple_endpoint_endpoint ON ndp_affinity_triple_endpoint(endpoint_uid);
+CREATE INDEX idx_ndp_affinity_triple_service_service ON ndp_affinity_triple_service(service_uid);
+
+-- Backfill from the existing arrays, skipping uids that no longer exist
+INSERT INTO ndp_affinity_triple_endpoint (triple_uid, endpoint_uid)
+SELECT DISTINCT t.triple_uid, m.endpoint_uid
+FROM ndp_affinity_triple t
+CROSS JOIN LATERAL unnest(t.endpoint_uids) AS m(endpoint_uid)
+JOIN ndp_endpoint e ON e.uid = m.endpoint_uid;
+
+INSERT INTO ndp_affinity_triple_service (triple_uid, service_uid)
+SELECT DISTINCT t.triple_uid, m.service_uid
+FROM ndp_affinity_triple t
+CROSS JOIN LATERAL unnest(t.service_uids) AS m(service_uid)
+JOIN ndp_service s ON s.uid = m.service_uid;
@@ -0,0 +1,45 @@
+-- Publish row changes on the ndp_changes channel so every API worker can
+-- evict or refresh its in-process caches (see app/notifications.py).
+-- Statement-level: a bulk upsert, import or COPY sends one notification per
+-- table and statement, not one per row. The payload names the table and the
+-- operation only: the graph cache is rebuilt as a whole, so no row uids are sent.
+CREATE OR REPLACE FUNCTION ndp_notify_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('ndp_changes', json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Membership tables are always written together with ndp_affinity_triple,
+-- so they do not need their own triggers.
+CREATE TRIGGER trg_ndp_endpoint_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_endpoint
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_dataset_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_dataset
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_service_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_service
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_dataset_endpoint_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_dataset_endpoint
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_dataset_service_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_dataset_service
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_service_endpoint_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_service_endpoint
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
+
+CREATE TRIGGER trg_ndp_affinity_triple_notify
+    AFTER INSERT OR UPDATE OR DELETE ON ndp_affinity_triple
+    FOR EACH STATEMENT EXECUTE FUNCTION ndp_notify_change();
@@ -0,0 +1,6 @@
+-- Keyset pagination indexes for the list endpoints
+-- (serves `ORDER BY created_at, uid` and `(created_at, uid) > (...)`; junction tables page on their primary keys)
+CREATE INDEX idx_ndp_endpoint_created_uid ON ndp_endpoint(created_at, uid);
+CREATE INDEX idx_ndp_dataset_created_uid ON ndp_dataset(created_at, uid);
+CREATE INDEX idx_ndp_service_created_uid ON ndp_service(created_at, uid);
+CREATE INDEX idx_ndp_affinity_triple_created_uid ON ndp_affinity_triple(created_at, triple_uid);
@@ -0,0 +1,13 @@
+-- Indexes for the list endpoint filters
+-- GIN (jsonb_path_ops) serves `metadata @> '{...}'` containment; it is smaller and faster than the default
+-- jsonb_ops but does not index keys alone, so `metadata_has` (`?&`) is checked on the rows found otherwise
+CREATE INDEX idx_ndp_endpoint_metadata ON ndp_endpoint USING GIN (metadata jsonb_path_ops);
+CREATE INDEX idx_ndp_dataset_metadata ON ndp_dataset USING GIN (metadata jsonb_path_ops);
+CREATE INDEX idx_ndp_service_metadata ON ndp_service USING GIN (metadata jsonb_path_ops);
+
+-- Equality filters, followed by the keyset pagination order so a filtered page is a single index range scan
+CREATE INDEX idx_ndp_endpoint_kind ON ndp_endpoint(kind, created_at, uid);
+CREATE INDEX idx_ndp_endpoint_source_ep ON ndp_endpoint(source_ep, created_at, uid);
+CREATE INDEX idx_ndp_dataset_source_ep ON ndp_dataset(source_ep, created_at, uid);
+CREATE INDEX idx_ndp_service_type ON ndp_service(type, created_at, uid);
+CREATE INDEX idx_ndp_service_source_ep ON ndp_service(source_ep, created_at, uid);
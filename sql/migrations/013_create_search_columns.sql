@@ -0,0 +1,58 @@
+-- Full-text and fuzzy search (GET /search)
+-- search_vector: names weighted A, selected metadata keys weighted B, 'simple' config (names and URLs are not stemmed)
+-- search_text: the same text for pg_trgm word similarity, so misspelled queries still match
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE ndp_dataset
+    ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple',
+            coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+        ), 'B')
+    ) STORED,
+    ADD COLUMN search_text TEXT GENERATED ALWAYS AS (
+        coalesce(title, '')
+            || ' ' || coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+    ) STORED;
+CREATE INDEX idx_ndp_dataset_search_vector ON ndp_dataset USING GIN (search_vector);
+CREATE INDEX idx_ndp_dataset_search_text ON ndp_dataset USING GIN (search_text gin_trgm_ops);
+
+ALTER TABLE ndp_endpoint
+    ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(kind, '') || ' ' || coalesce(url, '')), 'A')
+        || setweight(to_tsvector('simple',
+            coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+        ), 'B')
+    ) STORED,
+    ADD COLUMN search_text TEXT GENERATED ALWAYS AS (
+        coalesce(kind, '') || ' ' || coalesce(url, '')
+            || ' ' || coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+    ) STORED;
+CREATE INDEX idx_ndp_endpoint_search_vector ON ndp_endpoint USING GIN (search_vector);
+CREATE INDEX idx_ndp_endpoint_search_text ON ndp_endpoint USING GIN (search_text gin_trgm_ops);
+
+ALTER TABLE ndp_service
+    ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(type, '') || ' ' || coalesce(openapi_url, '')), 'A')
+        || setweight(to_tsvector('simple',
+            coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+        ), 'B')
+    ) STORED,
+    ADD COLUMN search_text TEXT GENERATED ALWAYS AS (
+        coalesce(type, '') || ' ' || coalesce(openapi_url, '')
+            || ' ' || coalesce(metadata->>'ckan_name', '')
+            || ' ' || coalesce(metadata->>'keywords', '')
+            || ' ' || coalesce(metadata->>'ndp_ep_name', '')
+    ) STORED;
+CREATE INDEX idx_ndp_service_search_vector ON ndp_service USING GIN (search_vector);
+CREATE INDEX idx_ndp_service_search_text ON ndp_service USING GIN (search_text gin_trgm_ops);
@@ -0,0 +1,18 @@
+-- Generated name columns read by /linked, /search and /graph/snapshot instead of
+-- loading metadata and building the names per row (same expressions as app/models)
+ALTER TABLE ndp_dataset
+    ADD COLUMN display_name TEXT GENERATED ALWAYS AS (title) STORED,
+    ADD COLUMN ckan_name TEXT GENERATED ALWAYS AS (COALESCE(NULLIF(metadata ->> 'ckan_name', ''), 'none')) STORED;
+
+ALTER TABLE ndp_endpoint
+    ADD COLUMN display_name TEXT GENERATED ALWAYS AS (
+        CASE WHEN kind <> '' AND url <> '' THEN kind || ': ' || url
+        ELSE COALESCE(NULLIF(kind, ''), NULLIF(url, ''), CAST(uid AS TEXT)) END
+    ) STORED,
+    ADD COLUMN ckan_name TEXT GENERATED ALWAYS AS (COALESCE(NULLIF(metadata ->> 'ckan_name', ''), 'none')) STORED;
+
+ALTER TABLE ndp_service
+    ADD COLUMN display_name TEXT GENERATED ALWAYS AS (
+        COALESCE(NULLIF(type, ''), NULLIF(openapi_url, ''), CAST(uid AS TEXT))
+    ) STORED,
+    ADD COLUMN ckan_name TEXT GENERATED ALWAYS AS (COALESCE(NULLIF(metadata ->> 'ckan_name', ''), 'none')) STORED;
@@ -0,0 +1,35 @@
+-- Materialized edges of the link graph, read by /linked with one primary key range scan per node.
+-- Every edge is stored in both directions; the API keeps the rows current (app/neighbors.py).
+CREATE TABLE ndp_neighbor (
+    uid UUID NOT NULL,
+    neighbor_type TEXT NOT NULL,
+    neighbor_uid UUID NOT NULL,
+    via TEXT NOT NULL,
+    PRIMARY KEY (uid, neighbor_type, neighbor_uid, via)
+);
+
+-- Reverse lookup, used when the rows pointing at a changed node are refreshed
+CREATE INDEX idx_ndp_neighbor_neighbor_uid ON ndp_neighbor(neighbor_uid);
+
+-- Backfill from the junction tables and affinity triple membership
+-- (a dataset's affinity neighbours are the triple's endpoints and services only)
+WITH members AS (
+    SELECT triple_uid, 'dataset' AS node_type, dataset_uid AS uid
+    FROM ndp_affinity_triple WHERE dataset_uid IS NOT NULL
+    UNION
+    SELECT triple_uid, 'endpoint', endpoint_uid FROM ndp_affinity_triple_endpoint
+    UNION
+    SELECT triple_uid, 'service', service_uid FROM ndp_affinity_triple_service
+)
+INSERT INTO ndp_neighbor (uid, neighbor_type, neighbor_uid, via)
+SELECT dataset_uid, 'endpoint', endpoint_uid, 'dataset_endpoint' FROM ndp_dataset_endpoint
+UNION SELECT endpoint_uid, 'dataset', dataset_uid, 'dataset_endpoint' FROM ndp_dataset_endpoint
+UNION SELECT dataset_uid, 'service', service_uid, 'dataset_service' FROM ndp_dataset_service
+UNION SELECT service_uid, 'dataset', dataset_uid, 'dataset_service' FROM ndp_dataset_service
+UNION SELECT service_uid, 'endpoint', endpoint_uid, 'service_endpoint' FROM ndp_service_endpoint
+UNION SELECT endpoint_uid, 'service', service_uid, 'service_endpoint' FROM ndp_service_endpoint
+UNION
+SELECT a.uid, b.node_type, b.uid, 'affinity'
+FROM members a
+JOIN members b ON b.triple_uid = a.triple_uid AND b.uid <> a.uid
+WHERE NOT (a.node_type = 'dataset' AND b.node_type = 'dataset');
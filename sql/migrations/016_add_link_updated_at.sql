@@ -0,0 +1,19 @@
+-- updated_at on the link tables, so a role/attrs change moves the /graph/snapshot ETag
+ALTER TABLE ndp_dataset_endpoint ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE ndp_dataset_service ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE ndp_service_endpoint ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE TRIGGER trg_ndp_dataset_endpoint_updated_at
+    BEFORE UPDATE ON ndp_dataset_endpoint
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER trg_ndp_dataset_service_updated_at
+    BEFORE UPDATE ON ndp_dataset_service
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER trg_ndp_service_endpoint_updated_at
+    BEFORE UPDATE ON ndp_service_endpoint
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
@@ -4,7 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app.database import Base, SessionRunner, get_db, get_session_runner
 from app.main import app
 
 
@@ -27,6 +27,14 @@ def override_get_db():
         db.close()
 
 
+async def override_get_session_runner():
+    db = TestingSessionLocal()
+    try:
+        yield SessionRunner(db)
+    finally:
+        db.close()
+
+
 @pytest.fixture(scope="function")
 def db():
     Base.metadata.create_all(bind=engine)
@@ -39,6 +47,7 @@ def db():
 @pytest.fixture(scope="function")
 def client(db):
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_runner] = override_get_session_runner
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as c:
         yield c
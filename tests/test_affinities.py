@@ -96,3 +96,83 @@ def test_update_affinity_nonexistent_dataset(client):
     response = client.put(f"/affinities/{triple_uid}", json={"dataset_uid": fake_uid})
     assert response.status_code == 404
     assert fake_uid in response.json()["detail"]
+
+
+def test_create_affinity_nonexistent_endpoint(client):
+    fake_uid = "00000000-0000-0000-0000-000000000000"
+    response = client.post("/affinities", json={"endpoint_uids": [fake_uid]})
+    assert response.status_code == 404
+    assert fake_uid in response.json()["detail"]
+
+
+def test_affinity_members_follow_arrays(client, db):
+    from app.models import AffinityTripleEndpoint, AffinityTripleService
+
+    endpoint_1 = client.post("/ep", json={"kind": "http"}).json()
+    endpoint_2 = client.post("/ep", json={"kind": "http"}).json()
+    service = client.post("/services", json={"type": "compute"}).json()
+
+    triple_uid = client.post("/affinities", json={
+        "endpoint_uids": [endpoint_1["uid"], endpoint_1["uid"]],
+        "service_uids": [service["uid"]],
+    }).json()["triple_uid"]
+
+    def members(model, column):
+        return {str(getattr(row, column)) for row in db.query(model).all()}
+
+    assert members(AffinityTripleEndpoint, "endpoint_uid") == {endpoint_1["uid"]}
+    assert members(AffinityTripleService, "service_uid") == {service["uid"]}
+
+    client.put(f"/affinities/{triple_uid}", json={"endpoint_uids": [endpoint_2["uid"]]})
+    db.expire_all()
+    assert members(AffinityTripleEndpoint, "endpoint_uid") == {endpoint_2["uid"]}
+    assert members(AffinityTripleService, "service_uid") == {service["uid"]}
+
+    client.delete(f"/affinities/{triple_uid}")
+    db.expire_all()
+    assert members(AffinityTripleEndpoint, "endpoint_uid") == set()
+    assert members(AffinityTripleService, "service_uid") == set()
+
+
+def test_update_affinity_after_member_deleted(client, db):
+    from sqlalchemy import text
+
+    db.execute(text("PRAGMA foreign_keys = ON"))
+    try:
+        endpoint = client.post("/ep", json={"kind": "http"}).json()
+        service_1 = client.post("/services", json={"type": "compute"}).json()
+        service_2 = client.post("/services", json={"type": "store"}).json()
+        triple_uid = client.post("/affinities", json={
+            "endpoint_uids": [endpoint["uid"]],
+            "service_uids": [service_1["uid"]],
+        }).json()["triple_uid"]
+        client.delete(f"/ep/{endpoint['uid']}")
+
+        response = client.put(f"/affinities/{triple_uid}", json={"service_uids": [service_2["uid"]]})
+        assert response.status_code == 200
+        assert response.json()["service_uids"] == [service_2["uid"]]
+    finally:
+        db.execute(text("PRAGMA foreign_keys = OFF"))
+
+
+def test_bulk_upsert_affinities(client):
+    dataset = client.post("/datasets", json={"title": "Test Dataset"}).json()
+    endpoint = client.post("/ep", json={"kind": "API"}).json()
+    service = client.post("/services", json={"type": "transform"}).json()
+
+    response = client.post("/affinities/bulk", json=[
+        {"dataset_uid": dataset["uid"], "endpoint_uids": [endpoint["uid"]], "service_uids": [service["uid"]]},
+        {"dataset_uid": dataset["uid"], "endpoint_uids": ["00000000-0000-0000-0000-000000000000"]},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["results"]] == ["created", "error"]
+    triple_uid = body["results"][0]["uid"]
+
+    linked = client.get(f"/linked/{endpoint['uid']}").json()
+    assert [item["uid"] for item in linked["services"]] == [service["uid"]]
+
+    response = client.post("/affinities/bulk", json=[{"triple_uid": triple_uid, "dataset_uid": dataset["uid"], "version": 2}])
+    assert response.json()["results"][0]["status"] == "updated"
+    assert client.get(f"/affinities/{triple_uid}").json()["version"] == 2
+    assert client.get(f"/linked/{endpoint['uid']}").json()["services"] == []
@@ -0,0 +1,99 @@
+import json
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.catalog_import import RECORD_TYPES, CatalogImporter, _merge_staged_rows
+from app.models.dataset import Dataset
+
+DATASET_UID = "11111111-1111-1111-1111-111111111111"
+ENDPOINT_UID = "22222222-2222-2222-2222-222222222222"
+SERVICE_UID = "33333333-3333-3333-3333-333333333333"
+TRIPLE_UID = "44444444-4444-4444-4444-444444444444"
+MISSING_UID = "00000000-0000-0000-0000-000000000000"
+
+
+def _ndjson(*records) -> str:
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+CATALOG = _ndjson(
+    {"record": "dataset_endpoint", "dataset_uid": DATASET_UID, "endpoint_uid": ENDPOINT_UID, "role": "primary"},
+    {"record": "dataset", "uid": DATASET_UID, "title": "Imported Dataset"},
+    {"record": "endpoint", "uid": ENDPOINT_UID, "kind": "API", "url": "https://ep"},
+    {"record": "service", "uid": SERVICE_UID, "type": "transform"},
+    {"record": "service_endpoint", "service_uid": SERVICE_UID, "endpoint_uid": ENDPOINT_UID},
+    {"record": "affinity", "triple_uid": TRIPLE_UID, "dataset_uid": DATASET_UID, "service_uids": [SERVICE_UID]},
+    {"record": "dataset_service", "dataset_uid": MISSING_UID, "service_uid": SERVICE_UID},
+    {"record": "unknown"},
+)
+
+
+def test_import_catalog(client):
+    response = client.post("/import", content=CATALOG, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    report = response.json()
+
+    assert report["records"] == 8
+    assert report["applied"] == {
+        "dataset": 1,
+        "endpoint": 1,
+        "service": 1,
+        "dataset_endpoint": 1,
+        "dataset_service": 0,
+        "service_endpoint": 1,
+        "affinity": 1,
+    }
+    assert report["error_count"] == 2
+    assert [error["line"] for error in report["errors"]] == [8, 7]
+
+    assert client.get(f"/datasets/{DATASET_UID}").json()["title"] == "Imported Dataset"
+    assert client.get(f"/dataset-endpoints/{DATASET_UID}/{ENDPOINT_UID}").json()["role"] == "primary"
+    linked = client.get(f"/linked/{SERVICE_UID}").json()
+    assert [item["uid"] for item in linked["datasets"]] == [DATASET_UID]
+
+
+def test_import_applies_chunks_in_separate_transactions(db):
+    importer = CatalogImporter(db, chunk_size=1)
+    lines = _ndjson(
+        {"record": "dataset", "uid": DATASET_UID, "title": "First"},
+        {"record": "dataset", "uid": DATASET_UID, "title": "Second"},
+    ).splitlines()
+
+    assert importer.add(lines[0]) is True
+    importer.flush()
+    assert importer.add(lines[1]) is True
+    importer.flush()
+
+    assert importer.report.applied["dataset"] == 2
+    assert importer.report.error_count == 0
+
+
+def test_staged_rows_merged_line_by_line_after_a_constraint_failure(db):
+    # The fallback of the PostgreSQL merge; its SQL is portable, so it runs on a SQLite staging table.
+    columns = ["uid", "title", "created_at", "updated_at"]
+    db.execute(text(
+        "CREATE TEMP TABLE import_ndp_dataset AS "
+        "SELECT 0 AS import_line, uid, title, created_at, updated_at FROM ndp_dataset WHERE 0"
+    ))
+    try:
+        now = "2026-01-01 00:00:00.000000"
+        for line, uid, title, created_at in (
+            (1, DATASET_UID, "Superseded", now),
+            (2, DATASET_UID, "Imported Dataset", now),
+            (3, MISSING_UID, "No created_at", None),
+        ):
+            db.execute(
+                text("INSERT INTO import_ndp_dataset VALUES (:line, :uid, :title, :created_at, :created_at)"),
+                {"line": line, "uid": uid, "title": title, "created_at": created_at},
+            )
+
+        errors = _merge_staged_rows(db, RECORD_TYPES["dataset"], "import_ndp_dataset", columns)
+
+        assert list(errors) == [3]
+        assert "NOT NULL" in errors[3]
+        assert db.get(Dataset, UUID(DATASET_UID)).title == "Imported Dataset"
+        assert db.get(Dataset, UUID(MISSING_UID)) is None
+    finally:
+        db.rollback()
+        db.execute(text("DROP TABLE IF EXISTS import_ndp_dataset"))
@@ -0,0 +1,38 @@
+from app.compression import _accepted
+
+
+def _seed(client, count=20):
+    for index in range(count):
+        client.post("/datasets", json={"title": f"Dataset {index}", "metadata": {"description": "x" * 100}})
+
+
+def test_prefers_brotli(client):
+    _seed(client)
+    response = client.get("/datasets", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 20
+
+
+def test_gzip_fallback(client):
+    _seed(client)
+    response = client.get("/datasets", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+def test_streamed_export_is_compressed(client):
+    _seed(client)
+    response = client.get("/export/datasets", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.text.splitlines()) == 20
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_accepted_encodings():
+    assert _accepted("gzip, deflate, br;q=0.5") == {"gzip", "deflate", "br"}
+    assert _accepted("br;q=0, gzip") == {"gzip"}
@@ -0,0 +1,108 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app import database, main
+from app.config import settings
+from app.database import (
+    PRIMARY_PIN_COOKIE,
+    PRIMARY_PIN_HEADER,
+    PRIMARY_PIN_UNTIL_HEADER,
+    Base,
+    ReadReplicas,
+    engine_options,
+    set_statement_timeout,
+)
+
+
+def test_engine_options_sqlite_uses_defaults():
+    url = make_url("sqlite://")
+    assert engine_options(url) == (url, {})
+
+
+def test_engine_options_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 20)
+    monkeypatch.setattr(settings, "db_pool_pre_ping", True)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+
+    _url, options = engine_options(make_url("postgresql+psycopg2://u:p@db/affinities"))
+
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_engine_options_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+
+    url, options = engine_options(make_url("postgresql+asyncpg://u:p@pgbouncer/affinities"))
+
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert url.query["prepared_statement_cache_size"] == "0"
+
+
+class _RecordingConnection:
+    def __init__(self, dialect_name: str):
+        self.dialect = type("Dialect", (), {"name": dialect_name})()
+        self.statements = []
+
+    def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+
+def test_statement_timeout_per_transaction_under_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+
+    _url, options = engine_options(make_url("postgresql+psycopg2://u:p@pgbouncer/affinities"))
+    assert "connect_args" not in options
+    _url, options = engine_options(make_url("postgresql+asyncpg://u:p@pgbouncer/affinities"))
+    assert "server_settings" not in options["connect_args"]
+
+    conn = _RecordingConnection("postgresql")
+    set_statement_timeout(conn)
+    assert conn.statements == ["SET LOCAL statement_timeout = 5000"]
+
+    sqlite_conn = _RecordingConnection("sqlite")
+    set_statement_timeout(sqlite_conn)
+    assert sqlite_conn.statements == []
+
+    monkeypatch.setattr(settings, "db_pgbouncer", False)
+    set_statement_timeout(conn)
+    assert len(conn.statements) == 1
+
+
+def _replica_engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def test_read_replicas_round_robin_and_least_loaded():
+    replicas = ReadReplicas([create_engine("sqlite://", poolclass=QueuePool) for _ in range(2)])
+
+    assert [replicas.choose() for _ in range(4)] == [0, 1, 0, 1]
+
+    with replicas.engines[0].connect():
+        assert [replicas.choose() for _ in range(3)] == [1, 1, 1]
+
+
+def test_reads_pinned_to_primary_after_write(client, monkeypatch):
+    replica = _replica_engine()
+    Base.metadata.create_all(bind=replica)
+    replicas = ReadReplicas([replica])
+    monkeypatch.setattr(database, "read_replicas", lambda: replicas)
+    monkeypatch.setattr(main, "read_replicas", lambda: replicas)
+
+    response = client.post("/datasets", json={"title": "ds"})
+    uid = response.json()["uid"]
+    assert PRIMARY_PIN_COOKIE in client.cookies
+    assert float(response.headers[PRIMARY_PIN_UNTIL_HEADER]) > 0
+    assert client.get(f"/datasets/{uid}").status_code == 200
+
+    # Unpinned reads go to the (empty) replica.
+    client.cookies.clear()
+    assert client.get(f"/datasets/{uid}").status_code == 404
+    # Clients without cookies pin their reads with the header.
+    assert client.get(f"/datasets/{uid}", headers={PRIMARY_PIN_HEADER: "1"}).status_code == 200
+    assert client.get("/datasets").json() == []
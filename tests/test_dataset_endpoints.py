@@ -77,3 +77,40 @@ def test_create_dataset_endpoint_nonexistent_endpoint(client):
     })
     assert response.status_code == 404
     assert "Endpoint" in response.json()["detail"]
+
+
+def test_list_dataset_endpoints_cursor_pagination(client):
+    dataset = client.post("/datasets", json={"title": "Test Dataset"}).json()
+    for i in range(3):
+        endpoint = client.post("/ep", json={"kind": "API", "url": f"https://ep-{i}"}).json()
+        client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint["uid"]})
+
+    first = client.get("/dataset-endpoints", params={"limit": 2})
+    assert len(first.json()) == 2
+    second = client.get("/dataset-endpoints", params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+    assert len(second.json()) == 1
+    assert "x-next-cursor" not in second.headers
+    pages = first.json() + second.json()
+    assert len({item["endpoint_uid"] for item in pages}) == 3
+
+
+def test_bulk_upsert_dataset_endpoints(client):
+    dataset = client.post("/datasets", json={"title": "Test Dataset"}).json()
+    endpoint_1 = client.post("/ep", json={"kind": "API"}).json()
+    endpoint_2 = client.post("/ep", json={"kind": "API"}).json()
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint_1["uid"], "role": "old"})
+
+    response = client.post("/dataset-endpoints/bulk", json=[
+        {"dataset_uid": dataset["uid"], "endpoint_uid": endpoint_1["uid"], "role": "primary"},
+        {"dataset_uid": dataset["uid"], "endpoint_uid": endpoint_2["uid"]},
+        {"dataset_uid": dataset["uid"], "endpoint_uid": "00000000-0000-0000-0000-000000000000"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["errors"]) == (1, 1, 1)
+    assert [item["status"] for item in body["results"]] == ["updated", "created", "error"]
+    assert "not found" in body["results"][2]["detail"]
+
+    updated = client.get(f"/dataset-endpoints/{dataset['uid']}/{endpoint_1['uid']}").json()
+    assert updated["role"] == "primary"
+    assert len(client.get("/dataset-endpoints").json()) == 2
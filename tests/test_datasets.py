@@ -26,6 +26,47 @@ def test_get_dataset_not_found(client):
     assert response.status_code == 404
 
 
+def test_get_dataset_conditional(client):
+    uid = client.post("/datasets", json={"title": "Cached"}).json()["uid"]
+
+    response = client.get(f"/datasets/{uid}")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert etag.startswith('W/"')
+    assert client.get(f"/datasets/{uid}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/datasets/{uid}", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(f"/datasets/{uid}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    client.put(f"/datasets/{uid}", json={"title": "Changed"})
+    response = client.get(f"/datasets/{uid}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert response.headers["etag"] != etag
+
+
+def test_list_datasets_sparse_fields(client):
+    for index in range(3):
+        client.post("/datasets", json={
+            "title": f"Dataset {index}",
+            "metadata": {"ckan_name": f"ds-{index}", "notes": "x" * 100, "tags": ["a"], "empty": None},
+        })
+
+    response = client.get("/datasets", params={"fields": "uid,title", "limit": 2})
+    assert response.status_code == 200
+    assert [set(item) for item in response.json()] == [{"uid", "title"}] * 2
+    assert response.json()[0]["title"] == "Dataset 0"
+
+    next_page = client.get("/datasets", params={"fields": "uid,title", "cursor": response.headers["x-next-cursor"]})
+    assert [item["title"] for item in next_page.json()] == ["Dataset 2"]
+
+    response = client.get("/datasets", params={"fields": "uid", "metadata_keys": "ckan_name,tags,missing"})
+    assert response.json()[1]["metadata"] == {"ckan_name": "ds-1", "tags": ["a"]}
+
+
+def test_list_datasets_sparse_fields_unknown(client):
+    response = client.get("/datasets", params={"fields": "uid,password"})
+    assert response.status_code == 400
+
+
 def test_update_dataset(client):
     create_response = client.post("/datasets", json={"title": "Old Title"})
     uid = create_response.json()["uid"]
@@ -67,3 +108,46 @@ def test_create_dataset_with_all_fields(client):
     assert data["title"] == "Full Dataset"
     assert data["source_ep"] == "endpoint-123"
     assert data["metadata"] == {"key": "value"}
+
+
+def test_list_datasets_cursor_pagination(client):
+    created = [client.post("/datasets", json={"title": f"Dataset {i}"}).json()["uid"] for i in range(5)]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/datasets", params=params)
+        assert response.status_code == 200
+        seen.extend(item["uid"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
+
+
+def test_list_datasets_invalid_cursor(client):
+    response = client.get("/datasets", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_bulk_upsert_datasets(client):
+    existing = client.post("/datasets", json={"title": "Old Title"}).json()
+
+    response = client.post("/datasets/bulk", json=[
+        {"uid": existing["uid"], "title": "New Title"},
+        {"title": "Bulk Dataset"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["results"]] == ["updated", "created"]
+    assert body["results"][0]["uid"] == existing["uid"]
+
+    assert client.get(f"/datasets/{existing['uid']}").json()["title"] == "New Title"
+    created = client.get(f"/datasets/{body['results'][1]['uid']}")
+    assert created.status_code == 200
+    assert created.json()["title"] == "Bulk Dataset"
@@ -87,3 +87,29 @@ def test_list_endpoints_with_pagination(client):
     response = client.get("/ep?skip=1&limit=1")
     assert response.status_code == 200
     assert len(response.json()) == 1
+
+
+def test_list_endpoints_filters(client):
+    client.post("/ep", json={"kind": "OGC", "metadata": {"protocol": "wms", "tags": ["geo", "map"], "live": True}})
+    client.post("/ep", json={"kind": "API", "metadata": {"protocol": "rest", "tags": ["geo"], "auth": {"type": "key"}}})
+    client.post("/ep", json={"kind": "API"})
+
+    def protocols(**params):
+        response = client.get("/ep", params=params)
+        assert response.status_code == 200
+        return sorted(item["metadata"]["protocol"] if item["metadata"] else "" for item in response.json())
+
+    assert protocols(metadata='{"protocol": "wms"}') == ["wms"]
+    assert protocols(metadata='{"tags": ["geo"]}') == ["rest", "wms"]
+    assert protocols(metadata='{"tags": ["map", "geo"], "live": true}') == ["wms"]
+    assert protocols(metadata='{"auth": {"type": "key"}}') == ["rest"]
+    assert protocols(metadata_has="auth") == ["rest"]
+    assert protocols(metadata_has="protocol,live") == ["wms"]
+    assert protocols(kind="API") == ["", "rest"]
+    assert protocols(kind="API", metadata='{"tags": ["geo"]}') == ["rest"]
+
+
+def test_list_endpoints_filters_invalid(client):
+    assert client.get("/ep", params={"metadata": "[1]"}).status_code == 400
+    assert client.get("/ep", params={"metadata": "{bad"}).status_code == 400
+
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+
+def _seed(client):
+    dataset = client.post("/datasets", json={"title": "Export, Dataset", "metadata": {"ckan_name": "exp"}}).json()
+    endpoint = client.post("/ep", json={"kind": "API"}).json()
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint["uid"]})
+    affinity = client.post("/affinities", json={"dataset_uid": dataset["uid"], "endpoint_uids": [endpoint["uid"]]}).json()
+    return dataset, endpoint, affinity
+
+
+def test_export_ndjson(client):
+    dataset, _endpoint, _affinity = _seed(client)
+
+    response = client.get("/export/datasets")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [{
+        "record": "dataset",
+        "uid": dataset["uid"],
+        "title": "Export, Dataset",
+        "source_ep": None,
+        "metadata": {"ckan_name": "exp"},
+        "created_at": rows[0]["created_at"],
+        "updated_at": rows[0]["updated_at"],
+    }]
+
+
+def test_export_csv(client):
+    _dataset, endpoint, affinity = _seed(client)
+
+    response = client.get("/export/affinities", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["triple_uid"] == affinity["triple_uid"]
+    assert json.loads(rows[0]["endpoint_uids"]) == [endpoint["uid"]]
+
+
+def test_export_roundtrips_through_import(client):
+    _seed(client)
+    exported = "".join(
+        client.get(f"/export/{table}").text
+        for table in ("datasets", "endpoints", "dataset-endpoints", "affinities")
+    )
+
+    report = client.post("/import", content=exported).json()
+    assert report["error_count"] == 0
+    assert report["records"] == 4
+
+
+def test_export_unknown_table(client):
+    assert client.get("/export/users").status_code == 404
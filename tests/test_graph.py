@@ -0,0 +1,74 @@
+def _seed(client):
+    dataset = client.post("/datasets", json={"title": "Dataset Alpha"}).json()
+    endpoint = client.post("/ep", json={"kind": "OGC", "url": "https://ep-1"}).json()
+    service = client.post("/services", json={"type": "transform"}).json()
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint["uid"], "role": "primary"})
+    client.post("/service-endpoints", json={"service_uid": service["uid"], "endpoint_uid": endpoint["uid"]})
+    affinity = client.post("/affinities", json={
+        "dataset_uid": dataset["uid"],
+        "endpoint_uids": [endpoint["uid"]],
+        "service_uids": [service["uid"]],
+    }).json()
+    return dataset, endpoint, service, affinity
+
+
+def test_graph_snapshot_empty(client):
+    response = client.get("/graph/snapshot")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["nodes"] == []
+    assert body["edges"] == []
+    assert body["affinities"] == []
+    assert response.headers["etag"] == body["etag"]
+
+
+def test_graph_snapshot(client):
+    dataset, endpoint, service, affinity = _seed(client)
+
+    body = client.get("/graph/snapshot").json()
+
+    assert {"uid": dataset["uid"], "type": "dataset", "name": "Dataset Alpha"} in body["nodes"]
+    assert {"uid": endpoint["uid"], "type": "endpoint", "name": "OGC: https://ep-1"} in body["nodes"]
+    assert {"uid": service["uid"], "type": "service", "name": "transform"} in body["nodes"]
+    assert {
+        "source": dataset["uid"], "target": endpoint["uid"], "type": "dataset-endpoint", "role": "primary"
+    } in body["edges"]
+    assert {
+        "source": service["uid"], "target": endpoint["uid"], "type": "service-endpoint", "role": None
+    } in body["edges"]
+    assert body["affinities"] == [{
+        "uid": affinity["triple_uid"],
+        "dataset_uid": dataset["uid"],
+        "endpoint_uids": [endpoint["uid"]],
+        "service_uids": [service["uid"]],
+    }]
+
+
+def test_graph_snapshot_etag(client):
+    _seed(client)
+    etag = client.get("/graph/snapshot").headers["etag"]
+
+    response = client.get("/graph/snapshot", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post("/datasets", json={"title": "Dataset Beta"})
+    response = client.get("/graph/snapshot", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_graph_snapshot_etag_follows_link_updates(client):
+    dataset, endpoint, _service, _affinity = _seed(client)
+    etag = client.get("/graph/snapshot").headers["etag"]
+    assert etag.startswith('W/"')
+    # Weak comparison: the same tag without its W/ prefix still matches.
+    assert client.get("/graph/snapshot", headers={"If-None-Match": f'{etag.removeprefix("W/")}, "other"'}).status_code == 304
+
+    client.post("/dataset-endpoints/bulk", json=[
+        {"dataset_uid": dataset["uid"], "endpoint_uid": endpoint["uid"], "role": "mirror"}
+    ])
+    response = client.get("/graph/snapshot", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert {
+        "source": dataset["uid"], "target": endpoint["uid"], "type": "dataset-endpoint", "role": "mirror"
+    } in response.json()["edges"]
@@ -2,3 +2,9 @@ def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_pool_health(client):
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    assert "pool" in response.json()["sync"]
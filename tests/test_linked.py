@@ -1,3 +1,6 @@
+import pytest
+
+
 def _seed_graph(client):
     dataset = client.post("/datasets", json={"title": "Dataset Alpha"}).json()
     endpoint_1 = client.post("/ep", json={"kind": "OGC", "url": "https://ep-1"}).json()
@@ -91,3 +94,265 @@ def test_get_linked_batch(client):
 def test_get_linked_not_found(client):
     response = client.get("/linked/00000000-0000-0000-0000-000000000000")
     assert response.status_code == 404
+
+
+def test_get_linked_for_endpoint_ignores_unrelated_affinities(client):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    other_dataset = client.post("/datasets", json={"title": "Dataset Beta"}).json()
+    other_endpoint = client.post("/ep", json={"kind": "API", "url": "https://ep-3"}).json()
+    client.post("/affinities", json={
+        "dataset_uid": other_dataset["uid"],
+        "endpoint_uids": [other_endpoint["uid"]],
+        "service_uids": [service_2["uid"]],
+    })
+
+    response = client.get(f"/linked/{endpoint_2['uid']}")
+    assert response.status_code == 200
+    body = response.json()
+
+    assert {item["uid"] for item in body["datasets"]} == {dataset["uid"]}
+    assert other_endpoint["uid"] not in {item["uid"] for item in body["endpoints"]}
+
+
+def test_get_linked_uses_single_statement(client):
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/linked/{endpoint_1['uid']}")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+
+def test_get_linked_batch_matches_single_lookups(client):
+    seeded = _seed_graph(client)
+    uids = [item["uid"] for item in seeded]
+
+    response = client.post("/linked/batch", json={"uids": uids})
+    assert response.status_code == 200
+
+    assert response.json() == [client.get(f"/linked/{uid}").json() for uid in uids]
+
+
+def test_get_linked_batch_query_count_is_independent_of_size(client):
+    from sqlalchemy import event
+
+    from tests.conftest import engine
+
+    seeded = _seed_graph(client) + _seed_graph(client)
+    uids = [item["uid"] for item in seeded]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.post("/linked/batch", json={"uids": uids[:1]})
+        single = len(statements)
+        statements.clear()
+        client.post("/linked/batch", json={"uids": uids})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(statements) <= single + 2
+
+
+def test_get_linked_batch_not_found(client):
+    dataset = client.post("/datasets", json={"title": "DS"}).json()
+
+    response = client.post("/linked/batch", json={"uids": [dataset["uid"], "00000000-0000-0000-0000-000000000000"]})
+    assert response.status_code == 404
+
+
+def test_get_linked_display_names(client):
+    dataset = client.post("/datasets", json={"title": "Dataset", "metadata": {"ckan_name": "ds-ckan"}}).json()
+    endpoint = client.post("/ep", json={"kind": "API", "url": ""}).json()
+    service = client.post("/services", json={"openapi_url": "https://svc/openapi.json", "metadata": {}}).json()
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint["uid"]})
+    client.post("/dataset-services", json={"dataset_uid": dataset["uid"], "service_uid": service["uid"]})
+
+    body = client.get(f"/linked/{dataset['uid']}").json()
+    assert body["endpoints"] == [{"uid": endpoint["uid"], "name": "API", "ckan_name": "none"}]
+    assert body["services"] == [{"uid": service["uid"], "name": "https://svc/openapi.json", "ckan_name": "none"}]
+    assert client.get(f"/linked/{endpoint['uid']}").json()["datasets"] == [
+        {"uid": dataset["uid"], "name": "Dataset", "ckan_name": "ds-ckan"}
+    ]
+
+    client.put(f"/ep/{endpoint['uid']}", json={"url": "https://ep"})
+    assert client.get(f"/linked/{dataset['uid']}").json()["endpoints"][0]["name"] == "API: https://ep"
+
+
+@pytest.fixture
+def graph_cache_enabled(monkeypatch):
+    from app.config import settings
+    from app.graph_cache import graph_cache
+
+    monkeypatch.setattr(settings, "graph_cache_enabled", True)
+    graph_cache.invalidate()
+    yield graph_cache
+    graph_cache.invalidate()
+
+
+def test_get_linked_from_graph_cache_matches_sql(client, graph_cache_enabled):
+    seeded = _seed_graph(client)
+    uids = [item["uid"] for item in seeded]
+
+    cached = [client.get(f"/linked/{uid}").json() for uid in uids]
+    assert client.post("/linked/batch", json={"uids": uids}).json() == cached
+
+    from app.config import settings
+
+    settings.graph_cache_enabled = False
+    assert [client.get(f"/linked/{uid}").json() for uid in uids] == cached
+
+
+def test_graph_cache_is_invalidated_by_writes(client, graph_cache_enabled):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    assert client.get(f"/linked/{endpoint_2['uid']}").status_code == 200
+
+    endpoint_3 = client.post("/ep", json={"kind": "API", "url": "https://ep-3"}).json()
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint_3["uid"]})
+
+    body = client.get(f"/linked/{dataset['uid']}").json()
+    assert endpoint_3["uid"] in {item["uid"] for item in body["endpoints"]}
+    assert client.get(f"/linked/{endpoint_3['uid']}").json()["datasets"][0]["uid"] == dataset["uid"]
+
+    client.put(f"/datasets/{dataset['uid']}", json={"title": "Dataset Renamed"})
+    body = client.get(f"/linked/{endpoint_3['uid']}").json()
+    assert body["datasets"][0]["name"] == "Dataset Renamed"
+
+
+def test_graph_cache_not_found(client, graph_cache_enabled):
+    response = client.get("/linked/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_get_linked_conditional(client, graph_cache_enabled, cached):
+    from app.config import settings
+
+    settings.graph_cache_enabled = cached
+    dataset, endpoint_1, *_ = _seed_graph(client)
+
+    response = client.get(f"/linked/{dataset['uid']}")
+    etag = response.headers["etag"]
+    assert client.get(f"/linked/{dataset['uid']}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/ep/{endpoint_1['uid']}", json={"url": "https://ep-1-moved"})
+    response = client.get(f"/linked/{dataset['uid']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_traverse_linked_entities(client):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    other_dataset = client.post("/datasets", json={"title": "Dataset Beta"}).json()
+    client.post("/dataset-services", json={"dataset_uid": other_dataset["uid"], "service_uid": service_2["uid"]})
+
+    response = client.get(f"/linked/{endpoint_1['uid']}/traverse", params={"depth": 2})
+    assert response.status_code == 200
+    body = response.json()
+
+    hops = {item["uid"]: item["hop"] for item in body["nodes"]}
+    assert body["input_type"] == "endpoint"
+    assert body["truncated"] is False
+    assert hops[endpoint_1["uid"]] == 0
+    assert hops[dataset["uid"]] == 1
+    assert hops[service_2["uid"]] == 1
+    assert hops[other_dataset["uid"]] == 2
+    assert {
+        "source": service_2["uid"], "target": other_dataset["uid"], "via": "dataset_service", "hop": 2
+    } in body["edges"]
+
+    shallow = client.get(f"/linked/{endpoint_1['uid']}/traverse", params={"depth": 1}).json()
+    assert other_dataset["uid"] not in {item["uid"] for item in shallow["nodes"]}
+
+
+def test_traverse_linked_entities_max_nodes(client):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+
+    body = client.get(f"/linked/{dataset['uid']}/traverse", params={"depth": 3, "max_nodes": 2}).json()
+    assert body["truncated"] is True
+    assert len(body["nodes"]) == 2
+
+
+def test_traverse_linked_entities_from_graph_cache(client, graph_cache_enabled):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    cached = client.get(f"/linked/{dataset['uid']}/traverse", params={"depth": 3}).json()
+
+    from app.config import settings
+
+    settings.graph_cache_enabled = False
+    assert client.get(f"/linked/{dataset['uid']}/traverse", params={"depth": 3}).json() == cached
+
+
+def test_traverse_linked_entities_not_found(client):
+    response = client.get("/linked/00000000-0000-0000-0000-000000000000/traverse")
+    assert response.status_code == 404
+
+
+def test_neighbor_table_follows_writes(client):
+    dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+    triple = client.get("/affinities").json()[0]
+
+    client.put(f"/affinities/{triple['triple_uid']}", json={"endpoint_uids": [endpoint_1["uid"]], "service_uids": [service_1["uid"]]})
+    body = client.get(f"/linked/{endpoint_2['uid']}").json()
+    assert body["datasets"] == body["endpoints"] == body["services"] == []
+    assert {item["uid"] for item in client.get(f"/linked/{dataset['uid']}").json()["services"]} == {service_1["uid"]}
+
+    # Still linked through the affinity once the direct link is gone
+    client.delete(f"/service-endpoints/{service_1['uid']}/{endpoint_1['uid']}")
+    assert [item["uid"] for item in client.get(f"/linked/{service_1['uid']}").json()["endpoints"]] == [endpoint_1["uid"]]
+
+    client.delete(f"/affinities/{triple['triple_uid']}")
+    client.delete(f"/ep/{endpoint_1['uid']}")
+    body = client.get(f"/linked/{dataset['uid']}").json()
+    assert body["endpoints"] == []
+    assert [item["uid"] for item in body["services"]] == [service_1["uid"]]
+
+
+def test_rebuild_neighbors_repairs_drift(client, db):
+    from app.models.neighbor import Neighbor
+    from app.neighbors import rebuild_neighbors
+
+    seeded = _seed_graph(client)
+    uids = [item["uid"] for item in seeded]
+    expected = [client.get(f"/linked/{uid}").json() for uid in uids]
+    rows = db.query(Neighbor).count()
+
+    db.query(Neighbor).delete()
+    db.commit()
+    assert client.get(f"/linked/{uids[0]}").json()["endpoints"] == []
+
+    assert rebuild_neighbors(db) == rows
+    db.commit()
+    assert [client.get(f"/linked/{uid}").json() for uid in uids] == expected
+
+
+def test_deleting_dataset_drops_edges_of_its_affinities(client, db):
+    from sqlalchemy import text
+
+    db.execute(text("PRAGMA foreign_keys = ON"))
+    try:
+        dataset, endpoint_1, endpoint_2, service_1, service_2 = _seed_graph(client)
+        client.delete(f"/datasets/{dataset['uid']}")
+
+        body = client.get(f"/linked/{endpoint_2['uid']}").json()
+        assert body["endpoints"] == body["services"] == body["datasets"] == []
+        batch = client.post("/linked/batch", json={"uids": [endpoint_1["uid"]]}).json()[0]
+        assert [item["uid"] for item in batch["services"]] == [service_1["uid"]]
+        assert batch["endpoints"] == []
+    finally:
+        db.execute(text("PRAGMA foreign_keys = OFF"))
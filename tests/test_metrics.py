@@ -0,0 +1,71 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _samples(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.text)
+        for sample in family.samples
+    }
+
+
+def _value(samples: dict, name: str, **labels) -> float:
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_request_metrics_are_labelled_by_route_template(client):
+    before = _samples(client)
+    dataset = client.post("/datasets", json={"title": "Dataset"}).json()
+    client.get(f"/linked/{dataset['uid']}")
+    client.get("/linked/00000000-0000-0000-0000-000000000000")
+    client.get("/no-such-route")
+    after = _samples(client)
+
+    def delta(name, **labels):
+        return _value(after, name, **labels) - _value(before, name, **labels)
+
+    assert delta("http_requests_total", method="POST", route="/datasets", status="201") == 1
+    assert delta("http_requests_total", method="GET", route="/linked/{uid}", status="200") == 1
+    assert delta("http_requests_total", method="GET", route="/linked/{uid}", status="404") == 1
+    assert delta("http_requests_total", method="GET", route="unmatched", status="404") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route="/linked/{uid}") == 2
+    assert delta("http_response_size_bytes_count", method="GET", route="/linked/{uid}") == 2
+    assert delta("http_response_size_bytes_sum", method="GET", route="/linked/{uid}") > 0
+    # The scrape itself is in flight while it renders
+    assert _value(after, "http_requests_in_progress") == 1
+
+
+def test_pool_gauges(client, monkeypatch):
+    from app import metrics
+
+    status = {"sync": {"pool": "QueuePool", "size": 5, "checked_in": 1, "checked_out": 7, "overflow": 3}}
+    monkeypatch.setattr(metrics, "pool_status", lambda: status)
+    client.get("/health")
+    samples = _samples(client)
+    assert _value(samples, "db_pool_checked_out", engine="sync") == 7
+    assert _value(samples, "db_pool_overflow", engine="sync") == 3
+
+
+def test_cache_lookup_metrics(client, monkeypatch):
+    from app.config import settings
+    from app.graph_cache import graph_cache
+
+    monkeypatch.setattr(settings, "graph_cache_enabled", True)
+    graph_cache.invalidate()
+    before = _samples(client)
+    dataset = client.post("/datasets", json={"title": "Dataset"}).json()
+    client.get(f"/linked/{dataset['uid']}")
+    client.get(f"/linked/{dataset['uid']}")
+    after = _samples(client)
+    graph_cache.invalidate()
+
+    def delta(result):
+        return _value(after, "cache_lookups_total", cache="graph", result=result) - _value(
+            before, "cache_lookups_total", cache="graph", result=result
+        )
+
+    assert delta("miss") == 1
+    assert delta("hit") == 1
@@ -0,0 +1,35 @@
+from app.notifications import ChangeListener, start_change_listener
+from tests.conftest import engine
+
+
+def test_dispatch_reaches_every_subscriber():
+    listener = ChangeListener(engine)
+    received = []
+
+    def failing(change):
+        raise RuntimeError("boom")
+
+    listener.subscribe(failing)
+    listener.subscribe(received.append)
+    listener.dispatch({"table": "ndp_dataset", "op": "UPDATE"})
+
+    assert received == [{"table": "ndp_dataset", "op": "UPDATE"}]
+
+
+def test_listener_not_started_without_postgres(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "graph_cache_enabled", True)
+    assert start_change_listener(engine) is None
+
+
+def test_listener_not_started_through_pgbouncer(monkeypatch, caplog):
+    from sqlalchemy import create_engine
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "graph_cache_enabled", True)
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    postgres = create_engine("postgresql+psycopg2://user@localhost/db")
+    assert start_change_listener(postgres) is None
+    assert "DB_LISTEN_URL" in caplog.text
@@ -0,0 +1,42 @@
+import logging
+import re
+
+from app.config import settings
+from app.query_stats import QueryStats
+
+
+def _timing(response) -> tuple[int, float]:
+    match = re.match(r'db;dur=([\d.]+);desc="(\d+) queries", total;dur=[\d.]+$', response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    return int(match.group(2)), float(match.group(1))
+
+
+def test_server_timing_counts_queries(client):
+    dataset = client.post("/datasets", json={"title": "Dataset"})
+    count, _duration = _timing(dataset)
+    assert count >= 1
+
+    assert _timing(client.get("/health"))[0] == 0
+
+    uids = [client.post("/ep", json={"kind": "API", "url": f"https://ep-{index}"}).json()["uid"] for index in range(3)]
+    count, duration = _timing(client.post("/linked/batch", json={"uids": uids}))
+    assert count >= 1
+    assert duration >= 0
+
+
+def test_server_timing_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "server_timing_enabled", False)
+    assert "server-timing" not in client.get("/datasets").headers
+
+
+def test_slow_query_log(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "db_slow_query_ms", 1e-9)
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        client.get("/datasets", params={"source_ep": "ep-slow"})
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("Slow query" in message and "ndp_dataset" in message and "ep-slow" in message for message in messages)
+
+
+def test_server_timing_header_format():
+    stats = QueryStats(count=9, duration=0.0125)
+    assert stats.server_timing(0.05) == 'db;dur=12.5;desc="9 queries", total;dur=50.0'
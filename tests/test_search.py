@@ -0,0 +1,45 @@
+def _seed(client):
+    dataset = client.post("/datasets", json={
+        "title": "Kilauea deformation",
+        "metadata": {"ckan_name": "kilauea-insar", "keywords": ["volcano", "insar"]},
+    }).json()
+    other = client.post("/datasets", json={"title": "Ocean temperature", "metadata": {"keywords": ["sst"]}}).json()
+    endpoint = client.post("/ep", json={"kind": "OGC", "url": "https://volcano.example.org/wms"}).json()
+    service = client.post("/services", json={"type": "volcano-alerts", "metadata": {"ndp_ep_name": "hvo"}}).json()
+    return dataset, other, endpoint, service
+
+
+def test_search_across_types(client):
+    dataset, _other, endpoint, service = _seed(client)
+
+    response = client.get("/search", params={"q": "volcano"})
+    assert response.status_code == 200
+    hits = {(hit["type"], hit["uid"]) for hit in response.json()}
+    assert hits == {("dataset", dataset["uid"]), ("endpoint", endpoint["uid"]), ("service", service["uid"])}
+
+    top = client.get("/search", params={"q": "kilauea"}).json()
+    assert [hit["uid"] for hit in top] == [dataset["uid"]]
+    assert top[0]["name"] == "Kilauea deformation"
+    assert top[0]["ckan_name"] == "kilauea-insar"
+
+
+def test_search_prefix_types_and_limit(client):
+    dataset, other, _endpoint, service = _seed(client)
+
+    assert [hit["uid"] for hit in client.get("/search", params={"q": "temp"}).json()] == [other["uid"]]
+    assert [hit["uid"] for hit in client.get("/search", params={"q": "hvo", "types": "service"}).json()] == [
+        service["uid"]
+    ]
+    assert len(client.get("/search", params={"q": "volcano", "limit": 1}).json()) == 1
+    assert client.get("/search", params={"q": "volcano", "types": "dataset,widget"}).status_code == 400
+
+
+def test_search_follows_updates_and_deletes(client):
+    dataset, *_ = _seed(client)
+
+    client.put(f"/datasets/{dataset['uid']}", json={"title": "Mauna Loa", "metadata": {}})
+    assert client.get("/search", params={"q": "kilauea"}).json() == []
+    assert [hit["uid"] for hit in client.get("/search", params={"q": "mauna"}).json()] == [dataset["uid"]]
+
+    client.delete(f"/datasets/{dataset['uid']}")
+    assert client.get("/search", params={"q": "mauna"}).json() == []
@@ -0,0 +1,79 @@
+import pytest
+
+
+def _seed(client):
+    dataset = client.post("/datasets", json={"title": "Dataset Alpha"}).json()
+    client.post("/datasets", json={"title": "Lonely Dataset"})
+    endpoint_1 = client.post("/ep", json={"kind": "OGC", "url": "https://ep-1"}).json()
+    endpoint_2 = client.post("/ep", json={"kind": "API", "url": "https://ep-2"}).json()
+    client.post("/ep", json={"kind": "API", "url": "https://ep-3"})
+    service = client.post("/services", json={"type": "transform"}).json()
+
+    client.post("/dataset-endpoints", json={"dataset_uid": dataset["uid"], "endpoint_uid": endpoint_1["uid"], "role": "primary"})
+    client.post("/service-endpoints", json={"service_uid": service["uid"], "endpoint_uid": endpoint_1["uid"]})
+    client.post("/affinities", json={
+        "dataset_uid": dataset["uid"],
+        "endpoint_uids": [endpoint_1["uid"], endpoint_2["uid"]],
+        "service_uids": [service["uid"]],
+        "version": 1,
+    })
+    client.post("/affinities", json={"dataset_uid": dataset["uid"], "endpoint_uids": [endpoint_2["uid"]], "version": 2})
+    return dataset
+
+
+def test_stats_empty(client):
+    response = client.get("/stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["counts"]["datasets"] == 0
+    assert body["counts"]["affinities"] == 0
+    assert body["affinity_versions"] == []
+    assert body["latest_affinities"] == []
+
+
+def test_stats(client):
+    dataset = _seed(client)
+
+    body = client.get("/stats").json()
+
+    assert body["counts"] == {
+        "datasets": 2,
+        "endpoints": 3,
+        "services": 1,
+        "dataset_endpoints": 1,
+        "dataset_services": 0,
+        "service_endpoints": 1,
+        "affinities": 2,
+    }
+    assert body["covered"] == {"datasets": 1, "endpoints": 2, "services": 1}
+    assert body["orphans"] == {"datasets": 1, "endpoints": 1, "services": 0}
+    assert body["edge_roles"]["dataset_endpoints"] == [{"role": "primary", "count": 1}]
+    assert body["edge_roles"]["service_endpoints"] == [{"role": None, "count": 1}]
+    assert body["affinity_versions"] == [{"version": 1, "count": 1}, {"version": 2, "count": 1}]
+    assert body["affinity_endpoint_members"] == 3
+    assert body["affinity_service_members"] == 1
+    assert body["top_datasets"] == [{"uid": dataset["uid"], "name": "Dataset Alpha", "count": 2}]
+    assert body["top_endpoint_kinds"] == [{"label": "API", "count": 1}, {"label": "OGC", "count": 1}]
+    assert body["top_service_types"] == [{"label": "transform", "count": 1}]
+    assert len(body["latest_affinities"]) == 2
+    assert {item["endpoint_count"] for item in body["latest_affinities"]} == {1, 2}
+
+
+@pytest.fixture
+def graph_cache_enabled(monkeypatch):
+    from app.config import settings
+    from app.graph_cache import graph_cache
+
+    monkeypatch.setattr(settings, "graph_cache_enabled", True)
+    graph_cache.invalidate()
+    yield graph_cache
+    graph_cache.invalidate()
+
+
+def test_stats_materialized_until_write(client, graph_cache_enabled):
+    _seed(client)
+    first = client.get("/stats").json()
+    assert client.get("/stats").json() == first
+
+    client.post("/datasets", json={"title": "Dataset Beta"})
+    assert client.get("/stats").json()["counts"]["datasets"] == first["counts"]["datasets"] + 1